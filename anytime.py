@@ -0,0 +1,116 @@
+"""
+Anytime performance of the formulations, from the incumbent trajectories in the records of batch.py (or portfolio.py):
+the time to the first feasible schedule, the time until the incumbent is within a tolerance (1% by default) of the best
+known makespan of the instance, and the primal integral, i.e. the integral over the time limit of the relative gap
+between the incumbent and the best known makespan (1 while there is no incumbent). The best known makespan of an
+instance is the best objective over all the records read. A formulation that finds good schedules early has a small
+primal integral even if it does not prove optimality.
+
+Example (the anytime performance of every formulation in a sweep, and of every run):
+    python anytime.py fsp.jsonl
+    python anytime.py fsp.jsonl --runs
+"""
+import argparse
+import json
+import sys
+
+
+def primal_gap(objective, reference):
+    """
+    Return the relative gap between an incumbent objective (None if there is none) and the best known objective.
+    """
+    if objective is None:
+        return 1.0
+    if max(objective, reference) <= 0:
+        return 0.0
+    return abs(objective - reference) / max(objective, reference)
+
+
+def anytime_metrics(trajectory, reference, horizon, tolerance=0.01):
+    """
+    Return the time to the first incumbent, the time until the incumbent is within tolerance of reference (None if
+    either never happens) and the primal integral over [0, horizon] of a trajectory of (time, incumbent objective,
+    bound) points, in which the incumbent stays constant between points.
+    """
+    first_time = within_time = None
+    integral = 0.0
+    last_time, last_gap = 0.0, 1.0
+    for time, objective, _ in trajectory:
+        time = min(time, horizon)
+        integral += (time - last_time) * last_gap
+        last_time, last_gap = time, primal_gap(objective, reference)
+        if objective is not None and first_time is None:
+            first_time = time
+        if objective is not None and within_time is None and last_gap <= tolerance:
+            within_time = time
+    integral += (horizon - last_time) * last_gap
+    return first_time, within_time, integral
+
+
+def read_records(paths):
+    """
+    Return the records of JSONL files that hold a trajectory (runs that ended in an error have none).
+    """
+    records = []
+    for path in paths:
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('trajectory') is not None:
+                    records.append(record)
+    return records
+
+
+def best_known(records):
+    """
+    Return the best objective of every (problem, instance) over the records.
+    """
+    best = {}
+    for record in records:
+        key = record['problem'], record['instance']
+        if record.get('objective') is not None and record['objective'] < best.get(key, float('inf')):
+            best[key] = record['objective']
+    return best
+
+
+def mean(values):
+    return sum(values) / len(values) if values else None
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('records', nargs='+', help='JSONL files written by batch.py or portfolio.py')
+    arg_parser.add_argument('--tolerance', type=float, default=0.01, help='relative gap to the best known makespan that counts as found (default: 0.01)')
+    arg_parser.add_argument('--runs', action='store_true', help='print the metrics of every run, not only the means per formulation')
+    args = arg_parser.parse_args(argv)
+
+    records = read_records(args.records)
+    if not records:
+        arg_parser.error('no records with a trajectory found')
+    best = best_known(records)
+    if args.runs:
+        print('problem\tformulation\tinstance\ttime to first\ttime to tolerance\tprimal integral')
+    formulations = {}
+    for record in records:
+        reference = best.get((record['problem'], record['instance']))
+        if reference is None:  # no run found a schedule of this instance
+            continue
+        first_time, within_time, integral = anytime_metrics(record['trajectory'], reference, record['time_limit'], args.tolerance)
+        formulations.setdefault((record['problem'], record['formulation']), []).append((first_time, within_time, integral))
+        if args.runs:
+            print('\t'.join([record['problem'], record['formulation'], record['instance'], '-' if first_time is None else f'{first_time:.3f}', '-' if within_time is None else f'{within_time:.3f}', f'{integral:.3f}']))
+
+    print(f'problem\tformulation\truns\tfeasible\tmean time to first\twithin {args.tolerance:.0%}\tmean time to {args.tolerance:.0%}\tmean primal integral')
+    for (problem, formulation), runs in sorted(formulations.items()):
+        first_times = [first_time for first_time, _, _ in runs if first_time is not None]
+        within_times = [within_time for _, within_time, _ in runs if within_time is not None]
+        row = [problem, formulation, len(runs), len(first_times), mean(first_times), len(within_times), mean(within_times), mean([integral for _, _, integral in runs])]
+        print('\t'.join('-' if value is None else f'{value:.3f}' if isinstance(value, float) else str(value) for value in row))
+    print(f'{len(records)} runs on {len(best)} instances', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
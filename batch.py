@@ -0,0 +1,189 @@
+"""
+Run formulations of one scheduling problem over whole folders of test cases on a process pool and stream one JSONL
+record per run, holding the result the model function returns (status, objective, bound, gap, times and node count)
+and the combinatorial lower bound of the instance (see bounds.py).
+Runs already recorded in the output file are skipped, so an interrupted sweep resumes where it stopped.
+
+Example (every CPLEX and CP run of the flow shop test cases, 60 s and 2 threads each):
+    python batch.py fsp "flow shop scheduling/test cases" -f mip_cplex_model cp_model -t 2 -l 60 -o fsp.jsonl
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from bounds import file_lower_bound
+from model_cache import DEFAULT_MAX_BYTES, ModelCache
+from problems import LAZY_PROBLEMS, PROBLEMS, ROOT, formulations, instance_files, model_function, test_cases
+from sizes import file_model_size, total
+
+
+def run_key(record):
+    """
+    Return the fields that identify a run, i.e. the fields a resumed sweep compares to skip finished runs (records
+    written before the lazy mode existed are not lazy).
+    """
+    return record['problem'], record['formulation'], record['instance'], record['threads'], record['time_limit'], record.get('lazy', False)
+
+
+def finished_runs(output_path):
+    """
+    Return the keys of the runs recorded in an output file, except those that ended in an error or were skipped as too
+    large (so a sweep with a larger --max-nonzeros runs them). Lines that do not parse (e.g. the last line of a sweep
+    that was killed) are ignored.
+    """
+    keys = set()
+    if os.path.exists(output_path):
+        with open(output_path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('status') not in ('error', 'too_large'):
+                    keys.add(run_key(record))
+    return keys
+
+
+def log_path(log_dir, task):
+    """
+    Return the file that keeps the solver output of a run, or None if the output is not kept.
+    """
+    if log_dir is None:
+        return None
+    name = re.sub(r'[^\w.-]+', '_', f"{task['formulation']}__{task['instance']}")
+    return os.path.join(log_dir, task['problem'], f"{name}__t{task['threads']}_l{task['time_limit']}.log")
+
+
+def run(task, lower_bound=None):
+    """
+    Run one formulation on one instance and return its record. The solver output (including the native output of the
+    solver libraries) is redirected to the log file of the run. If lower_bound is given (e.g. the shared bound of a
+    portfolio race), the solve stops as soon as its incumbent reaches it instead of the bound of the instance. A MIP
+    run whose model would have more than max_nonzeros nonzeros (predicted, see sizes.py) is not built: its status is
+    'too_large'. If lazy is set, the MIP models add their disjunctive constraints on demand.
+    """
+    record = {key: task[key] for key in ('problem', 'formulation', 'instance', 'threads', 'time_limit', 'lazy')}
+    kwargs = {'threads': task['threads'], 'time_limit': task['time_limit']}
+    if task['execfile'] is not None and task['formulation'].startswith('cp_'):
+        kwargs['execfile'] = task['execfile']
+    if task['model_cache'] is not None and task['formulation'].startswith('mip_'):
+        kwargs['model_cache'] = ModelCache(task['model_cache'], task['model_cache_bytes'])
+    if task['lazy'] and task['formulation'].startswith('mip_'):
+        kwargs['lazy'] = True
+    if task['log'] is not None:
+        os.makedirs(os.path.dirname(task['log']), exist_ok=True)
+        log = open(task['log'], 'w+')
+    else:
+        log = tempfile.TemporaryFile('w+')
+    with log:
+        sys.stdout.flush()
+        stdout = os.dup(1)
+        os.dup2(log.fileno(), 1)
+        start = time.perf_counter()
+        try:
+            path = os.path.join(ROOT, task['instance'])
+            record['lower_bound'] = file_lower_bound(task['problem'], path)
+            if lower_bound is not None:
+                kwargs['lower_bound'] = lower_bound
+            elif task['stop_at_bound']:
+                kwargs['lower_bound'] = record['lower_bound']
+            nonzeros = None
+            if task['max_nonzeros'] is not None and task['formulation'].startswith('mip_'):
+                nonzeros = total(file_model_size(task['problem'], path, task['lazy']))[1]
+            if nonzeros is not None and nonzeros > task['max_nonzeros']:
+                record['status'] = 'too_large'
+                record['nonzeros'] = nonzeros
+            else:
+                result = model_function(task['problem'], task['formulation'])(path, **kwargs)
+                record.update(result.to_dict())
+                if not task['schedules']:
+                    del record['schedule']
+        except Exception as e:
+            record['status'] = 'error'
+            record['error'] = f'{type(e).__name__}: {e}'
+        finally:
+            record['wall_time'] = time.perf_counter() - start
+            sys.stdout.flush()
+            os.dup2(stdout, 1)
+            os.close(stdout)
+    return record
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('problem', choices=PROBLEMS, help='the problem type')
+    arg_parser.add_argument('instances', nargs='*', help='instance folders, glob patterns or files (default: the test cases of the problem)')
+    arg_parser.add_argument('-f', '--formulations', nargs='+', help='model functions without the problem prefix, e.g. mip_cplex_model (default: all)')
+    arg_parser.add_argument('-t', '--threads', type=int, default=1, help='solver threads per run (default: 1)')
+    arg_parser.add_argument('-l', '--time-limit', type=float, default=3600.0, help='time limit per run in seconds (default: 3600)')
+    arg_parser.add_argument('-w', '--workers', type=int, help='parallel runs (default: the number of cores divided by --threads)')
+    arg_parser.add_argument('-o', '--output', help='JSONL file the records are appended to (default: <problem>.jsonl)')
+    arg_parser.add_argument('--log-dir', help='keep the solver output of every run in this folder')
+    arg_parser.add_argument('--stop-at-bound', action='store_true', help='stop each solve as soon as its incumbent reaches the lower bound of the instance')
+    arg_parser.add_argument('--schedules', action='store_true', help='include the decoded schedule of every run in its record')
+    arg_parser.add_argument('--execfile', help='path to the CP Optimizer executable, passed to the CP formulations')
+    arg_parser.add_argument('--model-cache', help='read the built MIP models from this folder, and store them there (see model_cache.py)')
+    arg_parser.add_argument('--model-cache-gb', type=float, default=DEFAULT_MAX_BYTES / (1 << 30), help=f'size of the model cache, beyond which the least recently used models are evicted (default: {DEFAULT_MAX_BYTES / (1 << 30):g})')
+    arg_parser.add_argument('--max-nonzeros', type=float, help='skip the MIP runs whose model would have more nonzeros (see sizes.py), e.g. to leave large instances to CP')
+    arg_parser.add_argument('--lazy', action='store_true', help=f"add the disjunctive constraints of the MIP models on demand, through lazy constraint callbacks ({', '.join(LAZY_PROBLEMS)})")
+    args = arg_parser.parse_args(argv)
+    if args.lazy and args.problem not in LAZY_PROBLEMS:
+        arg_parser.error(f"--lazy only applies to {', '.join(LAZY_PROBLEMS)}")
+
+    available = formulations(args.problem)
+    chosen = args.formulations or available
+    unknown = [formulation for formulation in chosen if formulation not in available]
+    if unknown:
+        arg_parser.error(f"unknown formulations {', '.join(unknown)} (choose from {', '.join(available)})")
+    files = instance_files(args.instances or [test_cases(args.problem)])
+    if not files:
+        arg_parser.error('no instance files found')
+    output = args.output or f'{args.problem}.jsonl'
+    workers = args.workers or max(1, (os.cpu_count() or 1) // args.threads)
+
+    done = finished_runs(output)
+    tasks = []
+    for file in files:
+        for formulation in chosen:
+            task = {'problem': args.problem, 'formulation': formulation, 'instance': os.path.relpath(os.path.abspath(file), ROOT), 'threads': args.threads, 'time_limit': args.time_limit, 'execfile': args.execfile, 'stop_at_bound': args.stop_at_bound, 'schedules': args.schedules, 'model_cache': args.model_cache and os.path.abspath(args.model_cache), 'model_cache_bytes': int(args.model_cache_gb * (1 << 30)), 'max_nonzeros': args.max_nonzeros, 'lazy': args.lazy}
+            if run_key(task) not in done:
+                task['log'] = log_path(args.log_dir, task)
+                tasks.append(task)
+    print(f'{len(tasks)} runs to do, {len(files) * len(chosen) - len(tasks)} already done, {workers} workers', file=sys.stderr)
+    if not tasks:
+        return
+
+    # terminate a line left unfinished by an interrupted sweep before appending to it
+    unfinished = False
+    if os.path.exists(output) and os.path.getsize(output) > 0:
+        with open(output, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            unfinished = f.read(1) != b'\n'
+    with open(output, 'a') as out:
+        if unfinished:
+            out.write('\n')
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = {pool.submit(run, task): task for task in tasks}
+            for count, future in enumerate(as_completed(futures), 1):
+                try:
+                    record = future.result()
+                except Exception as e:
+                    # the worker process died (e.g. a crash inside a solver library)
+                    task = futures[future]
+                    record = {key: task[key] for key in ('problem', 'formulation', 'instance', 'threads', 'time_limit', 'lazy')}
+                    record['status'] = 'error'
+                    record['error'] = f'{type(e).__name__}: {e}'
+                out.write(json.dumps(record) + '\n')
+                out.flush()
+                objective = record.get('objective')
+                print(f"[{count}/{len(tasks)}] {record['formulation']} {record['instance']}: {record['status']}{'' if objective is None else f' {objective}'}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""
+Benchmark the formulations of the scheduling problems on generated instances of growing size. Every run records the
+parse, build and solve times, the size of the model (variables, constraints, nonzeros) and the peak resident set size,
+and becomes one row of a CSV table that can be diffed between versions to catch scaling regressions.
+
+The runs happen one at a time, each in a fresh process, so that the timings do not compete for cores and the peak
+memory of a run is its own. CPLEX and Gurobi run inside that process; CP Optimizer runs in a child process of its own,
+whose peak is recorded separately.
+
+Example (every formulation of the flow and job shop problems on 10 to 100 jobs, 10 s per solve):
+    python benchmark.py fsp jsp -n 10 20 50 100 -l 10 -o benchmark.csv
+Compare two tables (rows whose model size changed or whose build time grew by more than the tolerance):
+    python benchmark.py --compare old.csv new.csv
+The full and the lazy disjunctive MIP models (see --lazy) compare the same way:
+    python benchmark.py fsp jsp -f mip_cplex_model -o full.csv
+    python benchmark.py fsp jsp -f mip_cplex_model --lazy -o lazy.csv
+    python benchmark.py --compare full.csv lazy.csv
+"""
+import argparse
+import csv
+import math
+import multiprocessing
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch import run
+from problems import LAZY_PROBLEMS, PROBLEMS, formulations
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# machines (stages for the flow shops) of the generated instances, as in the shipped test cases
+MACHINES = {'fsp': 5, 'nfsp': 5, 'jsp': 10, 'fjsp': 6, 'hfsp': 5, 'dfsp': 5, 'sdst_fsp': 5, 'pmsp': 5}
+HFSP_MACHINES = 3  # parallel machines per stage
+DFSP_FACTORIES = 2
+SIZES = [10, 20, 50, 100, 200, 500]
+
+COLUMNS = ['problem', 'formulation', 'n', 'g', 'status', 'objective', 'bound', 'gap', 'variables', 'constraints',
+           'nonzeros', 'nodes', 'parse_time', 'build_time', 'solve_time', 'wall_time', 'peak_rss_mb', 'solver_rss_mb',
+           'error']
+
+
+def rows_text(rows):
+    """
+    Format a matrix as the tab-separated lines of the instance files.
+    """
+    return ''.join('\t'.join(map(str, row)) + '\t\n' for row in rows)
+
+
+def generate(problem, n, g, seed=0):
+    """
+    Return the text of a random instance of a problem with n jobs and g machines (stages), in the format of its test
+    cases. Processing times are drawn uniformly from 1 to 99 as in the Taillard instances; the same problem, size and
+    seed always give the same instance.
+    """
+    rng = np.random.default_rng([seed, list(PROBLEMS).index(problem), n, g])
+    p = rng.integers(1, 100, size=(n, g))
+    if problem == 'jsp':
+        r = np.argsort(rng.random((n, g)), axis=1) + 1
+        return f'{n}\n{g}\n' + rows_text(p) + rows_text(r)
+    if problem == 'fjsp':
+        o = rng.integers((g + 1) // 2, g + 1, size=n)
+        pt = rng.integers(1, 100, size=(int(o.sum()), g))
+        eligible = rng.random(pt.shape) < 0.5
+        eligible[np.arange(len(pt)), rng.integers(0, g, size=len(pt))] = True
+        return f'{n}\n{g}\n' + rows_text([o]) + rows_text(pt * eligible)
+    if problem == 'hfsp':
+        return f'{n}\n{g}\n' + rows_text([[HFSP_MACHINES] * g]) + rows_text(p)
+    if problem == 'dfsp':
+        return f'{n}\n{g}\n{DFSP_FACTORIES}\n' + rows_text(p)
+    if problem == 'sdst_fsp':
+        s = rng.integers(1, 50, size=(g, n, n))
+        return f'{n}\n{g}\n' + rows_text(p) + ''.join(rows_text(block) for block in s)
+    return f'{n}\n{g}\n' + rows_text(p)
+
+
+def instance_file(instance_dir, problem, n, g, seed):
+    """
+    Return the path of a generated instance, writing it first if it does not exist yet.
+    """
+    path = os.path.join(instance_dir, f'{problem}_n{n}_g{g}_s{seed}.txt')
+    if not os.path.exists(path):
+        with open(path, 'w') as f:
+            f.write(generate(problem, n, g, seed))
+    return path
+
+
+def peak_rss_mb(children=False):
+    """
+    Return the peak resident set size of this process (or the largest of its finished children) in MiB, or None where
+    the resource module is not available.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1 << 20 if sys.platform == 'darwin' else 1 << 10), 1)
+
+
+def measure(task):
+    """
+    Run one formulation on one instance (see batch.run) and add the peak memory of the run to its record.
+    """
+    record = run(task)
+    record['peak_rss_mb'] = peak_rss_mb()
+    record['solver_rss_mb'] = peak_rss_mb(children=True)
+    return record
+
+
+def fresh_run(task):
+    """
+    Run measure(task) in a new process and return its record, or an error record if the process died.
+    """
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        try:
+            return pool.submit(measure, task).result()
+        except Exception as e:
+            # the worker process died (e.g. a crash inside a solver library or out of memory)
+            return {'status': 'error', 'error': f'{type(e).__name__}: {e}'}
+
+
+def table_row(record):
+    """
+    Round the timings of a record so that the rows of two tables stay readable side by side.
+    """
+    row = dict(record)
+    for key in ('parse_time', 'build_time', 'solve_time', 'wall_time'):
+        if row.get(key) is not None:
+            row[key] = round(row[key], 4)
+    return row
+
+
+def scaling_exponent(sizes, values):
+    """
+    Return the exponent k of the best fit value ~ n^k (least squares in log-log scale), or None with fewer than two
+    positive values.
+    """
+    points = [(math.log(n), math.log(value)) for n, value in zip(sizes, values) if value]
+    if len(points) < 2 or len({x for x, _ in points}) < 2:
+        return None
+    return float(np.polyfit(*zip(*points), 1)[0])
+
+
+def report_scaling(rows):
+    """
+    Print the fitted growth of the build time and of the number of nonzeros of every formulation.
+    """
+    curves = {}
+    for row in rows:
+        if row.get('status') != 'error':
+            curves.setdefault((row['problem'], row['formulation']), []).append(row)
+    for (problem, formulation), curve in curves.items():
+        sizes = [row['n'] for row in curve]
+        parts = []
+        for key in ('build_time', 'nonzeros', 'peak_rss_mb'):
+            exponent = scaling_exponent(sizes, [row.get(key) for row in curve])
+            if exponent is not None:
+                parts.append(f'{key} ~ n^{exponent:.2f}')
+        print(f"{problem} {formulation}: {', '.join(parts) or 'not enough points'}", file=sys.stderr)
+
+
+def read_table(path):
+    """
+    Read a benchmark table into a dict keyed by (problem, formulation, n, g).
+    """
+    with open(path, 'r', newline='') as f:
+        return {(row['problem'], row['formulation'], row['n'], row['g']): row for row in csv.DictReader(f)}
+
+
+def compare(old_path, new_path, tolerance):
+    """
+    Print the runs whose status or model size differ between two tables or whose build time grew by more than the
+    tolerance factor, and return the number of such runs.
+    """
+    old, new = read_table(old_path), read_table(new_path)
+    changes = 0
+    for key, after in new.items():
+        if key not in old:
+            continue
+        before = old[key]
+        notes = [f'{column} {before[column]} -> {after[column]}' for column in ('status', 'variables', 'constraints', 'nonzeros') if before[column] != after[column]]
+        if before['build_time'] and after['build_time'] and float(after['build_time']) > tolerance * max(float(before['build_time']), 1e-3):
+            notes.append(f"build_time {before['build_time']} -> {after['build_time']}")
+        if notes:
+            changes += 1
+            print(f"{' '.join(key)}: {'; '.join(notes)}")
+    for key in old.keys() - new.keys():
+        print(f"{' '.join(key)}: missing from {new_path}")
+    return changes
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('problems', nargs='*', help=f"problem types (default: all of {', '.join(PROBLEMS)})")
+    arg_parser.add_argument('-f', '--formulations', nargs='+', help='model functions without the problem prefix, e.g. mip_cplex_model (default: all)')
+    arg_parser.add_argument('-n', '--sizes', nargs='+', type=int, default=SIZES, help=f"numbers of jobs (default: {' '.join(map(str, SIZES))})")
+    arg_parser.add_argument('-g', '--machines', type=int, help='machines (stages) of every instance (default: per problem, as in the test cases)')
+    arg_parser.add_argument('-s', '--seed', type=int, default=0, help='seed of the generated instances (default: 0)')
+    arg_parser.add_argument('-t', '--threads', type=int, default=1, help='solver threads per run (default: 1)')
+    arg_parser.add_argument('-l', '--time-limit', type=float, default=10.0, help='time limit per solve in seconds (default: 10)')
+    arg_parser.add_argument('-o', '--output', default='benchmark.csv', help='CSV table to write (default: benchmark.csv)')
+    arg_parser.add_argument('--instance-dir', help='keep the generated instances in this folder (default: a temporary folder)')
+    arg_parser.add_argument('--execfile', help='path to the CP Optimizer executable, passed to the CP formulations')
+    arg_parser.add_argument('--lazy', action='store_true', help=f"add the disjunctive constraints of the MIP models on demand ({', '.join(LAZY_PROBLEMS)}, the default problems then)")
+    arg_parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two tables instead of running')
+    arg_parser.add_argument('--tolerance', type=float, default=1.5, help='build time growth factor flagged by --compare (default: 1.5)')
+    args = arg_parser.parse_args(argv)
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.tolerance) else 0)
+    unknown = [problem for problem in args.problems if problem not in PROBLEMS]
+    if unknown:
+        arg_parser.error(f"unknown problems {', '.join(unknown)} (choose from {', '.join(PROBLEMS)})")
+    if args.lazy and any(problem not in LAZY_PROBLEMS for problem in args.problems):
+        arg_parser.error(f"--lazy only applies to {', '.join(LAZY_PROBLEMS)}")
+    problems = args.problems or list(LAZY_PROBLEMS if args.lazy else PROBLEMS)
+    chosen = {problem: [formulation for formulation in formulations(problem) if not args.formulations or formulation in args.formulations] for problem in problems}
+    if not any(chosen.values()):
+        arg_parser.error('no formulation of the chosen problems matches --formulations')
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        instance_dir = os.path.abspath(args.instance_dir or temp_dir)
+        os.makedirs(instance_dir, exist_ok=True)
+        rows = []
+        with open(args.output, 'w', newline='') as out:
+            writer = csv.DictWriter(out, COLUMNS, extrasaction='ignore')
+            writer.writeheader()
+            for problem in problems:
+                g = args.machines or MACHINES[problem]
+                for n in sorted(args.sizes):
+                    path = instance_file(instance_dir, problem, n, g, args.seed)
+                    for formulation in chosen[problem]:
+                        task = {'problem': problem, 'formulation': formulation, 'instance': path, 'threads': args.threads, 'time_limit': args.time_limit, 'execfile': args.execfile, 'stop_at_bound': False, 'schedules': False, 'model_cache': None, 'model_cache_bytes': None, 'max_nonzeros': None, 'lazy': args.lazy, 'log': None}
+                        row = table_row(fresh_run(task))
+                        row.update(problem=problem, formulation=formulation, n=n, g=g)
+                        rows.append(row)
+                        writer.writerow(row)
+                        out.flush()
+                        print(f"{problem} {formulation} n={n}: {row['status']}, build {row.get('build_time')} s, solve {row.get('solve_time')} s, {row.get('nonzeros')} nonzeros", file=sys.stderr)
+    report_scaling(rows)
+
+
+if __name__ == '__main__':
+    main()
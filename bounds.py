@@ -0,0 +1,207 @@
+"""
+Combinatorial lower bounds on the optimal makespan of the scheduling problems, computed from the parsed instances in a
+few vectorized passes. They are meant for gap reporting and for stopping a solve once its incumbent reaches the bound.
+
+Example (the bounds of every job shop test case):
+    python bounds.py jsp "job shop scheduling/test cases"
+"""
+import argparse
+import heapq
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+from problems import PROBLEMS, ROOT, instance_files, load_module, test_cases
+
+
+def heads_tails(p):
+    """
+    Return the heads and tails of the operations of jobs that visit their machines in the order of the columns of p,
+    i.e. the processing time of job j before and after its operation i.
+    """
+    done = np.cumsum(p, axis=1)
+    return done - p, done[:, -1:] - done
+
+
+def one_machine_bound(heads, p, tails):
+    """
+    Return the makespan of the preemptive Jackson schedule of one machine with heads (release times) and tails, a lower
+    bound on the makespan of any schedule in which the machine processes these operations.
+    """
+    order = np.argsort(heads, kind='stable')
+    heads, remaining, tails = heads[order].tolist(), p[order].tolist(), tails[order].tolist()
+    n = len(heads)
+    ready = []
+    t = bound = k = 0
+    while k < n or ready:
+        if not ready:
+            t = max(t, heads[k])
+        while k < n and heads[k] <= t:
+            heapq.heappush(ready, (-tails[k], k))
+            k += 1
+        # run the ready operation with the longest tail until it ends or the next operation is released
+        j = ready[0][1]
+        step = remaining[j] if k == n else min(remaining[j], heads[k] - t)
+        t += step
+        remaining[j] -= step
+        if remaining[j] == 0:
+            heapq.heappop(ready)
+            bound = max(bound, t + tails[j])
+    return bound
+
+
+def parallel_machines_bound(heads, p, tails, m):
+    """
+    Return, for every column i of p, a lower bound for m[i] identical parallel machines that process all the jobs of
+    that column: every used machine idles at least until the head of its first job and stays needed for the tail of
+    its last job, and an optimal schedule uses min(m[i], n) machines.
+    """
+    k = np.minimum(np.asarray(m), len(p))
+    columns = np.arange(p.shape[1])
+    first = np.cumsum(np.sort(heads, axis=0), axis=0)[k - 1, columns]
+    last = np.cumsum(np.sort(tails, axis=0), axis=0)[k - 1, columns]
+    return np.ceil((first + p.sum(axis=0) + last) / k).astype(np.int64)
+
+
+def fsp_lower_bound(instance):
+    """
+    Taillard's lower bound: the longest job, and for every machine the smallest head, its total processing time and the
+    smallest tail.
+    """
+    heads, tails = heads_tails(instance.p)
+    machines = heads.min(axis=0) + instance.p.sum(axis=0) + tails.min(axis=0)
+    return int(max(machines.max(), instance.p.sum(axis=1).max()))
+
+
+def nfsp_lower_bound(instance):
+    """
+    The longest job and the one-machine bound of every machine, with heads and tails along the machine order.
+    """
+    heads, tails = heads_tails(instance.p)
+    machines = max(one_machine_bound(heads[:, i], instance.p[:, i], tails[:, i]) for i in range(instance.g))
+    return int(max(machines, instance.p.sum(axis=1).max()))
+
+
+def jsp_lower_bound(instance):
+    """
+    The longest job and the one-machine bound of every machine, with heads and tails along the routes of the jobs.
+    """
+    heads, tails = heads_tails(instance.p)
+    # reorder the operations of every job by machine
+    heads, tails = (np.take_along_axis(values, instance.position, axis=1) for values in (heads, tails))
+    p = instance.duration
+    machines = max(one_machine_bound(heads[:, i], p[:, i], tails[:, i]) for i in range(instance.g))
+    return int(max(machines, instance.p.sum(axis=1).max()))
+
+
+def fjsp_lower_bound(instance):
+    """
+    The longest job and the busiest machine, taking every operation at its shortest processing time: the machines share
+    the total work, and each of them does at least the operations that only it can process.
+    """
+    pt = np.where(instance.pt > 0, instance.pt, np.iinfo(instance.pt.dtype).max)
+    shortest = pt.min(axis=1)
+    jobs = np.add.reduceat(shortest, instance.ptr[:-1]).max() if instance.n else 0
+    only = (instance.pt > 0).sum(axis=1) == 1
+    fixed = np.bincount(pt[only].argmin(axis=1), weights=shortest[only], minlength=instance.g).max() if only.any() else 0
+    return int(max(jobs, math.ceil(shortest.sum() / instance.g), fixed))
+
+
+def hfsp_lower_bound(instance):
+    """
+    The longest job and, for every stage, the capacity bound of its m[i] parallel machines with heads and tails.
+    """
+    heads, tails = heads_tails(instance.p)
+    stages = parallel_machines_bound(heads, instance.p, tails, instance.m)
+    return int(max(stages.max(), instance.p.sum(axis=1).max()))
+
+
+def dfsp_lower_bound(instance):
+    """
+    The longest job and, for every machine, the capacity bound of its copies in the f factories with heads and tails.
+    """
+    heads, tails = heads_tails(instance.p)
+    machines = parallel_machines_bound(heads, instance.p, tails, [instance.f] * instance.g)
+    return int(max(machines.max(), instance.p.sum(axis=1).max()))
+
+
+def sdst_fsp_lower_bound(instance):
+    """
+    Taillard's lower bound with the setups: every job but the first on a machine follows another one, so a machine is
+    busy at least for the shortest setup of each job into it, less the largest of these.
+    """
+    heads, tails = heads_tails(instance.p)
+    s = instance.s.astype(np.int64)
+    s[:, np.arange(instance.n), np.arange(instance.n)] = np.iinfo(np.int64).max
+    setups = s.min(axis=1) if instance.n > 1 else np.zeros((instance.g, 1), dtype=np.int64)
+    machines = heads.min(axis=0) + instance.p.sum(axis=0) + setups.sum(axis=1) - setups.max(axis=1) + tails.min(axis=0)
+    return int(max(machines.max(), instance.p.sum(axis=1).max()))
+
+
+def pmsp_lower_bound(instance, iterations=100):
+    """
+    The longest job at its fastest machine, and the Lagrangian dual of the assignment relaxation: for machine weights w
+    summing to 1, the sum over the jobs of min_i w[i] * p[j][i] bounds the makespan. The weights start uniform and are
+    moved towards the loaded machines by exponentiated subgradient steps; every step gives a valid bound.
+    """
+    p = instance.p.astype(np.float64)
+    jobs = np.arange(instance.n)
+    bound = p.min(axis=1).max() if instance.n else 0
+    weights = np.full(instance.g, 1 / instance.g)
+    for step in range(iterations):
+        weighted = p * weights
+        choice = weighted.argmin(axis=1)
+        bound = max(bound, weighted[jobs, choice].sum())
+        load = np.bincount(choice, weights=p[jobs, choice], minlength=instance.g)
+        weights *= np.exp(load / (load.max() * math.sqrt(step + 1)))
+        weights /= weights.sum()
+    return int(math.ceil(bound - 1e-6))
+
+
+LOWER_BOUNDS = {
+    'fsp': fsp_lower_bound,
+    'nfsp': nfsp_lower_bound,
+    'jsp': jsp_lower_bound,
+    'fjsp': fjsp_lower_bound,
+    'hfsp': hfsp_lower_bound,
+    'dfsp': dfsp_lower_bound,
+    'sdst_fsp': sdst_fsp_lower_bound,
+    'pmsp': pmsp_lower_bound,
+}
+
+
+def lower_bound(problem, instance):
+    """
+    Return the lower bound of a parsed instance of a problem.
+    """
+    return LOWER_BOUNDS[problem](instance)
+
+
+def file_lower_bound(problem, file_path):
+    """
+    Parse an instance file of a problem and return its lower bound.
+    """
+    return lower_bound(problem, load_module(problem).parser(file_path))
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('problem', choices=PROBLEMS, help='the problem type')
+    arg_parser.add_argument('instances', nargs='*', help='instance folders, glob patterns or files (default: the test cases of the problem)')
+    args = arg_parser.parse_args(argv)
+
+    files = instance_files(args.instances or [test_cases(args.problem)])
+    if not files:
+        arg_parser.error('no instance files found')
+    load_module(args.problem)
+    start = time.perf_counter()
+    for file in files:
+        print(f'{os.path.relpath(os.path.abspath(file), ROOT)}\t{file_lower_bound(args.problem, file)}')
+    print(f'{len(files)} instances in {time.perf_counter() - start:.3f} s', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,573 @@
+"""
+Code shared by the model scripts of the scheduling problems (see problems.py). The scripts live in folders whose names
+are not valid package names, so they add the top of the repository to sys.path to import it.
+"""
+import math
+import os
+import time
+
+import numpy as np
+import scipy.sparse as sp
+import cplex
+import gurobipy as gp
+from gurobipy import GRB
+from docplex.cp.solver.cpo_callback import CpoCallback
+
+CACHE_MIN_SIZE = 1 << 16  # the smallest instance file (in bytes) worth caching as .npz
+MMAP_MIN_SIZE = 1 << 24  # the smallest cached array (in bytes) kept in a .npy file of its own and memory-mapped
+
+
+def read_integers(f, count, file_path):
+    """
+    Read the rest of an open instance file as a flat int32 array of at least count integers (the values the header
+    announces). Raises ValueError naming the file if a token is not an integer or the file ends too early, e.g. when it
+    was truncated.
+    """
+    tokens = f.read().split()
+    if len(tokens) < count:
+        raise ValueError(f'{file_path}: expected {count} integers after the header, found {len(tokens)}')
+    try:
+        return np.array(tokens[:count], dtype=np.int32)
+    except ValueError as error:
+        raise ValueError(f'{file_path}: {error}') from None
+
+
+def read_cache(file_path):
+    """
+    Return the arrays cached for an instance file, or None if there is no cache entry or the file has been modified
+    since the entry was written. Arrays stored next to the entry as .npy files are memory-mapped read-only, so only the
+    pages that are used get loaded.
+    """
+    cache_path = os.path.join(os.path.dirname(file_path), '__pycache__', os.path.basename(file_path) + '.npz')
+    try:
+        with np.load(cache_path) as data:
+            if int(data['mtime']) == os.stat(file_path).st_mtime_ns:
+                arrays = {key: data[key] for key in data.files if key not in ('mtime', 'mapped')}
+                for key in data['mapped'].tolist() if 'mapped' in data.files else []:
+                    arrays[key] = np.load(f'{cache_path[:-4]}.{key}.npy', mmap_mode='r')
+                return arrays
+    except (OSError, KeyError, ValueError):
+        pass
+    return None
+
+
+def write_cache(file_path, arrays):
+    """
+    Cache the arrays of an instance file in the __pycache__ folder next to it, stamped with the file's mtime. Arrays of
+    at least MMAP_MIN_SIZE bytes go to .npy files of their own, which read_cache memory-maps. Every file is written to
+    a temporary file and moved into place, the .npz entry last, so concurrent readers never see a partial one;
+    failures to write (e.g. a read-only folder) are ignored.
+    """
+    cache_dir = os.path.join(os.path.dirname(file_path), '__pycache__')
+    cache_path = os.path.join(cache_dir, os.path.basename(file_path) + '.npz')
+    mapped = [key for key, array in arrays.items() if array.nbytes >= MMAP_MIN_SIZE]
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        for key in mapped:
+            tmp_path = f'{cache_path[:-4]}.{key}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.save(f, arrays[key])
+            os.replace(tmp_path, f'{cache_path[:-4]}.{key}.npy')
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            kept = {key: array for key, array in arrays.items() if key not in mapped}
+            np.savez(f, mtime=np.int64(os.stat(file_path).st_mtime_ns), mapped=np.array(mapped, dtype=str), **kept)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def fsp_makespan(p, sequences):
+    """
+    Evaluate the makespans of a batch of job sequences in one pass over the machines.
+    p is the n x g matrix of processing times and sequences is a 2-D integer array whose rows are job sequences
+    (a single 1-D sequence is also accepted). Returns a 1-D array with one makespan per row.
+    On machine i, the completion time of the k-th job c_k = max(c_{k-1}, c'_k) + P_k unrolls to
+    S_k + max_{l <= k} (c'_l - S_l + P_l), where S is the running sum of processing times on machine i and c' the
+    completion times on machine i - 1, so each machine costs one cumsum and one running maximum over the whole batch.
+    """
+    pt = np.asarray(p, dtype=np.int64).T
+    sequences = np.atleast_2d(np.asarray(sequences, dtype=np.intp))
+    c = np.zeros(sequences.shape, dtype=np.int64)
+    for i in range(pt.shape[0]):
+        pi = pt[i][sequences]
+        s = np.cumsum(pi, axis=1)
+        c = s + np.maximum.accumulate(c - s + pi, axis=1)
+    return c[:, -1]
+
+
+def fsp_completion_times(p, sequence, release=None):
+    """
+    Return the completion times c[k][i] of the k-th job of a single job sequence on machine i (same recurrence as fsp_makespan).
+    If release is given, machine i only becomes available at release[i].
+    """
+    pt = np.asarray(p, dtype=np.int64)[np.asarray(sequence, dtype=np.intp)]
+    c = np.zeros(pt.shape, dtype=np.int64)
+    prev = np.zeros(pt.shape[0], dtype=np.int64)
+    for i in range(pt.shape[1]):
+        s = np.cumsum(pt[:, i])
+        prev = s + np.maximum.accumulate(prev - s + pt[:, i])
+        if release is not None:
+            prev = np.maximum(prev, s + release[i])
+        c[:, i] = prev
+    return c
+
+
+def fsp_insertion_makespans(p, sequence, job):
+    """
+    Return the makespans obtained by inserting job at every position 0, ..., len(sequence) of sequence, using
+    Taillard's acceleration: with the heads e of the jobs before the position, the tails q of the jobs after it and
+    the completion times f of the inserted job, the makespan at each position is max_i (f_i + q_i). All positions are
+    evaluated together with one pass over the machines, so a full insertion costs O(len(sequence) * g).
+    """
+    p = np.asarray(p, dtype=np.int64)
+    g = p.shape[1]
+    e = np.zeros((len(sequence) + 1, g), dtype=np.int64)
+    q = np.zeros((len(sequence) + 1, g), dtype=np.int64)
+    e[1:] = fsp_completion_times(p, sequence)
+    q[:-1] = fsp_completion_times(p[:, ::-1], sequence[::-1])[::-1, ::-1]
+    f = np.zeros(len(sequence) + 1, dtype=np.int64)
+    makespans = np.zeros(len(sequence) + 1, dtype=np.int64)
+    for i in range(g):
+        f = np.maximum(f, e[:, i]) + p[job][i]
+        makespans = np.maximum(makespans, f + q[:, i])
+    return makespans
+
+
+def neh(p, f=1):
+    """
+    NEH constructive heuristic with Taillard's acceleration (O(n^2 g) overall), or NEH2 (Naderi and Ruiz, 2010) over
+    f factories. Jobs are taken in non-increasing order of their total processing times and each one is inserted at the
+    position, across all factories, that yields the smallest makespan of the receiving factory (the first one in case
+    of ties). Returns one job sequence per factory and the makespan.
+    """
+    p = np.asarray(p, dtype=np.int64)
+    order = np.argsort(-p.sum(axis=1), kind='stable')
+    factories = [[] for _ in range(f)]
+    Cmax = [0] * f
+    for job in order:
+        best_Cmax, best_factory, best_position = None, 0, 0
+        for factory in range(f):
+            makespans = fsp_insertion_makespans(p, factories[factory], job)
+            position = int(np.argmin(makespans))
+            if best_Cmax is None or makespans[position] < best_Cmax:
+                best_Cmax, best_factory, best_position = int(makespans[position]), factory, position
+        factories[best_factory].insert(best_position, int(job))
+        Cmax[best_factory] = best_Cmax
+    return factories, max(Cmax)
+
+
+def fsp_neh(instance):
+    """
+    NEH for a single flow shop (see neh). Returns the job sequence and its makespan.
+    """
+    factories, Cmax = neh(instance.p)
+    return factories[0], Cmax
+
+
+def fsp_lazy_seed(instance):
+    """
+    Return the seed of the lazy MIP models of the flow shops (see Disjunctions) as the arrays (j1, j2, i) of its
+    disjunctive constraints: the pairs of jobs j1 < j2 that are adjacent in the NEH sequence, on every machine i.
+    """
+    sequence = np.asarray(fsp_neh(instance)[0])
+    first, second = np.minimum(sequence[:-1], sequence[1:]), np.maximum(sequence[:-1], sequence[1:])
+    return np.repeat(first, instance.g), np.repeat(second, instance.g), np.tile(np.arange(instance.g), len(first))
+
+
+def disjunctive_keys(instance, seed=None):
+    """
+    Return an iterator over the (j1, j2, i) of the disjunctive constraints (3) and (4) of the MIP models of the flow
+    and job shops: every pair of jobs j1 < j2 on every machine i, or only those of a seed (see fsp_lazy_seed, and
+    jsp_lazy_seed in JSP.py).
+    """
+    if seed is not None:
+        return zip(*(keys.tolist() for keys in seed))
+    return ((j1, j2, i) for j1 in range(instance.n - 1) for j2 in range(j1 + 1, instance.n) for i in range(instance.g))
+
+
+class Result:
+    __slots__ = ('solver', 'status', 'objective', 'bound', 'gap', 'parse_time', 'build_time', 'solve_time', 'nodes',
+                 'variables', 'constraints', 'nonzeros', 'schedule', 'trajectory', 'families')
+
+    def __init__(self, solver):
+        self.solver = solver  # the solver that produced the result
+        self.status = 'no_solution'  # 'optimal', 'feasible', 'infeasible' or 'no_solution' (none found within the limits)
+        self.objective = None  # the makespan of the best solution found
+        self.bound = None  # the best lower bound on the makespan
+        self.gap = None  # the relative gap between the objective and the bound
+        self.parse_time = 0.0  # the wall time spent reading the instance (in seconds)
+        self.build_time = 0.0  # the wall time spent building the model (in seconds)
+        self.solve_time = 0.0  # the wall time spent in the solver (in seconds)
+        self.nodes = None  # the number of nodes (MIP) or branches (CP) explored
+        self.variables = None  # the number of variables of the model
+        self.constraints = None  # the number of constraints of the model
+        self.nonzeros = None  # the number of nonzero constraint coefficients (MIP only)
+        self.schedule = []  # (job, operation, machine, start, end) of every operation in the best solution
+        self.trajectory = []  # (seconds into the solve, incumbent objective, bound) whenever either improved
+        self.families = []  # (family, rows, nonzeros, big-M rows, build seconds) of every constraint family (MIP only)
+
+    def __repr__(self):
+        return f'Result(solver={self.solver!r}, status={self.status!r}, objective={self.objective}, bound={self.bound})'
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def cplex_result(result, mdl, lower_bound=None):
+    """
+    Read the status, objective, bound, gap, node count and size of a solved CPLEX model into result. A solution that
+    reaches lower_bound is optimal; a shared bound also receives the final objective and bound.
+    """
+    status = mdl.solution.get_status()
+    cutoff = mdl.parameters.mip.tolerances.uppercutoff.get()
+    if mdl.solution.is_primal_feasible():
+        result.status = 'optimal' if status in (mdl.solution.status.MIP_optimal, mdl.solution.status.optimal_tolerance) else 'feasible'
+        result.objective = mdl.solution.get_objective_value()
+        result.gap = mdl.solution.MIP.get_mip_relative_gap()
+    elif status == mdl.solution.status.MIP_infeasible and cutoff >= 1e75:
+        result.status = 'infeasible'
+    result.bound = mdl.solution.MIP.get_best_objective()
+    if status == mdl.solution.status.MIP_infeasible and cutoff < 1e75:
+        # the cutoff (see mip_cutoff) pruned every schedule, so none is better than it
+        result.bound = cutoff
+    if status == mdl.solution.status.MIP_optimal:
+        # the search tree is closed, but the best bound CPLEX reports then can lag behind the incumbent
+        result.bound = max(result.bound, result.objective)
+        result.gap = 0.0
+    result.nodes = mdl.solution.progress.get_num_nodes_processed()
+    result.variables = mdl.variables.get_num()
+    result.constraints = mdl.linear_constraints.get_num()
+    result.nonzeros = mdl.linear_constraints.get_num_nonzeros()
+    if result.status != 'infeasible':
+        report_progress(lower_bound, result.objective, result.bound)
+    reached_bound(result, lower_bound)
+    record_progress(result, result.solve_time, result.objective, result.bound)
+
+
+def gurobi_result(result, mdl, lower_bound=None):
+    """
+    Read the status, objective, bound, gap, node count and size of a solved Gurobi model into result. A solution
+    that reaches lower_bound is optimal; a shared bound also receives the final objective and bound.
+    """
+    if mdl.SolCount > 0:
+        result.status = 'optimal' if mdl.status == GRB.OPTIMAL else 'feasible'
+        result.objective = mdl.ObjVal
+        result.gap = mdl.MIPGap
+    elif mdl.status in (GRB.INFEASIBLE, GRB.INF_OR_UNBD):
+        result.status = 'infeasible'
+    if result.status != 'infeasible':
+        result.bound = mdl.ObjBound
+    result.nodes = int(mdl.NodeCount)
+    result.variables = mdl.NumVars
+    result.constraints = mdl.NumConstrs
+    result.nonzeros = mdl.NumNZs
+    if result.status != 'infeasible':
+        report_progress(lower_bound, result.objective, result.bound)
+    reached_bound(result, lower_bound)
+    record_progress(result, result.solve_time, result.objective, result.bound)
+
+
+def cp_result(result, solution, lower_bound=None):
+    """
+    Read the status, objective, bound, gap, branch count and size of a CP Optimizer solve result into result. A
+    solution that reaches lower_bound is optimal; a shared bound also receives the final objective and bound.
+    """
+    status = solution.get_solve_status()
+    if solution:
+        result.status = 'optimal' if status == 'Optimal' else 'feasible'
+        result.objective = solution.get_objective_value()
+        result.gap = solution.get_objective_gap()
+    elif status == 'Infeasible':
+        result.status = 'infeasible'
+    result.bound = solution.get_objective_bound()
+    infos = solution.get_solver_infos()
+    result.nodes = infos.get('NumberOfBranches')
+    result.variables = infos.get('NumberOfVariables')
+    result.constraints = infos.get('NumberOfConstraints')
+    if result.status != 'infeasible':
+        report_progress(lower_bound, result.objective, result.bound)
+    reached_bound(result, lower_bound)
+    record_progress(result, result.solve_time, result.objective, result.bound)
+
+
+def bound_value(lower_bound):
+    """
+    Return the current value of lower_bound: a number, or a shared bound (see portfolio.py) whose value attribute holds
+    the best lower bound known so far, and which may grow while the solver runs.
+    """
+    return getattr(lower_bound, 'value', lower_bound)
+
+
+def record_progress(result, elapsed, objective, bound):
+    """
+    Append a point (elapsed seconds since the solve started, incumbent objective, bound) to the trajectory of result if
+    the incumbent improved or the bound, rounded up to an integer makespan, grew since the last point. objective is
+    None while there is no incumbent.
+    """
+    last_time, last_objective, last_bound = result.trajectory[-1] if result.trajectory else (0.0, None, None)
+    if objective is None or last_objective is not None and objective >= last_objective - 1e-6:
+        objective = last_objective
+    bound = math.ceil(bound - 1e-6) if bound is not None and bound > 0 else None
+    if bound is None or last_bound is not None and bound <= last_bound:
+        bound = last_bound
+    if (objective, bound) != (last_objective, last_bound):
+        result.trajectory.append((round(max(elapsed, last_time), 3), objective, bound))
+
+
+def reached_bound(result, lower_bound):
+    """
+    Report result as optimal if its objective reached lower_bound, a proven lower bound on the makespan.
+    """
+    lower_bound = bound_value(lower_bound)
+    if lower_bound is not None and result.objective is not None and result.objective <= lower_bound + 1e-6:
+        result.status = 'optimal'
+        result.bound = lower_bound
+        result.gap = 0.0
+
+
+def report_progress(lower_bound, objective, bound):
+    """
+    Pass the incumbent objective (None if there is none yet) and the bound of a running search on to lower_bound if it
+    is a shared bound that collects them.
+    """
+    if hasattr(lower_bound, 'report'):
+        lower_bound.report(objective, bound)
+
+
+def reached(objective, lower_bound):
+    """
+    Return whether an incumbent objective (None if there is none) reached lower_bound, if any.
+    """
+    return objective is not None and lower_bound is not None and objective <= bound_value(lower_bound) + 1e-6
+
+
+def shared_incumbent(lower_bound):
+    """
+    Return the best incumbent objective found by any racer if lower_bound is a shared bound that collects them (see
+    portfolio.py), else None.
+    """
+    return getattr(lower_bound, 'incumbent', None)
+
+
+def can_stop(objective, lower_bound):
+    """
+    Return whether a search whose incumbent objective (None if there is none) reached lower_bound can stop, or, for a
+    shared bound, whether the best incumbent of any racer reached it, so that no racer can improve on that incumbent.
+    """
+    return reached(objective, lower_bound) or reached(shared_incumbent(lower_bound), lower_bound)
+
+
+def mip_cutoff(mdl, lower_bound):
+    """
+    Set the cutoff of a CPLEX or Gurobi model about to be solved to the best incumbent the other racers of a shared
+    bound found so far (e.g. while the model was built), so that the search only looks for better schedules. Makespans
+    are integers, so the cutoff is half a unit below the incumbent.
+    """
+    incumbent = shared_incumbent(lower_bound)
+    if incumbent is None:
+        return
+    if isinstance(mdl, gp.Model):
+        mdl.setParam('Cutoff', incumbent - 0.5)
+    else:
+        mdl.parameters.mip.tolerances.uppercutoff.set(incumbent - 0.5)
+
+
+class CplexProgressCallback(cplex.callbacks.MIPInfoCallback):
+    """
+    Record the trajectory of the incumbent and the bound of the CPLEX search in result, and abort the search as soon
+    as it can stop (see can_stop; a shared bound also receives the incumbent and the bound). result and lower_bound
+    are set after registering the callback.
+    """
+    result = None
+    lower_bound = None
+
+    def __call__(self):
+        incumbent = self.get_incumbent_objective_value() if self.has_incumbent() else None
+        bound = self.get_best_objective_value()
+        record_progress(self.result, self.get_time() - self.get_start_time(), incumbent, bound)
+        report_progress(self.lower_bound, incumbent, bound)
+        if can_stop(incumbent, self.lower_bound):
+            self.abort()
+
+
+def gurobi_progress_callback(result, lower_bound):
+    """
+    Return a Gurobi callback that records the trajectory of the incumbent and the bound of the search in result, and
+    terminates the search as soon as it can stop (see can_stop; a shared bound also receives the incumbent and the
+    bound).
+    """
+    def callback(mdl, where):
+        if where == GRB.Callback.MIP:
+            incumbent = mdl.cbGet(GRB.Callback.MIP_OBJBST)
+            incumbent = incumbent if incumbent < GRB.INFINITY else None
+            bound = mdl.cbGet(GRB.Callback.MIP_OBJBND)
+            record_progress(result, mdl.cbGet(GRB.Callback.RUNTIME), incumbent, bound)
+            report_progress(lower_bound, incumbent, bound)
+            if can_stop(incumbent, lower_bound):
+                mdl.terminate()
+        elif where == GRB.Callback.MIPSOL:
+            incumbent = mdl.cbGet(GRB.Callback.MIPSOL_OBJ)
+            record_progress(result, mdl.cbGet(GRB.Callback.RUNTIME), incumbent, mdl.cbGet(GRB.Callback.MIPSOL_OBJBND))
+            if can_stop(incumbent, lower_bound):
+                mdl.terminate()
+    return callback
+
+
+class CpProgressCallback(CpoCallback):
+    """
+    Record the trajectory of the objective and the bound of the CP Optimizer search in result, and abort the search as
+    soon as it can stop (see can_stop; a shared bound also receives the objective and the bound). A shared bound can
+    grow without a new solution, so it is also checked on the periodic events of the search.
+    """
+    def __init__(self, result, lower_bound):
+        self.result = result
+        self.lower_bound = lower_bound
+        self.start = time.perf_counter()
+        self.objective = None  # the best objective found so far
+
+    def invoke(self, solver, event, sres):
+        if event in ('Solution', 'ObjBound'):
+            if event == 'Solution':
+                self.objective = sres.get_objective_value()
+            bound = sres.get_objective_bound()
+            record_progress(self.result, time.perf_counter() - self.start, self.objective, bound)
+            report_progress(self.lower_bound, self.objective, bound)
+        elif event != 'Periodic':
+            return
+        if can_stop(self.objective, self.lower_bound):
+            solver.abort_search()
+
+
+class FamilySizes:
+    """
+    The rows, nonzeros, big-M rows and Python build time of every constraint family of a MIP model, collected while the
+    model is built: each family is closed after its last row with the rows and nonzeros of the model so far. A model
+    read from the model cache starts from the families stored with it.
+    """
+
+    def __init__(self, families=()):
+        self.families = list(families)  # (family, rows, nonzeros, big-M rows, build seconds)
+        self.rows = 0
+        self.nonzeros = 0
+        self.tic = time.perf_counter()
+
+    def close(self, family, rows, nonzeros, big_m=False):
+        toc = time.perf_counter()
+        self.families.append((family, rows - self.rows, nonzeros - self.nonzeros, rows - self.rows if big_m else 0, toc - self.tic))
+        self.rows, self.nonzeros, self.tic = rows, nonzeros, toc
+
+    def close_cplex(self, family, constrs, big_m=False):
+        """
+        Close a family whose rows were appended to constrs, the [variables, coefficients] rows of a CPLEX model.
+        """
+        self.close(family, len(constrs), self.nonzeros + sum(len(row[0]) for row in constrs[self.rows:]), big_m)
+
+    def close_gurobi(self, family, mdl, big_m=False):
+        """
+        Close a family whose rows were added to a Gurobi model.
+        """
+        mdl.update()
+        self.close(family, mdl.NumConstrs, mdl.NumNZs, big_m)
+
+    def report(self, result):
+        """
+        Store the families in result and print them, before the solve starts.
+        """
+        result.families = self.families
+        for family, rows, nonzeros, big_m, seconds in self.families:
+            print(f'{family}: {rows} rows, {nonzeros} nonzeros, {big_m} big-M rows, built in {seconds:.3f} s')
+
+
+class Disjunctions:
+    """
+    The disjunctive constraints (3) and (4) of a MIP model in lazy mode, for every pair k of jobs J1[k] < J2[k] and
+    every machine i, where c_columns[j, i] and x_columns[k, i] are the columns of the variables c and x in the solution
+    vectors of the solver callbacks and p[j, i] is the processing time of job j on machine i. The model only holds the
+    rows of a seed, and the callbacks add the rows that a candidate solution violates: at an integer solution only one
+    side of every disjunction can bind, so most of the rows are never built.
+    """
+
+    def __init__(self, J1, J2, c_columns, x_columns, p, M):
+        self.J1, self.J2 = J1, J2
+        self.c_columns = c_columns
+        self.x_columns = x_columns
+        self.p = np.asarray(p, dtype=np.float64)
+        self.M = M
+
+    def violated(self, values, tolerance=1e-5):
+        """
+        Return the columns, coefficients and right-hand sides (of >= rows) of the constraints (3) and (4) that the
+        solution values violate by more than tolerance, which is above the feasibility tolerance of the solvers, so a
+        row that is added always cuts off the candidate.
+        """
+        c = values[self.c_columns]
+        x = values[self.x_columns]
+        gap = c[self.J1] - c[self.J2]
+        k3, i3 = np.nonzero(gap - self.M * x < self.p[self.J1] - self.M - tolerance)
+        k4, i4 = np.nonzero(self.M * x - gap < self.p[self.J2] - tolerance)
+        columns = np.concatenate([
+            np.stack([self.c_columns[self.J1[k3], i3], self.c_columns[self.J2[k3], i3], self.x_columns[k3, i3]], axis=-1),
+            np.stack([self.c_columns[self.J2[k4], i4], self.c_columns[self.J1[k4], i4], self.x_columns[k4, i4]], axis=-1),
+        ])
+        coefficients = np.concatenate([np.tile([1, -1, -self.M], (len(k3), 1)), np.tile([1, -1, self.M], (len(k4), 1))])
+        rhs = np.concatenate([self.p[self.J1[k3], i3] - self.M, self.p[self.J2[k4], i4]])
+        return columns, coefficients, rhs
+
+
+class CplexDisjunctionCallback(cplex.callbacks.LazyConstraintCallback):
+    """
+    Add the disjunctive constraints that a candidate solution violates to the CPLEX search, in lazy mode (see
+    Disjunctions). disjunctions is set after registering the callback.
+    """
+    disjunctions = None
+
+    def __call__(self):
+        columns, coefficients, rhs = self.disjunctions.violated(np.asarray(self.get_values()))
+        for row in range(len(rhs)):
+            self.add(constraint=cplex.SparsePair(ind=columns[row].tolist(), val=coefficients[row].tolist()), sense='G', rhs=float(rhs[row]))
+
+
+def gurobi_disjunction_callback(disjunctions, variables, callback):
+    """
+    Return a Gurobi callback that adds the disjunctive constraints that a candidate solution violates as lazy
+    constraints, in lazy mode (see Disjunctions; the model needs LazyConstraints=1), where variables are the variables
+    of the model in column order. Every other call is passed on to callback, and so is every candidate that violates
+    none (a rejected candidate never becomes the incumbent).
+    """
+    def lazy_callback(mdl, where):
+        if where == GRB.Callback.MIPSOL:
+            columns, coefficients, rhs = disjunctions.violated(np.asarray(mdl.cbGetSolution(variables)))
+            for row in range(len(rhs)):
+                mdl.cbLazy(gp.LinExpr(coefficients[row].tolist(), [variables[column] for column in columns[row]]) >= float(rhs[row]))
+            if len(rhs):
+                return
+        callback(mdl, where)
+    return lazy_callback
+
+
+def gurobi_variables(mdl):
+    """
+    Return the variables of a Gurobi model read from a file as {family: {key: variable}}, where the key is the tuple of
+    indices in the name of the variable (c_3_1 is c[(3, 1)]) and a family without indices maps to its variable (Cmax).
+    """
+    variables = {}
+    all_vars = mdl.getVars()
+    for var, name in zip(all_vars, mdl.getAttr('VarName', all_vars)):
+        family, *indices = name.split('_')
+        if indices:
+            variables.setdefault(family, {})[tuple(map(int, indices))] = var
+        else:
+            variables[family] = var
+    return variables
+
+
+def sparse_rows(columns, coefficients, num_vars):
+    """
+    Return the CSR matrix with one row per entry of columns[..., :] (a fixed number of nonzeros per row), whose
+    coefficients coefficients[..., :] are broadcast against columns.
+    """
+    columns = np.asarray(columns)
+    coefficients = np.broadcast_to(coefficients, columns.shape)
+    width = columns.shape[-1]
+    return sp.csr_matrix((coefficients.ravel(), columns.ravel(), np.arange(0, columns.size + 1, width)), shape=(columns.size // width, num_vars))
@@ -1,129 +1,246 @@
+import importlib
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import cplex
 import gurobipy as gp
 from gurobipy import GRB
 from docplex.cp.model import CpoModel
 
+# the code shared by the model scripts lives in common.py at the top of the repository
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import CACHE_MIN_SIZE, read_integers, read_cache, write_cache, fsp_makespan, fsp_completion_times, fsp_insertion_makespans, neh, Result, cplex_result, gurobi_result, cp_result, reached_bound, CplexProgressCallback, gurobi_progress_callback, mip_cutoff, CpProgressCallback, FamilySizes, gurobi_variables, sparse_rows
+
 
 class DFSP:
+    __slots__ = ('n', 'g', 'f', 'p')
+
     def __init__(self):
         self.n = 0  # the number of jobs
         self.g = 0  # the number of stages
         self.f = 0  # the number of factories
-        self.p = []  # the set of processing times
+        self.p = np.zeros((0, 0), dtype=np.int32)  # the set of processing times, p[j][i]
 
 
-def parser(file_path):
-    instance = DFSP()
+def read_text(file_path):
+    """
+    Parse an instance file in bulk: the header lines one by one and the rest of the file as one block of integers.
+    """
     with open(file_path, 'r') as f:
-        instance.n = int(f.readline().strip().split()[0])
-        instance.g = int(f.readline().strip().split()[0])
-        instance.f = int(f.readline().strip().split()[0])
-        instance.p = []
-        for _ in range(instance.n):
-            instance.p.append([int(x) for x in f.readline().strip().split()])
+        n = int(f.readline().strip().split()[0])
+        g = int(f.readline().strip().split()[0])
+        factories = int(f.readline().strip().split()[0])
+        body = read_integers(f, n * g, file_path)
+    return {'f': np.int32(factories), 'p': body[:n * g].reshape(n, g)}
+
+
+def parser(file_path, cache=True):
+    # opening an .npz archive costs more than parsing a small file, so only large files are cached
+    cache = cache and os.path.getsize(file_path) >= CACHE_MIN_SIZE
+    arrays = read_cache(file_path) if cache else None
+    if arrays is None:
+        arrays = read_text(file_path)
+        if cache:
+            write_cache(file_path, arrays)
+    instance = DFSP()
+    instance.f = int(arrays['f'])
+    instance.p = arrays['p']
+    instance.n, instance.g = (int(x) for x in instance.p.shape)
     return instance
 
 
-def dfsp_mip_cplex_model(file_path, threads=1, time_limit=3600):
+def dfsp_makespan(p, factories):
+    """
+    Return the makespan of a distributed schedule given as one job sequence per factory.
+    """
+    return max([fsp_makespan(p, sequence)[0] for sequence in factories if len(sequence) > 0], default=0)
+
+
+def dfsp_neh(instance):
+    """
+    NEH2 constructive heuristic for the distributed flow shop (see neh in common.py).
+    Returns one job sequence per factory and the makespan.
+    """
+    return neh(instance.p, instance.f)
+
+
+def dfsp_mip_start(instance, start):
+    """
+    Translate one job sequence per factory into consistent values of the MIP variables x, q, c and Cmax.
+    Returns a dictionary that maps each variable family to {index: value} (Cmax maps to its value).
+    """
+    factory = {}
+    position = {}
+    c_values = {}
+    for f, sequence in enumerate(start):
+        if len(sequence) == 0:
+            continue
+        c = fsp_completion_times(instance.p, sequence)
+        for k, job in enumerate(sequence):
+            factory[job] = f
+            position[job] = k
+            for i in range(instance.g):
+                c_values[(job, i)] = int(c[k][i])
+    x_values = {(i, j1, j2): int(factory[j1] == factory[j2] and position[j1] > position[j2]) for i in range(instance.g) for j1 in range(instance.n - 1) for j2 in range(j1 + 1, instance.n)}
+    q_values = {(j, f): int(factory[j] == f) for j in range(instance.n) for f in range(instance.f)}
+    return {'x': x_values, 'q': q_values, 'c': c_values, 'Cmax': max(c_values[(j, instance.g - 1)] for j in range(instance.n))}
+
+
+def dfsp_big_m(instance, start=None):
+    """
+    Return an instance-derived big-M for the disjunctive constraints: the makespan of the NEH2 schedule, or of the MIP
+    start if that is larger (so the start stays feasible). Some optimal schedule completes every operation by then, so
+    the gap between two completion times never exceeds it.
+    """
+    horizon = dfsp_neh(instance)[1]
+    if start is not None:
+        horizon = max(horizon, int(dfsp_makespan(instance.p, start)))
+    return horizon
+
+
+def dfsp_schedule(instance, c, factory):
+    """
+    Return the (job, operation, machine, start, end) tuples of the schedule with completion times c[j][i] and factory
+    assignment factory[j], where operation i of job j is processed on machine (factory[j], i).
+    """
+    return [(j, i, (int(factory[j]), i), float(c[j][i] - instance.p[j][i]), float(c[j][i])) for j in range(instance.n) for i in range(instance.g)]
+
+
+def dfsp_mip_cplex_model(file_path, threads=1, time_limit=3600, start=None, big_m=None, names=False, model_cache=None, lower_bound=None):
+    result = Result('CPLEX')
+    tic = time.perf_counter()
     instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
 
     # create the model
     mdl = cplex.Cplex()
 
     # variable x
-    x_names = [f'x_{i}_{j1}_{j2}' for i in range(instance.g) for j1 in range(instance.n - 1) for j2 in range(j1 + 1, instance.n)]
-    x_objs = [0] * len(x_names)
-    x_lbs = [0] * len(x_names)
-    x_ubs = [1] * len(x_names)
-    x_types = ['B'] * len(x_names)
+    x_keys = [(i, j1, j2) for i in range(instance.g) for j1 in range(instance.n - 1) for j2 in range(j1 + 1, instance.n)]
+    x_objs = [0] * len(x_keys)
+    x_lbs = [0] * len(x_keys)
+    x_ubs = [1] * len(x_keys)
+    x_types = ['B'] * len(x_keys)
 
     # variable q
-    q_names = [f'q_{j}_{f}' for j in range(instance.n) for f in range(instance.f)]
-    q_objs = [0] * len(q_names)
-    q_lbs = [0] * len(q_names)
-    q_ubs = [1] * len(q_names)
-    q_types = ['B'] * len(q_names)
+    q_keys = [(j, f) for j in range(instance.n) for f in range(instance.f)]
+    q_objs = [0] * len(q_keys)
+    q_lbs = [0] * len(q_keys)
+    q_ubs = [1] * len(q_keys)
+    q_types = ['B'] * len(q_keys)
 
     # variable c
-    c_names = [f'c_{j}_{i}' for j in range(instance.n) for i in range(instance.g)]
-    c_objs = [0] * len(c_names)
-    c_lbs = [0] * len(c_names)
-    c_ubs = [float('inf')] * len(c_names)
-    c_types = ['C'] * len(c_names)
+    c_keys = [(j, i) for j in range(instance.n) for i in range(instance.g)]
+    c_objs = [0] * len(c_keys)
+    c_lbs = [0] * len(c_keys)
+    c_ubs = [float('inf')] * len(c_keys)
+    c_types = ['C'] * len(c_keys)
 
     # variable Cmax
-    Cmax_name = ['Cmax']
     Cmax_obj = [1]
     Cmax_lb = [0]
     Cmax_ub = [float('inf')]
     Cmax_type = ['C']
 
-    # constraints
-    constrs = []
-    senses = []
-    rhs = []
-
-    # constraint (1)
-    for j in range(instance.n):
-        variables = [f'c_{j}_{0}']
-        coefficients = [1]
-        constrs.append([variables, coefficients])
-        senses.append('G')
-        rhs.append(instance.p[j][0])
-
-    # constraint (2)
-    for j in range(instance.n):
-        for i in range(1, instance.g):
-            variables = [f'c_{j}_{i}', f'c_{j}_{i - 1}']
+    # variable indices
+    x_ids = {key: index for index, key in enumerate(x_keys)}
+    q_ids = {key: len(x_keys) + index for index, key in enumerate(q_keys)}
+    c_ids = {key: len(x_keys) + len(q_keys) + index for index, key in enumerate(c_keys)}
+    Cmax_id = len(x_keys) + len(q_keys) + len(c_keys)
+
+    # read the model from the model cache, or else build it
+    M = dfsp_big_m(instance, start) if big_m is None else big_m
+    model_file, cached = (None, False) if model_cache is None else model_cache.lookup(dfsp_mip_cplex_model, file_path, '.sav', M, names)
+    if cached:
+        mdl.read(model_file)
+        FamilySizes(model_cache.families(model_file)).report(result)
+    else:
+        # constraints
+        constrs = []
+        senses = []
+        rhs = []
+        sizes = FamilySizes()
+
+        # constraint (1)
+        for j in range(instance.n):
+            variables = [c_ids[(j, 0)]]
+            coefficients = [1]
+            constrs.append([variables, coefficients])
+            senses.append('G')
+            rhs.append(int(instance.p[j][0]))
+        sizes.close_cplex('constraint (1)', constrs)
+
+        # constraint (2)
+        for j in range(instance.n):
+            for i in range(1, instance.g):
+                variables = [c_ids[(j, i)], c_ids[(j, i - 1)]]
+                coefficients = [1, -1]
+                constrs.append([variables, coefficients])
+                senses.append('G')
+                rhs.append(int(instance.p[j][i]))
+        sizes.close_cplex('constraint (2)', constrs)
+
+        # constraint (3)
+        for j in range(instance.n):
+            variables = [q_ids[(j, f)] for f in range(instance.f)]
+            coefficients = [1] * instance.f
+            constrs.append([variables, coefficients])
+            senses.append('E')
+            rhs.append(1)
+        sizes.close_cplex('constraint (3)', constrs)
+
+        # constraints (4) and (5)
+        for j1 in range(instance.n - 1):
+            for j2 in range(j1 + 1, instance.n):
+                for i in range(instance.g):
+                    for f in range(instance.f):
+                        variables = [c_ids[(j1, i)], c_ids[(j2, i)], x_ids[(i, j1, j2)], q_ids[(j1, f)], q_ids[(j2, f)]]
+                        coefficients = [1, -1, -M, -M, -M]
+                        constrs.append([variables, coefficients])
+                        senses.append('G')
+                        rhs.append(int(instance.p[j1][i]) - 3 * M)
+
+                        variables = [c_ids[(j2, i)], c_ids[(j1, i)], x_ids[(i, j1, j2)], q_ids[(j1, f)], q_ids[(j2, f)]]
+                        coefficients = [1, -1, M, -M, -M]
+                        constrs.append([variables, coefficients])
+                        senses.append('G')
+                        rhs.append(int(instance.p[j2][i]) - 2 * M)
+        sizes.close_cplex('constraints (4) and (5)', constrs, big_m=True)
+
+        # constraint (6)
+        for j in range(instance.n):
+            variables = [Cmax_id, c_ids[(j, instance.g - 1)]]
             coefficients = [1, -1]
             constrs.append([variables, coefficients])
             senses.append('G')
-            rhs.append(instance.p[j][i])
-
-    # constraint (3)
-    for j in range(instance.n):
-        variables = [f'q_{j}_{f}' for f in range(instance.f)]
-        coefficients = [1] * instance.f
-        constrs.append([variables, coefficients])
-        senses.append('E')
-        rhs.append(1)
-
-    # constraints (4) and (5)
-    M = 100000
-    for j1 in range(instance.n - 1):
-        for j2 in range(j1 + 1, instance.n):
-            for i in range(instance.g):
-                for f in range(instance.f):
-                    variables = [f'c_{j1}_{i}', f'c_{j2}_{i}', f'x_{i}_{j1}_{j2}', f'q_{j1}_{f}', f'q_{j2}_{f}']
-                    coefficients = [1, -1, -M, -M, -M]
-                    constrs.append([variables, coefficients])
-                    senses.append('G')
-                    rhs.append(instance.p[j1][i] - 3 * M)
-
-                    variables = [f'c_{j2}_{i}', f'c_{j1}_{i}', f'x_{i}_{j1}_{j2}', f'q_{j1}_{f}', f'q_{j2}_{f}']
-                    coefficients = [1, -1, M, -M, -M]
-                    constrs.append([variables, coefficients])
-                    senses.append('G')
-                    rhs.append(instance.p[j2][i] - 2 * M)
-
-    # constraint (6)
-    for j in range(instance.n):
-        variables = ['Cmax', f'c_{j}_{instance.g - 1}']
-        coefficients = [1, -1]
-        constrs.append([variables, coefficients])
-        senses.append('G')
-        rhs.append(0)
-
-    # add variables
-    all_names = x_names + q_names + c_names + Cmax_name
-    all_objs = x_objs + q_objs + c_objs + Cmax_obj
-    all_lbs = x_lbs + q_lbs + c_lbs + Cmax_lb
-    all_ubs = x_ubs + q_ubs + c_ubs + Cmax_ub
-    all_types = x_types + q_types + c_types + Cmax_type
-    mdl.variables.add(obj=all_objs, lb=all_lbs, ub=all_ubs, names=all_names, types=all_types)
-
-    # add constraints
-    mdl.linear_constraints.add(lin_expr=constrs, senses=senses, rhs=rhs)
+            rhs.append(0)
+        sizes.close_cplex('constraint (6)', constrs)
+        sizes.report(result)
+
+        # add variables
+        all_objs = x_objs + q_objs + c_objs + Cmax_obj
+        all_lbs = x_lbs + q_lbs + c_lbs + Cmax_lb
+        all_ubs = x_ubs + q_ubs + c_ubs + Cmax_ub
+        all_types = x_types + q_types + c_types + Cmax_type
+        mdl.variables.add(obj=all_objs, lb=all_lbs, ub=all_ubs, types=all_types)
+        if names:
+            all_names = [f'x_{i}_{j1}_{j2}' for i, j1, j2 in x_keys] + [f'q_{j}_{f}' for j, f in q_keys] + [f'c_{j}_{i}' for j, i in c_keys] + ['Cmax']
+            mdl.variables.set_names(list(enumerate(all_names)))
+
+        # add constraints
+        mdl.linear_constraints.add(lin_expr=constrs, senses=senses, rhs=rhs)
+        if model_cache is not None:
+            model_cache.store(model_file, mdl.write, sizes.families)
+
+    # add the MIP start
+    if start is not None:
+        values = dfsp_mip_start(instance, start)
+        start_indices = [x_ids[key] for key in values['x']] + [q_ids[key] for key in values['q']] + [c_ids[key] for key in values['c']] + [Cmax_id]
+        start_values = list(values['x'].values()) + list(values['q'].values()) + list(values['c'].values()) + [values['Cmax']]
+        mdl.MIP_starts.add(cplex.SparsePair(ind=start_indices, val=start_values), mdl.MIP_starts.effort_level.auto)
 
     # set the objective sense
     mdl.objective.set_sense(mdl.objective.sense.minimize)
@@ -132,85 +249,252 @@ def dfsp_mip_cplex_model(file_path, threads=1, time_limit=3600):
     mdl.set_warning_stream(None)
     mdl.parameters.threads.set(threads)
     mdl.parameters.timelimit.set(time_limit)
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    callback = mdl.register_callback(CplexProgressCallback)
+    callback.result, callback.lower_bound = result, lower_bound
+    mip_cutoff(mdl, lower_bound)
+    tic = time.perf_counter()
     mdl.solve()
-
-    if mdl.solution.is_primal_feasible():
-        Cmax = mdl.solution.get_values('Cmax')
-        print(f'Optimal objective value (CPLEX): {Cmax}')
+    result.solve_time = time.perf_counter() - tic
+    cplex_result(result, mdl, lower_bound)
+
+    if result.objective is not None:
+        values = mdl.solution.get_values()
+        c = [[values[c_ids[(j, i)]] for i in range(instance.g)] for j in range(instance.n)]
+        factory = [max(range(instance.f), key=lambda f: values[q_ids[(j, f)]]) for j in range(instance.n)]
+        result.schedule = dfsp_schedule(instance, c, factory)
+        print(f'Optimal objective value (CPLEX): {result.objective}')
     else:
         print('No feasible solution found by CPLEX!')
 
+    return result
 
-def dfsp_mip_gurobi_model(file_path, threads=1, time_limit=3600):
-    instance = parser(file_path)
 
-    # create the model
-    mdl = gp.Model()
+def dfsp_mip_gurobi_model(file_path, threads=1, time_limit=3600, start=None, big_m=None, model_cache=None, lower_bound=None):
+    result = Result('Gurobi')
+    tic = time.perf_counter()
+    instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
+
+    # read the model from the model cache, or else build it
+    M = dfsp_big_m(instance, start) if big_m is None else big_m
+    model_file, cached = (None, False) if model_cache is None else model_cache.lookup(dfsp_mip_gurobi_model, file_path, '.mps.bz2', M)
+    if cached:
+        mdl = gp.read(model_file)
+        FamilySizes(model_cache.families(model_file)).report(result)
+        variables = gurobi_variables(mdl)
+        x_vars, q_vars, c_vars, Cmax = variables['x'], variables['q'], variables['c'], variables['Cmax']
+    else:
+        # create the model
+        mdl = gp.Model()
+
+        # variable x
+        x_vars = {}
+        for j1 in range(instance.n - 1):
+            for j2 in range(j1 + 1, instance.n):
+                for i in range(instance.g):
+                    x_vars[(i, j1, j2)] = mdl.addVar(vtype=GRB.BINARY, name=f'x_{i}_{j1}_{j2}')
+
+        # variable q
+        q_vars = {}
+        for j in range(instance.n):
+            for f in range(instance.f):
+                q_vars[(j, f)] = mdl.addVar(vtype=GRB.BINARY, name=f'q_{j}_{f}')
 
-    # variable x
-    x_vars = {}
-    for j1 in range(instance.n - 1):
-        for j2 in range(j1 + 1, instance.n):
+        # variable c
+        c_vars = {}
+        for j in range(instance.n):
             for i in range(instance.g):
-                x_vars[(i, j1, j2)] = mdl.addVar(vtype=GRB.BINARY, name=f'x_{i}_{j1}_{j2}')
-
-    # variable q
-    q_vars = {}
-    for j in range(instance.n):
-        for f in range(instance.f):
-            q_vars[(j, f)] = mdl.addVar(vtype=GRB.BINARY, name=f'q_{j}_{f}')
-
-    # variable c
-    c_vars = {}
-    for j in range(instance.n):
-        for i in range(instance.g):
-            c_vars[(j, i)] = mdl.addVar(vtype=GRB.CONTINUOUS, name=f'c_{j}_{i}', lb=0)
-
-    # variable Cmax
-    Cmax = mdl.addVar(vtype=GRB.CONTINUOUS, name='Cmax', lb=0)
-
-    # constraint (1)
-    for j in range(instance.n):
-        mdl.addConstr(c_vars[(j, 0)] >= instance.p[j][0], name=f'constr1_{j}')
+                c_vars[(j, i)] = mdl.addVar(vtype=GRB.CONTINUOUS, name=f'c_{j}_{i}', lb=0)
+
+        # variable Cmax
+        Cmax = mdl.addVar(vtype=GRB.CONTINUOUS, name='Cmax', lb=0)
+
+        # constraint families
+        sizes = FamilySizes()
+
+        # constraint (1)
+        for j in range(instance.n):
+            mdl.addConstr(c_vars[(j, 0)] >= instance.p[j][0], name=f'constr1_{j}')
+        sizes.close_gurobi('constraint (1)', mdl)
+
+        # constraint (2)
+        for j in range(instance.n):
+            for i in range(1, instance.g):
+                mdl.addConstr(c_vars[(j, i)] >= c_vars[(j, i - 1)] + instance.p[j][i], name=f'constr2_{j}_{i}')
+        sizes.close_gurobi('constraint (2)', mdl)
+
+        # constraint (3)
+        for j in range(instance.n):
+            mdl.addConstr(gp.quicksum(q_vars[(j, f)] for f in range(instance.f)) == 1, name=f'constr3_{j}')
+        sizes.close_gurobi('constraint (3)', mdl)
+
+        # constraint (4) and (5)
+        for j1 in range(instance.n - 1):
+            for j2 in range(j1 + 1, instance.n):
+                for i in range(instance.g):
+                    for f in range(instance.f):
+                        mdl.addConstr(c_vars[(j1, i)] >= c_vars[(j2, i)] + instance.p[j1][i] - M * (3 - x_vars[(i, j1, j2)] - q_vars[(j1, f)] - q_vars[(j2, f)]), name=f'constr4_{j1}_{j2}_{i}_{f}')
+                        mdl.addConstr(c_vars[(j2, i)] >= c_vars[(j1, i)] + instance.p[j2][i] - M * (2 + x_vars[(i, j1, j2)] - q_vars[(j1, f)] - q_vars[(j2, f)]), name=f'constr5_{j1}_{j2}_{i}_{f}')
+        sizes.close_gurobi('constraints (4) and (5)', mdl, big_m=True)
+
+        # constraint (6)
+        for j in range(instance.n):
+            mdl.addConstr(Cmax >= c_vars[(j, instance.g - 1)], name=f'constr6_{j}')
+        sizes.close_gurobi('constraint (6)', mdl)
+        sizes.report(result)
+
+        # set the objective
+        mdl.setObjective(Cmax, GRB.MINIMIZE)
+        if model_cache is not None:
+            model_cache.store(model_file, mdl.write, sizes.families)
+
+    # set the MIP start
+    if start is not None:
+        values = dfsp_mip_start(instance, start)
+        for key, value in values['x'].items():
+            x_vars[key].Start = value
+        for key, value in values['q'].items():
+            q_vars[key].Start = value
+        for key, value in values['c'].items():
+            c_vars[key].Start = value
+        Cmax.Start = values['Cmax']
 
-    # constraint (2)
-    for j in range(instance.n):
-        for i in range(1, instance.g):
-            mdl.addConstr(c_vars[(j, i)] >= c_vars[(j, i - 1)] + instance.p[j][i], name=f'constr2_{j}_{i}')
+    # solve the model
+    mdl.setParam('Threads', threads)
+    mdl.setParam('TimeLimit', time_limit)
+    mip_cutoff(mdl, lower_bound)
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    tic = time.perf_counter()
+    mdl.optimize(gurobi_progress_callback(result, lower_bound))
+    result.solve_time = time.perf_counter() - tic
+    gurobi_result(result, mdl, lower_bound)
+
+    if result.objective is not None:
+        c = [[c_vars[(j, i)].X for i in range(instance.g)] for j in range(instance.n)]
+        factory = [max(range(instance.f), key=lambda f: q_vars[(j, f)].X) for j in range(instance.n)]
+        result.schedule = dfsp_schedule(instance, c, factory)
+        print(f'Optimal objective value (Gurobi): {result.objective}')
+    else:
+        print('No feasible solution found by Gurobi!')
 
-    # constraint (3)
-    for j in range(instance.n):
-        mdl.addConstr(gp.quicksum(q_vars[(j, f)] for f in range(instance.f)) == 1, name=f'constr3_{j}')
+    return result
 
-    # constraint (4) and (5)
-    M = 100000
-    for j1 in range(instance.n - 1):
-        for j2 in range(j1 + 1, instance.n):
-            for i in range(instance.g):
-                for f in range(instance.f):
-                    mdl.addConstr(c_vars[(j1, i)] >= c_vars[(j2, i)] + instance.p[j1][i] - M * (3 - x_vars[(i, j1, j2)] - q_vars[(j1, f)] - q_vars[(j2, f)]), name=f'constr4_{j1}_{j2}_{i}_{f}')
-                    mdl.addConstr(c_vars[(j2, i)] >= c_vars[(j1, i)] + instance.p[j2][i] - M * (2 + x_vars[(i, j1, j2)] - q_vars[(j1, f)] - q_vars[(j2, f)]), name=f'constr5_{j1}_{j2}_{i}_{f}')
 
-    # constraint (6)
-    for j in range(instance.n):
-        mdl.addConstr(Cmax >= c_vars[(j, instance.g - 1)], name=f'constr6_{j}')
-
-    # set the objective
-    mdl.setObjective(Cmax, GRB.MINIMIZE)
+def dfsp_mip_gurobi_matrix_model(file_path, threads=1, time_limit=3600, start=None, big_m=None, model_cache=None, lower_bound=None):
+    """
+    Same model as dfsp_mip_gurobi_model (same variable and constraint order), but every variable family is one slice
+    of a single MVar and every constraint family is added at once with addMConstr from a sparse coefficient matrix.
+    """
+    result = Result('Gurobi')
+    tic = time.perf_counter()
+    instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
+    p = np.asarray(instance.p, dtype=np.float64)
+
+    # variable indices
+    J1, J2 = np.triu_indices(instance.n, 1)
+    num_x = len(J1) * instance.g
+    x_ids = np.full((instance.g, instance.n, instance.n), -1)
+    x_ids[:, J1, J2] = np.arange(num_x).reshape(len(J1), instance.g).T
+    q_ids = num_x + np.arange(instance.n * instance.f).reshape(instance.n, instance.f)
+    c_ids = num_x + instance.n * instance.f + np.arange(instance.n * instance.g).reshape(instance.n, instance.g)
+    Cmax_id = num_x + instance.n * instance.f + instance.n * instance.g
+    num_vars = Cmax_id + 1
+
+    # read the model from the model cache, or else build it
+    M = dfsp_big_m(instance, start) if big_m is None else big_m
+    model_file, cached = (None, False) if model_cache is None else model_cache.lookup(dfsp_mip_gurobi_matrix_model, file_path, '.mps.bz2', M)
+    if cached:
+        mdl = gp.read(model_file)
+        FamilySizes(model_cache.families(model_file)).report(result)
+        v = gp.MVar.fromlist(mdl.getVars())
+    else:
+        mdl = gp.Model()
+
+        # variables x, q, c and Cmax
+        vtypes = np.full(num_vars, GRB.CONTINUOUS)
+        vtypes[:num_x + instance.n * instance.f] = GRB.BINARY
+        ubs = np.full(num_vars, float('inf'))
+        ubs[:num_x + instance.n * instance.f] = 1
+        objs = np.zeros(num_vars)
+        objs[Cmax_id] = 1
+        v = mdl.addMVar(num_vars, lb=0, ub=ubs, obj=objs, vtype=vtypes)
+
+        # constraint families
+        sizes = FamilySizes()
+
+        # constraint (1)
+        mdl.addMConstr(sparse_rows(c_ids[:, :1], [1], num_vars), v, GRB.GREATER_EQUAL, p[:, 0])
+        sizes.close_gurobi('constraint (1)', mdl)
+
+        # constraint (2)
+        columns = np.stack([c_ids[:, 1:], c_ids[:, :-1]], axis=-1)
+        mdl.addMConstr(sparse_rows(columns, [1, -1], num_vars), v, GRB.GREATER_EQUAL, p[:, 1:].ravel())
+        sizes.close_gurobi('constraint (2)', mdl)
+
+        # constraint (3)
+        mdl.addMConstr(sparse_rows(q_ids, [1], num_vars), v, GRB.EQUAL, np.ones(instance.n))
+        sizes.close_gurobi('constraint (3)', mdl)
+
+        # constraints (4) and (5), interleaved per (j1, j2, i, f) as in dfsp_mip_gurobi_model
+        c1 = c_ids[J1][:, :, None]
+        c2 = c_ids[J2][:, :, None]
+        x = x_ids[:, J1, J2].T[:, :, None]
+        q1 = q_ids[J1][:, None, :]
+        q2 = q_ids[J2][:, None, :]
+        columns = np.stack([np.stack(np.broadcast_arrays(c1, c2, x, q1, q2), axis=-1), np.stack(np.broadcast_arrays(c2, c1, x, q1, q2), axis=-1)], axis=3)
+        coefficients = [[1, -1, -M, -M, -M], [1, -1, M, -M, -M]]
+        shape = (len(J1), instance.g, instance.f)
+        rhs = np.stack([np.broadcast_to(p[J1][:, :, None] - 3 * M, shape), np.broadcast_to(p[J2][:, :, None] - 2 * M, shape)], axis=3)
+        mdl.addMConstr(sparse_rows(columns, coefficients, num_vars), v, GRB.GREATER_EQUAL, rhs.ravel())
+        sizes.close_gurobi('constraints (4) and (5)', mdl, big_m=True)
+
+        # constraint (6)
+        columns = np.stack(np.broadcast_arrays(Cmax_id, c_ids[:, -1]), axis=-1)
+        mdl.addMConstr(sparse_rows(columns, [1, -1], num_vars), v, GRB.GREATER_EQUAL, np.zeros(instance.n))
+        sizes.close_gurobi('constraint (6)', mdl)
+        sizes.report(result)
+
+        # set the objective sense
+        mdl.ModelSense = GRB.MINIMIZE
+        if model_cache is not None:
+            model_cache.store(model_file, mdl.write, sizes.families)
+
+    # set the MIP start
+    if start is not None:
+        values = dfsp_mip_start(instance, start)
+        start_values = np.zeros(num_vars)
+        for key, value in values['x'].items():
+            start_values[x_ids[key]] = value
+        for key, value in values['q'].items():
+            start_values[q_ids[key]] = value
+        for key, value in values['c'].items():
+            start_values[c_ids[key]] = value
+        start_values[Cmax_id] = values['Cmax']
+        v.Start = start_values
 
     # solve the model
     mdl.setParam('Threads', threads)
     mdl.setParam('TimeLimit', time_limit)
-    mdl.optimize()
-
-    if mdl.status == GRB.OPTIMAL or mdl.status == GRB.SUBOPTIMAL:
-        Cmax_value = Cmax.X
-        print(f'Optimal objective value (Gurobi): {Cmax_value}')
+    mip_cutoff(mdl, lower_bound)
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    tic = time.perf_counter()
+    mdl.optimize(gurobi_progress_callback(result, lower_bound))
+    result.solve_time = time.perf_counter() - tic
+    gurobi_result(result, mdl, lower_bound)
+
+    if result.objective is not None:
+        values = v.X
+        result.schedule = dfsp_schedule(instance, values[c_ids], np.argmax(values[q_ids], axis=1))
+        print(f'Optimal objective value (Gurobi): {result.objective}')
     else:
         print('No feasible solution found by Gurobi!')
 
+    return result
 
-def dfsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', execfile='/Applications/CPLEX_Studio1210/cpoptimizer/bin/x86-64_osx/cpoptimizer'):
+
+def dfsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', execfile='/Applications/CPLEX_Studio1210/cpoptimizer/bin/x86-64_osx/cpoptimizer', lower_bound=None):
     """
     The execfile parameter specifies the path to the CP Optimizer executable.
     This is required to run the solver, as it defines the core binary that handles the solving process.
@@ -220,8 +504,13 @@ def dfsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', execfile
       - On Windows: 'C:\\Program Files\\IBM\\ILOG\\CPLEX_Studio1210\\cpoptimizer\\bin\\x64_win64\\cpoptimizer.exe'
       - On Linux: '/opt/ibm/ILOG/CPLEX_Studio1210/cpoptimizer/bin/x86-64_linux/cpoptimizer'
     Ensure the provided path matches the location of the installed CP Optimizer executable on your system.
+    If lower_bound (a proven lower bound on the makespan, e.g. from bounds.py) is given, the search stops as soon as a
+    solution reaches it, and that solution is reported as optimal.
     """
+    result = Result('CP Optimizer')
+    tic = time.perf_counter()
     instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
 
     # create the model
     mdl = CpoModel()
@@ -231,7 +520,7 @@ def dfsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', execfile
     for j in range(instance.n):
         tasks.append([])
         for i in range(instance.g):
-            tasks[j].append(mdl.interval_var(name=f'tasks_{j}_{i}', size=instance.p[j][i]))
+            tasks[j].append(mdl.interval_var(name=f'tasks_{j}_{i}', size=int(instance.p[j][i])))
 
     # constraint (2)
     _tasks = []
@@ -240,7 +529,7 @@ def dfsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', execfile
         for i in range(instance.g):
             _tasks[j].append([])
             for f in range(instance.f):
-                _tasks[j][i].append(mdl.interval_var(name=f'_tasks_{j}_{i}_{f}', optional=True, size=instance.p[j][i]))
+                _tasks[j][i].append(mdl.interval_var(name=f'_tasks_{j}_{i}_{f}', optional=True, size=int(instance.p[j][i])))
 
     # constraint (3)
     for j in range(instance.n):
@@ -267,17 +556,154 @@ def dfsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', execfile
     mdl.add(mdl.minimize(mdl.max([mdl.end_of(tasks[j][instance.g - 1]) for j in range(instance.n)])))
 
     # solve the model
-    result = mdl.solve(TimeLimit=time_limit, Workers=threads, LogVerbosity='Quiet', agent=agent, execfile=execfile)
-
-    if result:
-        print(f'Optimal objective value (CP Optimizer): {result.get_objective_value()}')
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    mdl.add_solver_callback(CpProgressCallback(result, lower_bound))
+    tic = time.perf_counter()
+    solution = mdl.solve(TimeLimit=time_limit, Workers=threads, LogVerbosity='Quiet', agent=agent, execfile=execfile)
+    result.solve_time = time.perf_counter() - tic
+    cp_result(result, solution, lower_bound)
+
+    if result.objective is not None:
+        c = [[solution.get_var_solution(tasks[j][i]).get_end() for i in range(instance.g)] for j in range(instance.n)]
+        factory = [next(f for f in range(instance.f) if solution.get_var_solution(_tasks[j][0][f]).is_present()) for j in range(instance.n)]
+        result.schedule = dfsp_schedule(instance, c, factory)
+        print(f'Optimal objective value (CP Optimizer): {result.objective}')
     else:
         print('No feasible solution found by CP Optimizer!')
 
+    return result
+
+
+def flow_shop_module():
+    """
+    Import the permutation flow shop script (flow shop scheduling/FSP.py) as the module FSP. Its folder is added to
+    sys.path, so that the worker processes of a process pool can import it too when they unpickle its model functions.
+    """
+    folder = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'flow shop scheduling')
+    if folder not in sys.path:
+        sys.path.append(folder)
+    return importlib.import_module('FSP')
+
+
+def write_factory_instance(file_path, p, sequence):
+    """
+    Write the jobs of one factory, in the order of sequence, as a permutation flow shop instance file.
+    """
+    with open(file_path, 'w') as f:
+        f.write(f'{len(sequence)}\n{p.shape[1]}\n')
+        f.writelines('\t'.join(map(str, p[j])) + '\t\n' for j in sequence)
+
+
+def dfsp_critical_move(p, factories, makespans):
+    """
+    Return the best move of a job out of the factory with the largest makespan, as (job, target factory, position,
+    makespan of the source without the job, makespan of the target with it), or None if no move shortens the makespan
+    of that factory without making the target as long. Each job is tried at every position of every other factory at
+    once with Taillard's acceleration.
+    """
+    critical = int(np.argmax(makespans))
+    best = None
+    for job in factories[critical]:
+        rest = [j for j in factories[critical] if j != job]
+        rest_makespan = int(fsp_makespan(p, rest)[0]) if rest else 0
+        for f in range(len(factories)):
+            if f != critical:
+                insertions = fsp_insertion_makespans(p, factories[f], job)
+                position = int(np.argmin(insertions))
+                value = max(rest_makespan, int(insertions[position]))
+                if value < makespans[critical] and (best is None or value < max(best[3], best[4])):
+                    best = (job, f, position, rest_makespan, int(insertions[position]))
+    return best
+
+
+def dfsp_decomposition(file_path, formulation='mip_cplex_model', threads=1, time_limit=3600, subproblem_time_limit=60, workers=None, lower_bound=None, **options):
+    """
+    Factory decomposition of the distributed flow shop: the jobs are assigned to the factories by NEH2 (dfsp_neh), and
+    the permutation flow shop of every factory is then solved on its own with a formulation of the flow shop script
+    (e.g. 'mip_cplex_model' or 'cp_model', see flow shop scheduling/FSP.py), all factories at once on a process pool
+    of workers processes (by default one per factory, as far as the cores allow with threads each). The MIP
+    formulations start from the current sequence of their factory, and a subproblem solution is kept only if it
+    shortens that sequence. Then the job whose move out of the factory with the largest makespan helps most is moved
+    to its best position in another factory, the two factories are solved again, and so on until no move helps.
+    time_limit bounds the whole run and subproblem_time_limit each subproblem solve; further options (e.g. execfile)
+    are passed to the formulation. If lower_bound is given, the run stops as soon as the makespan reaches it.
+    """
+    result = Result(f'Decomposition (FSP {formulation})')
+    tic = time.perf_counter()
+    instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
+
+    model = getattr(flow_shop_module(), f'fsp_{formulation}')
+    p = np.asarray(instance.p, dtype=np.int64)
+    factories, _ = dfsp_neh(instance)
+    makespans = [int(fsp_makespan(p, sequence)[0]) if sequence else 0 for sequence in factories]
+    solved = set()  # the job sets of the factories whose subproblem has been solved
+    result.nodes = 0
+    workers = workers or max(1, min(instance.f, (os.cpu_count() or 1) // threads))
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    tic = time.perf_counter()
+    with tempfile.TemporaryDirectory() as temp_dir, ProcessPoolExecutor(workers) as pool:
+        while max(makespans) > (lower_bound or 0):
+            # solve the subproblems of the factories whose jobs changed, in parallel
+            futures = {}
+            for f, sequence in enumerate(factories):
+                remaining = time_limit - (time.perf_counter() - tic)
+                if len(sequence) > 1 and frozenset(sequence) not in solved and remaining > 0:
+                    path = os.path.join(temp_dir, f'factory_{f}_{len(solved)}.txt')
+                    write_factory_instance(path, p, sequence)
+                    kwargs = dict(options, threads=threads, time_limit=min(subproblem_time_limit, remaining))
+                    if formulation.startswith('mip_'):
+                        kwargs['start'] = list(range(len(sequence)))
+                    futures[f] = pool.submit(model, path, **kwargs)
+            for f, future in futures.items():
+                sub = future.result()
+                solved.add(frozenset(factories[f]))
+                result.nodes += sub.nodes or 0
+                if sub.objective is not None:
+                    # the subproblem jobs are those of the factory in its current order; read the new order off the first machine
+                    order = sorted(range(len(factories[f])), key=lambda k: sub.schedule[k * instance.g][3])
+                    sequence = [factories[f][k] for k in order]
+                    makespan = int(fsp_makespan(p, sequence)[0])
+                    if makespan < makespans[f]:
+                        factories[f], makespans[f] = sequence, makespan
+            if max(makespans) <= (lower_bound or 0) or time.perf_counter() - tic >= time_limit:
+                break
+
+            # move a job out of the critical factory
+            move = dfsp_critical_move(p, factories, makespans)
+            if move is None:
+                break
+            job, f, position, source_makespan, target_makespan = move
+            critical = int(np.argmax(makespans))
+            factories[critical].remove(job)
+            factories[f].insert(position, job)
+            makespans[critical], makespans[f] = source_makespan, target_makespan
+    result.solve_time = time.perf_counter() - tic
+
+    result.status = 'feasible'
+    result.objective = max(makespans)
+    reached_bound(result, lower_bound)
+    c = [[0] * instance.g for _ in range(instance.n)]
+    factory = [0] * instance.n
+    for f, sequence in enumerate(factories):
+        if sequence:
+            for job, times in zip(sequence, fsp_completion_times(p, sequence)):
+                c[job] = times
+                factory[job] = f
+    result.schedule = dfsp_schedule(instance, c, factory)
+    print(f'Objective value (decomposition): {result.objective}')
+
+    return result
+
 
 if __name__ == '__main__':
     path = 'test cases/0.txt'
-    print('-------------------------------CPLEX-------------------------------')
+    print('-------------------------------NEH-------------------------------')
+    factories, Cmax = dfsp_neh(parser(path))
+    print(f'Objective value (NEH): {Cmax}')
+    print('\n\n\n-------------------------------Decomposition-------------------------------')
+    dfsp_decomposition(path, time_limit=60)
+    print('\n\n\n-------------------------------CPLEX-------------------------------')
     dfsp_mip_cplex_model(path, threads=6)
     print('\n\n\n-------------------------------Gurobi-------------------------------')
     dfsp_mip_gurobi_model(path, threads=6)
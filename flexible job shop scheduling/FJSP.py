@@ -1,138 +1,295 @@
+import os
+import sys
+import time
+import numpy as np
 import cplex
 import gurobipy as gp
 from gurobipy import GRB
 from docplex.cp.model import CpoModel
 
+# the code shared by the model scripts lives in common.py at the top of the repository
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import CACHE_MIN_SIZE, read_integers, read_cache, write_cache, Result, cplex_result, gurobi_result, cp_result, CplexProgressCallback, gurobi_progress_callback, mip_cutoff, CpProgressCallback, FamilySizes, gurobi_variables
+
 
 class FJSP:
+    __slots__ = ('n', 'g', 'o', 'ptr', 'pt', 'p', 'job', 'eligible')
+
     def __init__(self):
         self.n = 0  # the number of jobs
         self.g = 0  # the number of machines
-        self.o = []  # the set of operations
-        self.p = []  # the set of processing times
+        self.o = np.zeros(0, dtype=np.int32)  # the set of operations, o[j] the number of operations of job j
+        self.ptr = np.zeros(1, dtype=np.int32)  # the operations of job j are the rows ptr[j]:ptr[j + 1] of pt
+        self.pt = np.zeros((0, 0), dtype=np.int32)  # the processing times of all operations, one row per operation
+        self.p = []  # the set of processing times, p[j][k][i] (p[j] is a view of the rows of job j in pt)
+        # the inverted eligibility index, derived from pt by the parser: operation k of job j is row ptr[j] + k of pt
+        self.job = np.zeros(0, dtype=np.int32)  # job[r], the job of the operation in row r
+        self.eligible = []  # eligible[i], the rows of the operations that machine i can process (p > 0), in row order
 
 
-def parser(file_path):
-    instance = FJSP()
+def read_text(file_path):
+    """
+    Parse an instance file in bulk: the header lines one by one and the rest of the file as one block of integers.
+    """
     with open(file_path, 'r') as f:
-        instance.n = int(f.readline().strip().split()[0])
-        instance.g = int(f.readline().strip().split()[0])
-        instance.o = [int(x) for x in f.readline().strip().split()]
-        instance.p = [[] for _ in range(instance.n)]
-        for j in range(instance.n):
-            for k in range(instance.o[j]):
-                x = [int(x) for x in f.readline().strip().split()]
-                instance.p[j].append(x)
+        n = int(f.readline().strip().split()[0])
+        g = int(f.readline().strip().split()[0])
+        o = np.array(f.readline().split(), dtype=np.int32)[:n]
+        body = read_integers(f, int(o.sum()) * g, file_path)
+    return {'o': o, 'pt': body[:int(o.sum()) * g].reshape(-1, g)}
+
+
+def parser(file_path, cache=True):
+    # opening an .npz archive costs more than parsing a small file, so only large files are cached
+    cache = cache and os.path.getsize(file_path) >= CACHE_MIN_SIZE
+    arrays = read_cache(file_path) if cache else None
+    if arrays is None:
+        arrays = read_text(file_path)
+        if cache:
+            write_cache(file_path, arrays)
+    instance = FJSP()
+    instance.o = arrays['o']
+    instance.pt = arrays['pt']
+    instance.n = len(instance.o)
+    instance.g = instance.pt.shape[1]
+    instance.ptr = np.concatenate([[0], np.cumsum(instance.o)]).astype(np.int32)
+    instance.p = [instance.pt[instance.ptr[j]:instance.ptr[j + 1]] for j in range(instance.n)]
+    instance.job = np.repeat(np.arange(instance.n, dtype=np.int32), instance.o)
+    instance.eligible = [np.flatnonzero(instance.pt[:, i] > 0).astype(np.int32) for i in range(instance.g)]
     return instance
 
 
-def fjsp_mip_cplex_model(file_path, threads=1, time_limit=3600):
+def fjsp_conflicts(instance):
+    """
+    Return the pairs of operations of different jobs that share an eligible machine, found through the inverted index
+    instance.eligible, as {(j1, k1, j2, k2): shared machines} with j1 < j2, in the order of (j1, j2, k1, k2). Only
+    these pairs can compete for a machine, so only they need a sequencing variable and disjunctive constraints.
+    """
+    shared = {}
+    for i, rows in enumerate(instance.eligible):
+        jobs = instance.job[rows]
+        first, second = np.nonzero(jobs[:, None] < jobs[None, :])
+        for pair in zip(rows[first].tolist(), rows[second].tolist()):
+            shared.setdefault(pair, []).append(i)
+    job = instance.job.tolist()
+    ptr = instance.ptr.tolist()
+    pairs = sorted(shared, key=lambda pair: (job[pair[0]], job[pair[1]], pair[0], pair[1]))
+    return {(job[r1], r1 - ptr[job[r1]], job[r2], r2 - ptr[job[r2]]): shared[(r1, r2)] for r1, r2 in pairs}
+
+
+def fjsp_completion_times(instance, sequences):
+    """
+    Return the completion times c[j][k] of operation k of job j in the semi-active schedule defined by one sequence of
+    (job, operation) pairs per machine. Raises ValueError if the sequences conflict with the operation order of the jobs.
+    """
+    c = [[0] * instance.o[j] for j in range(instance.n)]
+    job_next = [0] * instance.n
+    job_ready = [0] * instance.n
+    machine_next = [0] * instance.g
+    machine_ready = [0] * instance.g
+    scheduled = 0
+    while scheduled < sum(instance.o):
+        progress = False
+        for i in range(instance.g):
+            while machine_next[i] < len(sequences[i]):
+                j, k = sequences[i][machine_next[i]]
+                if job_next[j] != k:
+                    break
+                t = max(job_ready[j], machine_ready[i]) + int(instance.p[j][k][i])
+                c[j][k] = t
+                job_ready[j] = machine_ready[i] = t
+                job_next[j] += 1
+                machine_next[i] += 1
+                scheduled += 1
+                progress = True
+        if not progress:
+            raise ValueError('The machine sequences are infeasible for the operation order of the jobs!')
+    return c
+
+
+def fjsp_mip_start(instance, start):
+    """
+    Translate a full schedule, given as one sequence of (job, operation) pairs per machine, into consistent values of
+    the MIP variables z, x, c and Cmax.
+    Returns a dictionary that maps each variable family to {index: value} (Cmax maps to its value).
+    """
+    c = fjsp_completion_times(instance, start)
+    machine = {}
+    position = {}
+    for i in range(instance.g):
+        for pos, (j, k) in enumerate(start[i]):
+            machine[(j, k)] = i
+            position[(j, k)] = pos
+    z_values = {(j, k, i): int(machine[(j, k)] == i) for j in range(instance.n) for k in range(instance.o[j]) for i in range(instance.g) if instance.p[j][k][i] > 0}
+    x_values = {(j1, k1, j2, k2): int(machine[(j1, k1)] == machine[(j2, k2)] and position[(j1, k1)] > position[(j2, k2)]) for j1, k1, j2, k2 in fjsp_conflicts(instance)}
+    c_values = {(j, k): c[j][k] for j in range(instance.n) for k in range(instance.o[j])}
+    return {'z': z_values, 'x': x_values, 'c': c_values, 'Cmax': max(c[j][instance.o[j] - 1] for j in range(instance.n))}
+
+
+def fjsp_big_m(instance, start=None):
+    """
+    Return an instance-derived big-M for the disjunctive constraints: the makespan of the semi-active schedule that
+    dispatches the operations job by job in round-robin order, each on its fastest eligible machine, or of the MIP
+    start if that is larger (so the start stays feasible). Some optimal schedule completes every operation by then, so
+    the gap between two completion times never exceeds it.
+    """
+    sequences = [[] for _ in range(instance.g)]
+    for k in range(max(instance.o)):
+        for j in range(instance.n):
+            if k < instance.o[j]:
+                i = min([i for i in range(instance.g) if instance.p[j][k][i] > 0], key=lambda i: instance.p[j][k][i])
+                sequences[i].append((j, k))
+    horizon = max(max(c) for c in fjsp_completion_times(instance, sequences))
+    if start is not None:
+        horizon = max(horizon, fjsp_mip_start(instance, start)['Cmax'])
+    return int(horizon)
+
+
+def fjsp_schedule(instance, c, machine):
+    """
+    Return the (job, operation, machine, start, end) tuples of the schedule with completion times c[j][k] and machine
+    assignment machine[j][k] of operation k of job j.
+    """
+    schedule = []
+    for j in range(instance.n):
+        for k in range(instance.o[j]):
+            i = int(machine[j][k])
+            schedule.append((j, k, i, float(c[j][k] - instance.p[j][k][i]), float(c[j][k])))
+    return schedule
+
+
+def fjsp_mip_cplex_model(file_path, threads=1, time_limit=3600, start=None, big_m=None, names=False, model_cache=None, lower_bound=None):
+    result = Result('CPLEX')
+    tic = time.perf_counter()
     instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
 
     # create the model
     mdl = cplex.Cplex()
 
     # variable z
-    z_names = [f'z_{j}_{k}_{i}' for j in range(instance.n) for k in range(instance.o[j]) for i in range(instance.g) if instance.p[j][k][i] > 0]
-    z_objs = [0] * len(z_names)
-    z_lbs = [0] * len(z_names)
-    z_ubs = [1] * len(z_names)
-    z_types = ['B'] * len(z_names)
-
-    # variable x
-    x_names = [f'x_{j1}_{k1}_{j2}_{k2}' for j1 in range(instance.n - 1) for j2 in range(j1 + 1, instance.n) for k1 in range(instance.o[j1]) for k2 in range(instance.o[j2])]
-    x_objs = [0] * len(x_names)
-    x_lbs = [0] * len(x_names)
-    x_ubs = [1] * len(x_names)
-    x_types = ['B'] * len(x_names)
+    z_keys = [(j, k, i) for j in range(instance.n) for k in range(instance.o[j]) for i in range(instance.g) if instance.p[j][k][i] > 0]
+    z_objs = [0] * len(z_keys)
+    z_lbs = [0] * len(z_keys)
+    z_ubs = [1] * len(z_keys)
+    z_types = ['B'] * len(z_keys)
+
+    # variable x, only for the pairs of operations that share an eligible machine
+    conflicts = fjsp_conflicts(instance)
+    x_keys = list(conflicts)
+    x_objs = [0] * len(x_keys)
+    x_lbs = [0] * len(x_keys)
+    x_ubs = [1] * len(x_keys)
+    x_types = ['B'] * len(x_keys)
 
     # variable c
-    c_names = [f'c_{j}_{k}' for j in range(instance.n) for k in range(instance.o[j])]
-    c_objs = [0] * len(c_names)
-    c_lbs = [0] * len(c_names)
-    c_ubs = [float('inf')] * len(c_names)
-    c_types = ['C'] * len(c_names)
+    c_keys = [(j, k) for j in range(instance.n) for k in range(instance.o[j])]
+    c_objs = [0] * len(c_keys)
+    c_lbs = [0] * len(c_keys)
+    c_ubs = [float('inf')] * len(c_keys)
+    c_types = ['C'] * len(c_keys)
 
     # variable Cmax
-    Cmax_name = ['Cmax']
     Cmax_obj = [1]
     Cmax_lb = [0]
     Cmax_ub = [float('inf')]
     Cmax_type = ['C']
 
-    # constraints
-    constrs = []
-    senses = []
-    rhs = []
-
-    # constraint (1)
-    for j in range(instance.n):
-        for k in range(instance.o[j]):
-            variables = [f'z_{j}_{k}_{i}' for i in range(instance.g) if instance.p[j][k][i] > 0]
-            coefficients = [1] * len(variables)
-            constrs.append([variables, coefficients])
-            senses.append('E')
-            rhs.append(1)
+    # variable indices
+    z_ids = {key: index for index, key in enumerate(z_keys)}
+    x_ids = {key: len(z_keys) + index for index, key in enumerate(x_keys)}
+    c_ids = {key: len(z_keys) + len(x_keys) + index for index, key in enumerate(c_keys)}
+    Cmax_id = len(z_keys) + len(x_keys) + len(c_keys)
+
+    # read the model from the model cache, or else build it
+    M = fjsp_big_m(instance, start) if big_m is None else big_m
+    model_file, cached = (None, False) if model_cache is None else model_cache.lookup(fjsp_mip_cplex_model, file_path, '.sav', M, names)
+    if cached:
+        mdl.read(model_file)
+        FamilySizes(model_cache.families(model_file)).report(result)
+    else:
+        # constraints
+        constrs = []
+        senses = []
+        rhs = []
+        sizes = FamilySizes()
 
-    # constraint (2)
-    for j in range(instance.n):
-        for k in range(instance.o[j]):
-            variables = [f'c_{j}_{k}']
-            coefficients = [1]
-            if k > 0:
-                variables.append(f'c_{j}_{k - 1}')
-                coefficients.append(-1)
-            variables += [f'z_{j}_{k}_{i}' for i in range(instance.g) if instance.p[j][k][i] > 0]
-            coefficients += [-instance.p[j][k][i] for i in range(instance.g) if instance.p[j][k][i] > 0]
+        # constraint (1)
+        for j in range(instance.n):
+            for k in range(instance.o[j]):
+                variables = [z_ids[(j, k, i)] for i in range(instance.g) if instance.p[j][k][i] > 0]
+                coefficients = [1] * len(variables)
+                constrs.append([variables, coefficients])
+                senses.append('E')
+                rhs.append(1)
+        sizes.close_cplex('constraint (1)', constrs)
+
+        # constraint (2)
+        for j in range(instance.n):
+            for k in range(instance.o[j]):
+                variables = [c_ids[(j, k)]]
+                coefficients = [1]
+                if k > 0:
+                    variables.append(c_ids[(j, k - 1)])
+                    coefficients.append(-1)
+                variables += [z_ids[(j, k, i)] for i in range(instance.g) if instance.p[j][k][i] > 0]
+                coefficients += [-int(instance.p[j][k][i]) for i in range(instance.g) if instance.p[j][k][i] > 0]
+                constrs.append([variables, coefficients])
+                senses.append('G')
+                rhs.append(0)
+        sizes.close_cplex('constraint (2)', constrs)
+
+        # constraint (3)
+        for (j1, k1, j2, k2), machines in conflicts.items():
+            for i in machines:
+                variables = [c_ids[(j1, k1)], c_ids[(j2, k2)], x_ids[(j1, k1, j2, k2)], z_ids[(j1, k1, i)], z_ids[(j2, k2, i)]]
+                coefficients = [1, -1, -M, -M, -M]
+                constrs.append([variables, coefficients])
+                senses.append('G')
+                rhs.append(-3 * M + int(instance.p[j1][k1][i]))
+        sizes.close_cplex('constraint (3)', constrs, big_m=True)
+
+        # constraint (4)
+        for (j1, k1, j2, k2), machines in conflicts.items():
+            for i in machines:
+                variables = [c_ids[(j2, k2)], c_ids[(j1, k1)], x_ids[(j1, k1, j2, k2)], z_ids[(j1, k1, i)], z_ids[(j2, k2, i)]]
+                coefficients = [1, -1, M, -M, -M]
+                constrs.append([variables, coefficients])
+                senses.append('G')
+                rhs.append(-2 * M + int(instance.p[j2][k2][i]))
+        sizes.close_cplex('constraint (4)', constrs, big_m=True)
+
+        # constraint (5)
+        for j in range(instance.n):
+            variables = [Cmax_id, c_ids[(j, instance.o[j] - 1)]]
+            coefficients = [1, -1]
             constrs.append([variables, coefficients])
             senses.append('G')
             rhs.append(0)
-
-    # constraint (3)
-    M = 100000
-    for j1 in range(instance.n - 1):
-        for j2 in range(j1 + 1, instance.n):
-            for k1 in range(instance.o[j1]):
-                for k2 in range(instance.o[j2]):
-                    for i in range(instance.g):
-                        if instance.p[j1][k1][i] > 0 and instance.p[j2][k2][i] > 0:
-                            variables = [f'c_{j1}_{k1}', f'c_{j2}_{k2}', f'x_{j1}_{k1}_{j2}_{k2}', f'z_{j1}_{k1}_{i}', f'z_{j2}_{k2}_{i}']
-                            coefficients = [1, -1, -M, -M, -M]
-                            constrs.append([variables, coefficients])
-                            senses.append('G')
-                            rhs.append(-3 * M + instance.p[j1][k1][i])
-
-    # constraint (4)
-    for j1 in range(instance.n - 1):
-        for j2 in range(j1 + 1, instance.n):
-            for k1 in range(instance.o[j1]):
-                for k2 in range(instance.o[j2]):
-                    for i in range(instance.g):
-                        if instance.p[j1][k1][i] > 0 and instance.p[j2][k2][i] > 0:
-                            variables = [f'c_{j2}_{k2}', f'c_{j1}_{k1}', f'x_{j1}_{k1}_{j2}_{k2}', f'z_{j1}_{k1}_{i}', f'z_{j2}_{k2}_{i}']
-                            coefficients = [1, -1, M, -M, -M]
-                            constrs.append([variables, coefficients])
-                            senses.append('G')
-                            rhs.append(-2 * M + instance.p[j2][k2][i])
-
-    # constraint (5)
-    for j in range(instance.n):
-        variables = ['Cmax', f'c_{j}_{instance.o[j] - 1}']
-        coefficients = [1, -1]
-        constrs.append([variables, coefficients])
-        senses.append('G')
-        rhs.append(0)
-
-    # add variables
-    all_names = z_names + x_names + c_names + Cmax_name
-    all_objs = z_objs + x_objs + c_objs + Cmax_obj
-    all_lbs = z_lbs + x_lbs + c_lbs + Cmax_lb
-    all_ubs = z_ubs + x_ubs + c_ubs + Cmax_ub
-    all_types = z_types + x_types + c_types + Cmax_type
-    mdl.variables.add(obj=all_objs, lb=all_lbs, ub=all_ubs, names=all_names, types=all_types)
-
-    # add constraints
-    mdl.linear_constraints.add(lin_expr=constrs, senses=senses, rhs=rhs)
+        sizes.close_cplex('constraint (5)', constrs)
+        sizes.report(result)
+
+        # add variables
+        all_objs = z_objs + x_objs + c_objs + Cmax_obj
+        all_lbs = z_lbs + x_lbs + c_lbs + Cmax_lb
+        all_ubs = z_ubs + x_ubs + c_ubs + Cmax_ub
+        all_types = z_types + x_types + c_types + Cmax_type
+        mdl.variables.add(obj=all_objs, lb=all_lbs, ub=all_ubs, types=all_types)
+        if names:
+            all_names = [f'z_{j}_{k}_{i}' for j, k, i in z_keys] + [f'x_{j1}_{k1}_{j2}_{k2}' for j1, k1, j2, k2 in x_keys] + [f'c_{j}_{k}' for j, k in c_keys] + ['Cmax']
+            mdl.variables.set_names(list(enumerate(all_names)))
+
+        # add constraints
+        mdl.linear_constraints.add(lin_expr=constrs, senses=senses, rhs=rhs)
+        if model_cache is not None:
+            model_cache.store(model_file, mdl.write, sizes.families)
+
+    # add the MIP start
+    if start is not None:
+        values = fjsp_mip_start(instance, start)
+        start_indices = [z_ids[key] for key in values['z']] + [x_ids[key] for key in values['x']] + [c_ids[key] for key in values['c']] + [Cmax_id]
+        start_values = list(values['z'].values()) + list(values['x'].values()) + list(values['c'].values()) + [values['Cmax']]
+        mdl.MIP_starts.add(cplex.SparsePair(ind=start_indices, val=start_values), mdl.MIP_starts.effort_level.auto)
 
     # set the objective sense
     mdl.objective.set_sense(mdl.objective.sense.minimize)
@@ -141,107 +298,151 @@ def fjsp_mip_cplex_model(file_path, threads=1, time_limit=3600):
     mdl.set_warning_stream(None)
     mdl.parameters.threads.set(threads)
     mdl.parameters.timelimit.set(time_limit)
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    callback = mdl.register_callback(CplexProgressCallback)
+    callback.result, callback.lower_bound = result, lower_bound
+    mip_cutoff(mdl, lower_bound)
+    tic = time.perf_counter()
     mdl.solve()
-
-    if mdl.solution.is_primal_feasible():
-        Cmax = mdl.solution.get_values('Cmax')
-        print(f'Optimal objective value (CPLEX): {Cmax}')
+    result.solve_time = time.perf_counter() - tic
+    cplex_result(result, mdl, lower_bound)
+
+    if result.objective is not None:
+        values = mdl.solution.get_values()
+        c = [[values[c_ids[(j, k)]] for k in range(instance.o[j])] for j in range(instance.n)]
+        machine = [[max((i for i in range(instance.g) if instance.p[j][k][i] > 0), key=lambda i: values[z_ids[(j, k, i)]]) for k in range(instance.o[j])] for j in range(instance.n)]
+        result.schedule = fjsp_schedule(instance, c, machine)
+        print(f'Optimal objective value (CPLEX): {result.objective}')
     else:
         print('No feasible solution found by CPLEX!')
 
+    return result
 
-def fjsp_mip_gurobi_model(file_path, threads=1, time_limit=3600):
-    instance = parser(file_path)
-
-    # create the model
-    mdl = gp.Model()
-
-    # variable z
-    z_vars = {}
-    for j in range(instance.n):
-        for k in range(instance.o[j]):
-            for i in range(instance.g):
-                if instance.p[j][k][i] > 0:
-                    z_vars[(j, k, i)] = mdl.addVar(vtype=GRB.BINARY, name=f'z_{j}_{k}_{i}')
-
-    # variable x
-    x_vars = {}
-    for j1 in range(instance.n - 1):
-        for j2 in range(j1 + 1, instance.n):
-            for k1 in range(instance.o[j1]):
-                for k2 in range(instance.o[j2]):
-                    x_vars[(j1, k1, j2, k2)] = mdl.addVar(vtype=GRB.BINARY, name=f'x_{j1}_{k1}_{j2}_{k2}')
 
-    # variable c
-    c_vars = {}
-    for j in range(instance.n):
-        for k in range(instance.o[j]):
-            c_vars[(j, k)] = mdl.addVar(vtype=GRB.CONTINUOUS, name=f'c_{j}_{k}', lb=0)
-
-    # variable Cmax
-    Cmax = mdl.addVar(vtype=GRB.CONTINUOUS, name='Cmax', lb=0)
-
-    # constraint (1)
-    for j in range(instance.n):
-        for k in range(instance.o[j]):
-            variables = [z_vars[(j, k, i)] for i in range(instance.g) if instance.p[j][k][i] > 0]
-            mdl.addConstr(gp.quicksum(variables) == 1, name=f'constr1_{j}_{k}')
+def fjsp_mip_gurobi_model(file_path, threads=1, time_limit=3600, start=None, big_m=None, model_cache=None, lower_bound=None):
+    result = Result('Gurobi')
+    tic = time.perf_counter()
+    instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
+
+    # read the model from the model cache, or else build it
+    M = fjsp_big_m(instance, start) if big_m is None else big_m
+    model_file, cached = (None, False) if model_cache is None else model_cache.lookup(fjsp_mip_gurobi_model, file_path, '.mps.bz2', M)
+    if cached:
+        mdl = gp.read(model_file)
+        FamilySizes(model_cache.families(model_file)).report(result)
+        variables = gurobi_variables(mdl)
+        z_vars, x_vars, c_vars, Cmax = variables['z'], variables['x'], variables['c'], variables['Cmax']
+    else:
+        # create the model
+        mdl = gp.Model()
 
-    # constraint (2)
-    for j in range(instance.n):
-        for k in range(instance.o[j]):
-            variables = [c_vars[(j, k)]]
-            coefficients = [1]
-            if k > 0:
-                variables.append(c_vars[(j, k - 1)])
-                coefficients.append(-1)
-            variables += [z_vars[(j, k, i)] for i in range(instance.g) if instance.p[j][k][i] > 0]
-            coefficients += [-instance.p[j][k][i] for i in range(instance.g) if instance.p[j][k][i] > 0]
-            mdl.addConstr(gp.quicksum(coefficients[i] * variables[i] for i in range(len(variables))) >= 0, name=f'constr2_{j}_{k}')
+        # variable z
+        z_vars = {}
+        for j in range(instance.n):
+            for k in range(instance.o[j]):
+                for i in range(instance.g):
+                    if instance.p[j][k][i] > 0:
+                        z_vars[(j, k, i)] = mdl.addVar(vtype=GRB.BINARY, name=f'z_{j}_{k}_{i}')
+
+        # variable x, only for the pairs of operations that share an eligible machine
+        conflicts = fjsp_conflicts(instance)
+        x_vars = {}
+        for j1, k1, j2, k2 in conflicts:
+            x_vars[(j1, k1, j2, k2)] = mdl.addVar(vtype=GRB.BINARY, name=f'x_{j1}_{k1}_{j2}_{k2}')
+
+        # variable c
+        c_vars = {}
+        for j in range(instance.n):
+            for k in range(instance.o[j]):
+                c_vars[(j, k)] = mdl.addVar(vtype=GRB.CONTINUOUS, name=f'c_{j}_{k}', lb=0)
 
-    # constraint (3)
-    M = 100000
-    for j1 in range(instance.n - 1):
-        for j2 in range(j1 + 1, instance.n):
-            for k1 in range(instance.o[j1]):
-                for k2 in range(instance.o[j2]):
-                    for i in range(instance.g):
-                        if instance.p[j1][k1][i] > 0 and instance.p[j2][k2][i] > 0:
-                            variables = [c_vars[(j1, k1)], c_vars[(j2, k2)], x_vars[(j1, k1, j2, k2)], z_vars[(j1, k1, i)], z_vars[(j2, k2, i)]]
-                            coefficients = [1, -1, -M, -M, -M]
-                            mdl.addConstr(gp.quicksum(coefficients[i] * variables[i] for i in range(len(variables))) >= instance.p[j1][k1][i] - 3 * M, name=f'constr3_{j1}_{k1}_{j2}_{k2}')
+        # variable Cmax
+        Cmax = mdl.addVar(vtype=GRB.CONTINUOUS, name='Cmax', lb=0)
 
-    # constraint (4)
-    for j1 in range(instance.n - 1):
-        for j2 in range(j1 + 1, instance.n):
-            for k1 in range(instance.o[j1]):
-                for k2 in range(instance.o[j2]):
-                    for i in range(instance.g):
-                        if instance.p[j1][k1][i] > 0 and instance.p[j2][k2][i] > 0:
-                            variables = [c_vars[(j2, k2)], c_vars[(j1, k1)], x_vars[(j1, k1, j2, k2)], z_vars[(j1, k1, i)], z_vars[(j2, k2, i)]]
-                            coefficients = [1, -1, M, -M, -M]
-                            mdl.addConstr(gp.quicksum(coefficients[i] * variables[i] for i in range(len(variables))) >= instance.p[j2][k2][i] - 2 * M, name=f'constr4_{j1}_{k1}_{j2}_{k2}')
+        # constraint families
+        sizes = FamilySizes()
 
-    # constraint (5)
-    for j in range(instance.n):
-        mdl.addConstr(Cmax >= c_vars[(j, instance.o[j] - 1)], name=f'constr5_{j}')
+        # constraint (1)
+        for j in range(instance.n):
+            for k in range(instance.o[j]):
+                variables = [z_vars[(j, k, i)] for i in range(instance.g) if instance.p[j][k][i] > 0]
+                mdl.addConstr(gp.quicksum(variables) == 1, name=f'constr1_{j}_{k}')
+        sizes.close_gurobi('constraint (1)', mdl)
 
-    # set the objective
-    mdl.setObjective(Cmax, GRB.MINIMIZE)
+        # constraint (2)
+        for j in range(instance.n):
+            for k in range(instance.o[j]):
+                variables = [c_vars[(j, k)]]
+                coefficients = [1]
+                if k > 0:
+                    variables.append(c_vars[(j, k - 1)])
+                    coefficients.append(-1)
+                variables += [z_vars[(j, k, i)] for i in range(instance.g) if instance.p[j][k][i] > 0]
+                coefficients += [-int(instance.p[j][k][i]) for i in range(instance.g) if instance.p[j][k][i] > 0]
+                mdl.addConstr(gp.quicksum(coefficients[i] * variables[i] for i in range(len(variables))) >= 0, name=f'constr2_{j}_{k}')
+        sizes.close_gurobi('constraint (2)', mdl)
+
+        # constraint (3)
+        for (j1, k1, j2, k2), machines in conflicts.items():
+            for i in machines:
+                variables = [c_vars[(j1, k1)], c_vars[(j2, k2)], x_vars[(j1, k1, j2, k2)], z_vars[(j1, k1, i)], z_vars[(j2, k2, i)]]
+                coefficients = [1, -1, -M, -M, -M]
+                mdl.addConstr(gp.quicksum(coefficients[i] * variables[i] for i in range(len(variables))) >= instance.p[j1][k1][i] - 3 * M, name=f'constr3_{j1}_{k1}_{j2}_{k2}')
+        sizes.close_gurobi('constraint (3)', mdl, big_m=True)
+
+        # constraint (4)
+        for (j1, k1, j2, k2), machines in conflicts.items():
+            for i in machines:
+                variables = [c_vars[(j2, k2)], c_vars[(j1, k1)], x_vars[(j1, k1, j2, k2)], z_vars[(j1, k1, i)], z_vars[(j2, k2, i)]]
+                coefficients = [1, -1, M, -M, -M]
+                mdl.addConstr(gp.quicksum(coefficients[i] * variables[i] for i in range(len(variables))) >= instance.p[j2][k2][i] - 2 * M, name=f'constr4_{j1}_{k1}_{j2}_{k2}')
+        sizes.close_gurobi('constraint (4)', mdl, big_m=True)
+
+        # constraint (5)
+        for j in range(instance.n):
+            mdl.addConstr(Cmax >= c_vars[(j, instance.o[j] - 1)], name=f'constr5_{j}')
+        sizes.close_gurobi('constraint (5)', mdl)
+        sizes.report(result)
+
+        # set the objective
+        mdl.setObjective(Cmax, GRB.MINIMIZE)
+        if model_cache is not None:
+            model_cache.store(model_file, mdl.write, sizes.families)
+
+    # set the MIP start
+    if start is not None:
+        values = fjsp_mip_start(instance, start)
+        for key, value in values['z'].items():
+            z_vars[key].Start = value
+        for key, value in values['x'].items():
+            x_vars[key].Start = value
+        for key, value in values['c'].items():
+            c_vars[key].Start = value
+        Cmax.Start = values['Cmax']
 
     # solve the model
     mdl.setParam('Threads', threads)
     mdl.setParam('TimeLimit', time_limit)
-    mdl.optimize()
-
-    if mdl.status == GRB.OPTIMAL or mdl.status == GRB.SUBOPTIMAL:
-        Cmax_value = Cmax.X
-        print(f'Optimal objective value (Gurobi): {Cmax_value}')
+    mip_cutoff(mdl, lower_bound)
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    tic = time.perf_counter()
+    mdl.optimize(gurobi_progress_callback(result, lower_bound))
+    result.solve_time = time.perf_counter() - tic
+    gurobi_result(result, mdl, lower_bound)
+
+    if result.objective is not None:
+        c = [[c_vars[(j, k)].X for k in range(instance.o[j])] for j in range(instance.n)]
+        machine = [[max((i for i in range(instance.g) if instance.p[j][k][i] > 0), key=lambda i: z_vars[(j, k, i)].X) for k in range(instance.o[j])] for j in range(instance.n)]
+        result.schedule = fjsp_schedule(instance, c, machine)
+        print(f'Optimal objective value (Gurobi): {result.objective}')
     else:
         print('No feasible solution found by Gurobi!')
 
+    return result
+
 
-def fjsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', execfile='/Applications/CPLEX_Studio1210/cpoptimizer/bin/x86-64_osx/cpoptimizer'):
+def fjsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', execfile='/Applications/CPLEX_Studio1210/cpoptimizer/bin/x86-64_osx/cpoptimizer', lower_bound=None):
     """
     The execfile parameter specifies the path to the CP Optimizer executable.
     This is required to run the solver, as it defines the core binary that handles the solving process.
@@ -251,20 +452,26 @@ def fjsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', execfile
       - On Windows: 'C:\\Program Files\\IBM\\ILOG\\CPLEX_Studio1210\\cpoptimizer\\bin\\x64_win64\\cpoptimizer.exe'
       - On Linux: '/opt/ibm/ILOG/CPLEX_Studio1210/cpoptimizer/bin/x86-64_linux/cpoptimizer'
     Ensure the provided path matches the location of the installed CP Optimizer executable on your system.
+    If lower_bound (a proven lower bound on the makespan, e.g. from bounds.py) is given, the search stops as soon as a
+    solution reaches it, and that solution is reported as optimal.
     """
+    result = Result('CP Optimizer')
+    tic = time.perf_counter()
     instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
 
     # create the model
     mdl = CpoModel()
 
-    # constraint (1)
+    # constraint (1), tasks[j][k][i] only for the eligible machines i of each operation
     tasks = []
     for j in range(instance.n):
         tasks.append([])
         for k in range(instance.o[j]):
-            tasks[j].append([])
+            tasks[j].append({})
             for i in range(instance.g):
-                tasks[j][k].append(mdl.interval_var(name=f'tasks_{j}_{k}_{i}', optional=True, size=instance.p[j][k][i]))
+                if instance.p[j][k][i] > 0:
+                    tasks[j][k][i] = mdl.interval_var(name=f'tasks_{j}_{k}_{i}', optional=True, size=int(instance.p[j][k][i]))
 
     # constraint (2)
     _tasks = []
@@ -274,7 +481,7 @@ def fjsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', execfile
             _tasks[j].append(mdl.interval_var(name=f'_tasks_{j}_{k}'))
     for j in range(instance.n):
         for k in range(instance.o[j]):
-            mdl.add(mdl.alternative(_tasks[j][k], [tasks[j][k][i] for i in range(instance.g) if instance.p[j][k][i] > 0]))
+            mdl.add(mdl.alternative(_tasks[j][k], list(tasks[j][k].values())))
 
     # constraint (3)
     for j in range(instance.n):
@@ -282,25 +489,31 @@ def fjsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', execfile
             mdl.add(mdl.end_before_start(_tasks[j][k - 1], _tasks[j][k]))
 
     # constraint (4)
+    operations = [(j, k) for j in range(instance.n) for k in range(instance.o[j])]
     for i in range(instance.g):
-        task_list = []
-        for j in range(instance.n):
-            for k in range(instance.o[j]):
-                if instance.p[j][k][i] > 0:
-                    task_list.append(tasks[j][k][i])
-        mdl.add(mdl.no_overlap(task_list))
+        mdl.add(mdl.no_overlap([tasks[j][k][i] for j, k in (operations[r] for r in instance.eligible[i])]))
 
     # constraint (5)
     mdl.add(mdl.minimize(mdl.max([mdl.end_of(_tasks[j][instance.o[j] - 1]) for j in range(instance.n)])))
 
     # solve the model
-    result = mdl.solve(TimeLimit=time_limit, Workers=threads, LogVerbosity='Quiet', agent=agent, execfile=execfile)
-
-    if result:
-        print(f'Optimal objective value (CP Optimizer): {result.get_objective_value()}')
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    mdl.add_solver_callback(CpProgressCallback(result, lower_bound))
+    tic = time.perf_counter()
+    solution = mdl.solve(TimeLimit=time_limit, Workers=threads, LogVerbosity='Quiet', agent=agent, execfile=execfile)
+    result.solve_time = time.perf_counter() - tic
+    cp_result(result, solution, lower_bound)
+
+    if result.objective is not None:
+        c = [[solution.get_var_solution(_tasks[j][k]).get_end() for k in range(instance.o[j])] for j in range(instance.n)]
+        machine = [[next(i for i, task in tasks[j][k].items() if solution.get_var_solution(task).is_present()) for k in range(instance.o[j])] for j in range(instance.n)]
+        result.schedule = fjsp_schedule(instance, c, machine)
+        print(f'Optimal objective value (CP Optimizer): {result.objective}')
     else:
         print('No feasible solution found by CP Optimizer!')
 
+    return result
+
 
 if __name__ == '__main__':
     path = 'test cases/Old Benchmarks/1.txt'
@@ -1,115 +1,204 @@
+import os
+import sys
+import time
+import numpy as np
 import cplex
 import gurobipy as gp
 from gurobipy import GRB
 from docplex.cp.model import CpoModel
 
+# the code shared by the model scripts lives in common.py at the top of the repository
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import CACHE_MIN_SIZE, read_integers, read_cache, write_cache, fsp_makespan, fsp_completion_times, fsp_neh, fsp_lazy_seed, disjunctive_keys, Result, cplex_result, gurobi_result, cp_result, CplexProgressCallback, gurobi_progress_callback, mip_cutoff, CpProgressCallback, FamilySizes, Disjunctions, CplexDisjunctionCallback, gurobi_disjunction_callback, gurobi_variables, sparse_rows
+
 
 class FSP:
+    __slots__ = ('n', 'g', 'p')
+
     def __init__(self):
         self.n = 0  # the number of jobs
         self.g = 0  # the number of stages
-        self.p = []  # the set of processing times
+        self.p = np.zeros((0, 0), dtype=np.int32)  # the set of processing times, p[j][i]
 
 
-def parser(file_path):
-    instance = FSP()
+def read_text(file_path):
+    """
+    Parse an instance file in bulk: the header lines one by one and the rest of the file as one block of integers.
+    """
     with open(file_path, 'r') as f:
-        instance.n = int(f.readline().strip().split()[0])
-        instance.g = int(f.readline().strip().split()[0])
-        instance.p = []
-        for _ in range(instance.n):
-            instance.p.append([int(x) for x in f.readline().strip().split()])
+        n = int(f.readline().strip().split()[0])
+        g = int(f.readline().strip().split()[0])
+        body = read_integers(f, n * g, file_path)
+    return {'p': body[:n * g].reshape(n, g)}
+
+
+def parser(file_path, cache=True):
+    # opening an .npz archive costs more than parsing a small file, so only large files are cached
+    cache = cache and os.path.getsize(file_path) >= CACHE_MIN_SIZE
+    arrays = read_cache(file_path) if cache else None
+    if arrays is None:
+        arrays = read_text(file_path)
+        if cache:
+            write_cache(file_path, arrays)
+    instance = FSP()
+    instance.p = arrays['p']
+    instance.n, instance.g = (int(x) for x in instance.p.shape)
     return instance
 
 
-def fsp_mip_cplex_model(file_path, threads=1, time_limit=3600):
+def fsp_mip_start(instance, start, release=None):
+    """
+    Translate a job permutation into consistent values of the MIP variables x, c and Cmax (with the machines available
+    from their release times on, if given).
+    Returns a dictionary that maps each variable family to {index: value} (Cmax maps to its value).
+    """
+    c = fsp_completion_times(instance.p, start, release)
+    position = {job: k for k, job in enumerate(start)}
+    x_values = {(j1, j2): int(position[j1] > position[j2]) for j1 in range(instance.n - 1) for j2 in range(j1 + 1, instance.n)}
+    c_values = {(job, i): int(c[k][i]) for k, job in enumerate(start) for i in range(instance.g)}
+    return {'x': x_values, 'c': c_values, 'Cmax': int(c[-1][-1])}
+
+
+def fsp_big_m(instance, start=None, release=None):
+    """
+    Return an instance-derived big-M for the disjunctive constraints: the makespan of the NEH sequence, or of the MIP
+    start if that is larger (so the start stays feasible), plus the latest release time of a machine if given. Some
+    optimal schedule completes every operation by then, so the gap between two completion times never exceeds it.
+    """
+    horizon = fsp_neh(instance)[1]
+    if start is not None:
+        horizon = max(horizon, int(fsp_makespan(instance.p, start)[0]))
+    if release is not None:
+        horizon += int(max(release))
+    return horizon
+
+
+def fsp_schedule(instance, c):
+    """
+    Return the (job, operation, machine, start, end) tuples of the schedule with completion times c[j][i], where
+    operation i of every job is processed on machine i.
+    """
+    return [(j, i, i, float(c[j][i] - instance.p[j][i]), float(c[j][i])) for j in range(instance.n) for i in range(instance.g)]
+
+
+def fsp_mip_cplex_model(file_path, threads=1, time_limit=3600, start=None, big_m=None, names=False, model_cache=None, lower_bound=None, lazy=False, release=None):
+    result = Result('CPLEX')
+    tic = time.perf_counter()
     instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
 
     # create the model
     mdl = cplex.Cplex()
 
     # variable x
-    x_names = [f'x_{j1}_{j2}' for j1 in range(instance.n - 1) for j2 in range(j1 + 1, instance.n)]
-    x_objs = [0] * len(x_names)
-    x_lbs = [0] * len(x_names)
-    x_ubs = [1] * len(x_names)
-    x_types = ['B'] * len(x_names)
+    x_keys = [(j1, j2) for j1 in range(instance.n - 1) for j2 in range(j1 + 1, instance.n)]
+    x_objs = [0] * len(x_keys)
+    x_lbs = [0] * len(x_keys)
+    x_ubs = [1] * len(x_keys)
+    x_types = ['B'] * len(x_keys)
 
     # variable c
-    c_names = [f'c_{j}_{i}' for j in range(instance.n) for i in range(instance.g)]
-    c_objs = [0] * len(c_names)
-    c_lbs = [0] * len(c_names)
-    c_ubs = [float('inf')] * len(c_names)
-    c_types = ['C'] * len(c_names)
+    c_keys = [(j, i) for j in range(instance.n) for i in range(instance.g)]
+    c_objs = [0] * len(c_keys)
+    c_lbs = [0] * len(c_keys) if release is None else [release[i] + int(instance.p[j][i]) for j, i in c_keys]
+    c_ubs = [float('inf')] * len(c_keys)
+    c_types = ['C'] * len(c_keys)
 
     # variable Cmax
-    Cmax_name = ['Cmax']
     Cmax_obj = [1]
     Cmax_lb = [0]
     Cmax_ub = [float('inf')]
     Cmax_type = ['C']
 
-    # constraints
-    constrs = []
-    senses = []
-    rhs = []
-
-    # constraint (1)
-    for j in range(instance.n):
-        variables = [f'c_{j}_{0}']
-        coefficients = [1]
-        constrs.append([variables, coefficients])
-        senses.append('G')
-        rhs.append(instance.p[j][0])
-
-    # constraint (2)
-    for j in range(instance.n):
-        for i in range(1, instance.g):
-            variables = [f'c_{j}_{i}', f'c_{j}_{i - 1}']
-            coefficients = [1, -1]
+    # variable indices
+    x_ids = {key: index for index, key in enumerate(x_keys)}
+    c_ids = {key: len(x_keys) + index for index, key in enumerate(c_keys)}
+    Cmax_id = len(x_keys) + len(c_keys)
+
+    # read the model from the model cache, or else build it
+    M = fsp_big_m(instance, start, release) if big_m is None else big_m
+    model_file, cached = (None, False) if model_cache is None else model_cache.lookup(fsp_mip_cplex_model, file_path, '.sav', M, names, lazy, release)
+    if cached:
+        mdl.read(model_file)
+        FamilySizes(model_cache.families(model_file)).report(result)
+    else:
+        # in lazy mode, only the disjunctive constraints of the seed (the callback adds the others on demand)
+        seed = fsp_lazy_seed(instance) if lazy else None
+
+        # constraints
+        constrs = []
+        senses = []
+        rhs = []
+        sizes = FamilySizes()
+
+        # constraint (1)
+        for j in range(instance.n):
+            variables = [c_ids[(j, 0)]]
+            coefficients = [1]
             constrs.append([variables, coefficients])
             senses.append('G')
-            rhs.append(instance.p[j][i])
-
-    # constraint (3)
-    M = 100000
-    for j1 in range(instance.n - 1):
-        for j2 in range(j1 + 1, instance.n):
-            for i in range(instance.g):
-                variables = [f'c_{j1}_{i}', f'c_{j2}_{i}', f'x_{j1}_{j2}']
-                coefficients = [1, -1, -M]
+            rhs.append(int(instance.p[j][0]))
+        sizes.close_cplex('constraint (1)', constrs)
+
+        # constraint (2)
+        for j in range(instance.n):
+            for i in range(1, instance.g):
+                variables = [c_ids[(j, i)], c_ids[(j, i - 1)]]
+                coefficients = [1, -1]
                 constrs.append([variables, coefficients])
                 senses.append('G')
-                rhs.append(instance.p[j1][i] - M)
+                rhs.append(int(instance.p[j][i]))
+        sizes.close_cplex('constraint (2)', constrs)
 
-    # constraint (4)
-    for j1 in range(instance.n - 1):
-        for j2 in range(j1 + 1, instance.n):
-            for i in range(instance.g):
-                variables = [f'c_{j2}_{i}', f'c_{j1}_{i}', f'x_{j1}_{j2}']
-                coefficients = [1, -1, M]
-                constrs.append([variables, coefficients])
-                senses.append('G')
-                rhs.append(instance.p[j2][i])
+        # constraint (3)
+        for j1, j2, i in disjunctive_keys(instance, seed):
+            variables = [c_ids[(j1, i)], c_ids[(j2, i)], x_ids[(j1, j2)]]
+            coefficients = [1, -1, -M]
+            constrs.append([variables, coefficients])
+            senses.append('G')
+            rhs.append(int(instance.p[j1][i]) - M)
+        sizes.close_cplex('constraint (3)', constrs, big_m=True)
 
-    # constraint (5)
-    for j in range(instance.n):
-        variables = ['Cmax', f'c_{j}_{instance.g - 1}']
-        coefficients = [1, -1]
-        constrs.append([variables, coefficients])
-        senses.append('G')
-        rhs.append(0)
-
-    # add variables
-    all_names = x_names + c_names + Cmax_name
-    all_objs = x_objs + c_objs + Cmax_obj
-    all_lbs = x_lbs + c_lbs + Cmax_lb
-    all_ubs = x_ubs + c_ubs + Cmax_ub
-    all_types = x_types + c_types + Cmax_type
-    mdl.variables.add(obj=all_objs, lb=all_lbs, ub=all_ubs, names=all_names, types=all_types)
-
-    # add constraints
-    mdl.linear_constraints.add(lin_expr=constrs, senses=senses, rhs=rhs)
+        # constraint (4)
+        for j1, j2, i in disjunctive_keys(instance, seed):
+            variables = [c_ids[(j2, i)], c_ids[(j1, i)], x_ids[(j1, j2)]]
+            coefficients = [1, -1, M]
+            constrs.append([variables, coefficients])
+            senses.append('G')
+            rhs.append(int(instance.p[j2][i]))
+        sizes.close_cplex('constraint (4)', constrs, big_m=True)
+
+        # constraint (5)
+        for j in range(instance.n):
+            variables = [Cmax_id, c_ids[(j, instance.g - 1)]]
+            coefficients = [1, -1]
+            constrs.append([variables, coefficients])
+            senses.append('G')
+            rhs.append(0)
+        sizes.close_cplex('constraint (5)', constrs)
+        sizes.report(result)
+
+        # add variables
+        all_objs = x_objs + c_objs + Cmax_obj
+        all_lbs = x_lbs + c_lbs + Cmax_lb
+        all_ubs = x_ubs + c_ubs + Cmax_ub
+        all_types = x_types + c_types + Cmax_type
+        mdl.variables.add(obj=all_objs, lb=all_lbs, ub=all_ubs, types=all_types)
+        if names:
+            all_names = [f'x_{j1}_{j2}' for j1, j2 in x_keys] + [f'c_{j}_{i}' for j, i in c_keys] + ['Cmax']
+            mdl.variables.set_names(list(enumerate(all_names)))
+
+        # add constraints
+        mdl.linear_constraints.add(lin_expr=constrs, senses=senses, rhs=rhs)
+        if model_cache is not None:
+            model_cache.store(model_file, mdl.write, sizes.families)
+
+    # add the MIP start
+    if start is not None:
+        values = fsp_mip_start(instance, start, release)
+        start_indices = [x_ids[key] for key in values['x']] + [c_ids[key] for key in values['c']] + [Cmax_id]
+        start_values = list(values['x'].values()) + list(values['c'].values()) + [values['Cmax']]
+        mdl.MIP_starts.add(cplex.SparsePair(ind=start_indices, val=start_values), mdl.MIP_starts.effort_level.auto)
 
     # set the objective sense
     mdl.objective.set_sense(mdl.objective.sense.minimize)
@@ -118,78 +207,253 @@ def fsp_mip_cplex_model(file_path, threads=1, time_limit=3600):
     mdl.set_warning_stream(None)
     mdl.parameters.threads.set(threads)
     mdl.parameters.timelimit.set(time_limit)
+    if lazy:
+        # no dual reductions, which may cut off solutions with the constraints that are not in the model yet
+        mdl.parameters.preprocessing.reduce.set(1)
+        mdl.parameters.preprocessing.linear.set(0)
+        J1, J2 = np.triu_indices(instance.n, 1)
+        c_columns = np.array([[c_ids[(j, i)] for i in range(instance.g)] for j in range(instance.n)])
+        x_columns = np.array([[x_ids[(j1, j2)]] * instance.g for j1, j2 in zip(J1.tolist(), J2.tolist())], dtype=np.int64).reshape(len(J1), instance.g)
+        lazy_callback = mdl.register_callback(CplexDisjunctionCallback)
+        lazy_callback.disjunctions = Disjunctions(J1, J2, c_columns, x_columns, instance.p, M)
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    callback = mdl.register_callback(CplexProgressCallback)
+    callback.result, callback.lower_bound = result, lower_bound
+    mip_cutoff(mdl, lower_bound)
+    tic = time.perf_counter()
     mdl.solve()
+    result.solve_time = time.perf_counter() - tic
+    cplex_result(result, mdl, lower_bound)
 
-    if mdl.solution.is_primal_feasible():
-        Cmax = mdl.solution.get_values('Cmax')
-        print(f'Optimal objective value (CPLEX): {Cmax}')
+    if result.objective is not None:
+        values = mdl.solution.get_values()
+        result.schedule = fsp_schedule(instance, [[values[c_ids[(j, i)]] for i in range(instance.g)] for j in range(instance.n)])
+        print(f'Optimal objective value (CPLEX): {result.objective}')
     else:
         print('No feasible solution found by CPLEX!')
 
+    return result
 
-def fsp_mip_gurobi_model(file_path, threads=1, time_limit=3600):
-    instance = parser(file_path)
-
-    # create the model
-    mdl = gp.Model()
 
-    # variable x
-    x_vars = {}
-    for j1 in range(instance.n - 1):
-        for j2 in range(j1 + 1, instance.n):
-            x_vars[(j1, j2)] = mdl.addVar(vtype=GRB.BINARY, name=f'x_{j1}_{j2}')
-
-    # variable c
-    c_vars = {}
-    for j in range(instance.n):
-        for i in range(instance.g):
-            c_vars[(j, i)] = mdl.addVar(vtype=GRB.CONTINUOUS, name=f'c_{j}_{i}', lb=0)
-
-    # variable Cmax
-    Cmax = mdl.addVar(vtype=GRB.CONTINUOUS, name='Cmax', lb=0)
-
-    # constraint (1)
-    for j in range(instance.n):
-        mdl.addConstr(c_vars[(j, 0)] >= instance.p[j][0], name=f'constr1_{j}')
-
-    # constraint (2)
-    for j in range(instance.n):
-        for i in range(1, instance.g):
-            mdl.addConstr(c_vars[(j, i)] - c_vars[(j, i - 1)] >= instance.p[j][i], name=f'constr2_{j}_{i}')
-
-    # constraint (3)
-    M = 100000
-    for j1 in range(instance.n - 1):
-        for j2 in range(j1 + 1, instance.n):
+def fsp_mip_gurobi_model(file_path, threads=1, time_limit=3600, start=None, big_m=None, model_cache=None, lower_bound=None, lazy=False, release=None):
+    result = Result('Gurobi')
+    tic = time.perf_counter()
+    instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
+
+    # read the model from the model cache, or else build it
+    M = fsp_big_m(instance, start, release) if big_m is None else big_m
+    model_file, cached = (None, False) if model_cache is None else model_cache.lookup(fsp_mip_gurobi_model, file_path, '.mps.bz2', M, lazy, release)
+    if cached:
+        mdl = gp.read(model_file)
+        FamilySizes(model_cache.families(model_file)).report(result)
+        variables = gurobi_variables(mdl)
+        x_vars, c_vars, Cmax = variables['x'], variables['c'], variables['Cmax']
+    else:
+        # create the model
+        mdl = gp.Model()
+
+        # variable x
+        x_vars = {}
+        for j1 in range(instance.n - 1):
+            for j2 in range(j1 + 1, instance.n):
+                x_vars[(j1, j2)] = mdl.addVar(vtype=GRB.BINARY, name=f'x_{j1}_{j2}')
+
+        # variable c
+        c_vars = {}
+        for j in range(instance.n):
             for i in range(instance.g):
-                mdl.addConstr(c_vars[(j1, i)] - c_vars[(j2, i)] - M * x_vars[(j1, j2)] >= instance.p[j1][i] - M, name=f'constr3_{j1}_{j2}_{i}')
+                c_vars[(j, i)] = mdl.addVar(vtype=GRB.CONTINUOUS, name=f'c_{j}_{i}', lb=0 if release is None else release[i] + instance.p[j][i])
+
+        # variable Cmax
+        Cmax = mdl.addVar(vtype=GRB.CONTINUOUS, name='Cmax', lb=0)
+
+        # in lazy mode, only the disjunctive constraints of the seed (the callback adds the others on demand)
+        seed = fsp_lazy_seed(instance) if lazy else None
+
+        # constraint families
+        sizes = FamilySizes()
+
+        # constraint (1)
+        for j in range(instance.n):
+            mdl.addConstr(c_vars[(j, 0)] >= instance.p[j][0], name=f'constr1_{j}')
+        sizes.close_gurobi('constraint (1)', mdl)
+
+        # constraint (2)
+        for j in range(instance.n):
+            for i in range(1, instance.g):
+                mdl.addConstr(c_vars[(j, i)] - c_vars[(j, i - 1)] >= instance.p[j][i], name=f'constr2_{j}_{i}')
+        sizes.close_gurobi('constraint (2)', mdl)
+
+        # constraint (3)
+        for j1, j2, i in disjunctive_keys(instance, seed):
+            mdl.addConstr(c_vars[(j1, i)] - c_vars[(j2, i)] - M * x_vars[(j1, j2)] >= instance.p[j1][i] - M, name=f'constr3_{j1}_{j2}_{i}')
+        sizes.close_gurobi('constraint (3)', mdl, big_m=True)
+
+        # constraint (4)
+        for j1, j2, i in disjunctive_keys(instance, seed):
+            mdl.addConstr(c_vars[(j2, i)] - c_vars[(j1, i)] + M * x_vars[(j1, j2)] >= instance.p[j2][i], name=f'constr4_{j1}_{j2}_{i}')
+        sizes.close_gurobi('constraint (4)', mdl, big_m=True)
+
+        # constraint (5)
+        for j in range(instance.n):
+            mdl.addConstr(Cmax - c_vars[(j, instance.g - 1)] >= 0, name=f'constr5_{j}')
+        sizes.close_gurobi('constraint (5)', mdl)
+        sizes.report(result)
+
+        # set the objective
+        mdl.setObjective(Cmax, GRB.MINIMIZE)
+        if model_cache is not None:
+            model_cache.store(model_file, mdl.write, sizes.families)
+
+    # set the MIP start
+    if start is not None:
+        values = fsp_mip_start(instance, start, release)
+        for key, value in values['x'].items():
+            x_vars[key].Start = value
+        for key, value in values['c'].items():
+            c_vars[key].Start = value
+        Cmax.Start = values['Cmax']
 
-    # constraint (4)
-    for j1 in range(instance.n - 1):
-        for j2 in range(j1 + 1, instance.n):
-            for i in range(instance.g):
-                mdl.addConstr(c_vars[(j2, i)] - c_vars[(j1, i)] + M * x_vars[(j1, j2)] >= instance.p[j2][i], name=f'constr4_{j1}_{j2}_{i}')
+    # solve the model
+    mdl.setParam('Threads', threads)
+    mdl.setParam('TimeLimit', time_limit)
+    callback = gurobi_progress_callback(result, lower_bound)
+    mip_cutoff(mdl, lower_bound)
+    if lazy:
+        mdl.setParam('LazyConstraints', 1)
+        J1, J2 = np.triu_indices(instance.n, 1)
+        c_columns = np.array([[c_vars[(j, i)].index for i in range(instance.g)] for j in range(instance.n)])
+        x_columns = np.array([[x_vars[(j1, j2)].index] * instance.g for j1, j2 in zip(J1.tolist(), J2.tolist())], dtype=np.int64).reshape(len(J1), instance.g)
+        callback = gurobi_disjunction_callback(Disjunctions(J1, J2, c_columns, x_columns, instance.p, M), mdl.getVars(), callback)
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    tic = time.perf_counter()
+    mdl.optimize(callback)
+    result.solve_time = time.perf_counter() - tic
+    gurobi_result(result, mdl, lower_bound)
+
+    if result.objective is not None:
+        result.schedule = fsp_schedule(instance, [[c_vars[(j, i)].X for i in range(instance.g)] for j in range(instance.n)])
+        print(f'Optimal objective value (Gurobi): {result.objective}')
+    else:
+        print('No feasible solution found by Gurobi!')
 
-    # constraint (5)
-    for j in range(instance.n):
-        mdl.addConstr(Cmax - c_vars[(j, instance.g - 1)] >= 0, name=f'constr5_{j}')
+    return result
 
-    # set the objective
-    mdl.setObjective(Cmax, GRB.MINIMIZE)
+
+def fsp_mip_gurobi_matrix_model(file_path, threads=1, time_limit=3600, start=None, big_m=None, model_cache=None, lower_bound=None, lazy=False, release=None):
+    """
+    Same model as fsp_mip_gurobi_model (same variable and constraint order), but every variable family is one slice
+    of a single MVar and every constraint family is added at once with addMConstr from a sparse coefficient matrix.
+    """
+    result = Result('Gurobi')
+    tic = time.perf_counter()
+    instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
+    p = np.asarray(instance.p, dtype=np.float64)
+
+    # variable indices
+    J1, J2 = np.triu_indices(instance.n, 1)
+    x_ids = np.full((instance.n, instance.n), -1)
+    x_ids[J1, J2] = np.arange(len(J1))
+    c_ids = len(J1) + np.arange(instance.n * instance.g).reshape(instance.n, instance.g)
+    Cmax_id = len(J1) + instance.n * instance.g
+    num_vars = Cmax_id + 1
+
+    # read the model from the model cache, or else build it
+    M = fsp_big_m(instance, start, release) if big_m is None else big_m
+    model_file, cached = (None, False) if model_cache is None else model_cache.lookup(fsp_mip_gurobi_matrix_model, file_path, '.mps.bz2', M, lazy, release)
+    if cached:
+        mdl = gp.read(model_file)
+        FamilySizes(model_cache.families(model_file)).report(result)
+        v = gp.MVar.fromlist(mdl.getVars())
+    else:
+        mdl = gp.Model()
+
+        # variables x, c and Cmax
+        vtypes = np.full(num_vars, GRB.CONTINUOUS)
+        vtypes[:len(J1)] = GRB.BINARY
+        ubs = np.full(num_vars, float('inf'))
+        ubs[:len(J1)] = 1
+        objs = np.zeros(num_vars)
+        objs[Cmax_id] = 1
+        lbs = np.zeros(num_vars)
+        if release is not None:
+            lbs[c_ids] = p + np.asarray(release)
+        v = mdl.addMVar(num_vars, lb=lbs, ub=ubs, obj=objs, vtype=vtypes)
+
+        # constraint families
+        sizes = FamilySizes()
+
+        # constraint (1)
+        mdl.addMConstr(sparse_rows(c_ids[:, :1], [1], num_vars), v, GRB.GREATER_EQUAL, p[:, 0])
+        sizes.close_gurobi('constraint (1)', mdl)
+
+        # constraint (2)
+        columns = np.stack([c_ids[:, 1:], c_ids[:, :-1]], axis=-1)
+        mdl.addMConstr(sparse_rows(columns, [1, -1], num_vars), v, GRB.GREATER_EQUAL, p[:, 1:].ravel())
+        sizes.close_gurobi('constraint (2)', mdl)
+
+        # the disjunctive constraints: every job pair on every machine, or only those of the seed in lazy mode (the
+        # callback adds the others on demand)
+        K1, K2, K = fsp_lazy_seed(instance) if lazy else (J1[:, None], J2[:, None], np.arange(instance.g))
+
+        # constraint (3)
+        columns = np.stack(np.broadcast_arrays(c_ids[K1, K], c_ids[K2, K], x_ids[K1, K2]), axis=-1)
+        mdl.addMConstr(sparse_rows(columns, [1, -1, -M], num_vars), v, GRB.GREATER_EQUAL, (p[K1, K] - M).ravel())
+        sizes.close_gurobi('constraint (3)', mdl, big_m=True)
+
+        # constraint (4)
+        columns = np.stack(np.broadcast_arrays(c_ids[K2, K], c_ids[K1, K], x_ids[K1, K2]), axis=-1)
+        mdl.addMConstr(sparse_rows(columns, [1, -1, M], num_vars), v, GRB.GREATER_EQUAL, p[K2, K].ravel())
+        sizes.close_gurobi('constraint (4)', mdl, big_m=True)
+
+        # constraint (5)
+        columns = np.stack(np.broadcast_arrays(Cmax_id, c_ids[:, -1]), axis=-1)
+        mdl.addMConstr(sparse_rows(columns, [1, -1], num_vars), v, GRB.GREATER_EQUAL, np.zeros(instance.n))
+        sizes.close_gurobi('constraint (5)', mdl)
+        sizes.report(result)
+
+        # set the objective sense
+        mdl.ModelSense = GRB.MINIMIZE
+        if model_cache is not None:
+            model_cache.store(model_file, mdl.write, sizes.families)
+
+    # set the MIP start
+    if start is not None:
+        values = fsp_mip_start(instance, start, release)
+        start_values = np.zeros(num_vars)
+        for key, value in values['x'].items():
+            start_values[x_ids[key]] = value
+        for key, value in values['c'].items():
+            start_values[c_ids[key]] = value
+        start_values[Cmax_id] = values['Cmax']
+        v.Start = start_values
 
     # solve the model
     mdl.setParam('Threads', threads)
     mdl.setParam('TimeLimit', time_limit)
-    mdl.optimize()
-
-    if mdl.status == GRB.OPTIMAL or mdl.status == GRB.SUBOPTIMAL:
-        Cmax_value = Cmax.X
-        print(f'Optimal objective value (Gurobi): {Cmax_value}')
+    callback = gurobi_progress_callback(result, lower_bound)
+    mip_cutoff(mdl, lower_bound)
+    if lazy:
+        mdl.setParam('LazyConstraints', 1)
+        callback = gurobi_disjunction_callback(Disjunctions(J1, J2, c_ids, np.broadcast_to(x_ids[J1, J2][:, None], (len(J1), instance.g)), p, M), mdl.getVars(), callback)
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    tic = time.perf_counter()
+    mdl.optimize(callback)
+    result.solve_time = time.perf_counter() - tic
+    gurobi_result(result, mdl, lower_bound)
+
+    if result.objective is not None:
+        result.schedule = fsp_schedule(instance, v.X[c_ids])
+        print(f'Optimal objective value (Gurobi): {result.objective}')
     else:
         print('No feasible solution found by Gurobi!')
 
+    return result
 
-def fsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', execfile='/Applications/CPLEX_Studio1210/cpoptimizer/bin/x86-64_osx/cpoptimizer'):
+
+def fsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', execfile='/Applications/CPLEX_Studio1210/cpoptimizer/bin/x86-64_osx/cpoptimizer', lower_bound=None, release=None):
     """
     The execfile parameter specifies the path to the CP Optimizer executable.
     This is required to run the solver, as it defines the core binary that handles the solving process.
@@ -199,8 +463,15 @@ def fsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', execfile=
       - On Windows: 'C:\\Program Files\\IBM\\ILOG\\CPLEX_Studio1210\\cpoptimizer\\bin\\x64_win64\\cpoptimizer.exe'
       - On Linux: '/opt/ibm/ILOG/CPLEX_Studio1210/cpoptimizer/bin/x86-64_linux/cpoptimizer'
     Ensure the provided path matches the location of the installed CP Optimizer executable on your system.
+    If lower_bound (a proven lower bound on the makespan, e.g. from bounds.py) is given, the search stops as soon as a
+    solution reaches it, and that solution is reported as optimal.
+    If release is given, machine i is only available from release[i] on (as in every model function of this script),
+    e.g. after the jobs already scheduled by a rolling horizon.
     """
+    result = Result('CP Optimizer')
+    tic = time.perf_counter()
     instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
 
     # create the model
     mdl = CpoModel()
@@ -209,13 +480,19 @@ def fsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', execfile=
     tasks = [
         [
             mdl.interval_var(
-                name=f'task_{j}_{i}', size=instance.p[j][i]
+                name=f'task_{j}_{i}', size=int(instance.p[j][i])
             )
             for i in range(instance.g)
         ]
         for j in range(instance.n)
     ]
 
+    # the machines are only available from their release times on
+    if release is not None:
+        for j in range(instance.n):
+            for i in range(instance.g):
+                mdl.add(mdl.start_of(tasks[j][i]) >= release[i])
+
     # constraint (2)
     for j in range(instance.n):
         for i in range(1, instance.g):
@@ -239,17 +516,28 @@ def fsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', execfile=
     mdl.add(mdl.minimize(mdl.max([mdl.end_of(tasks[j][instance.g - 1]) for j in range(instance.n)])))
 
     # solve the model
-    result = mdl.solve(TimeLimit=time_limit, Workers=threads, LogVerbosity='Quiet', agent=agent, execfile=execfile)
-
-    if result:
-        print(f'Optimal objective value (CP Optimizer): {result.get_objective_value()}')
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    mdl.add_solver_callback(CpProgressCallback(result, lower_bound))
+    tic = time.perf_counter()
+    solution = mdl.solve(TimeLimit=time_limit, Workers=threads, LogVerbosity='Quiet', agent=agent, execfile=execfile)
+    result.solve_time = time.perf_counter() - tic
+    cp_result(result, solution, lower_bound)
+
+    if result.objective is not None:
+        result.schedule = fsp_schedule(instance, [[solution.get_var_solution(tasks[j][i]).get_end() for i in range(instance.g)] for j in range(instance.n)])
+        print(f'Optimal objective value (CP Optimizer): {result.objective}')
     else:
         print('No feasible solution found by CP Optimizer!')
 
+    return result
+
 
 if __name__ == '__main__':
     path = 'test cases/0.txt'
-    print('-------------------------------CPLEX-------------------------------')
+    print('-------------------------------NEH-------------------------------')
+    sequence, Cmax = fsp_neh(parser(path))
+    print(f'Objective value (NEH): {Cmax}')
+    print('\n\n\n-------------------------------CPLEX-------------------------------')
     fsp_mip_cplex_model(path, threads=6)
     print('\n\n\n-------------------------------Gurobi-------------------------------')
     fsp_mip_gurobi_model(path, threads=6)
@@ -1,135 +1,297 @@
+import heapq
+import os
+import sys
+import time
+import numpy as np
+import scipy.sparse as sp
 import cplex
 import gurobipy as gp
 from gurobipy import GRB
 from docplex.cp.model import CpoModel
 
+# the code shared by the model scripts lives in common.py at the top of the repository
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import CACHE_MIN_SIZE, read_integers, read_cache, write_cache, Result, cplex_result, gurobi_result, cp_result, CplexProgressCallback, gurobi_progress_callback, mip_cutoff, CpProgressCallback, FamilySizes, gurobi_variables, sparse_rows
+
 
 class HFSP:
+    __slots__ = ('n', 'g', 'm', 'p')
+
     def __init__(self):
         self.n = 0  # the number of jobs
         self.g = 0  # the number of stages
-        self.m = []  # the number of machines
-        self.p = []  # the set of processing times
+        self.m = np.zeros(0, dtype=np.int32)  # the number of machines, m[i] at stage i
+        self.p = np.zeros((0, 0), dtype=np.int32)  # the set of processing times, p[j][i]
 
 
-def parser(file_path):
-    instance = HFSP()
+def read_text(file_path):
+    """
+    Parse an instance file in bulk: the header lines one by one and the rest of the file as one block of integers.
+    """
     with open(file_path, 'r') as f:
-        instance.n = int(f.readline().strip().split()[0])
-        instance.g = int(f.readline().strip().split()[0])
-        instance.m = [int(x) for x in f.readline().strip().split()]
-        instance.p = []
-        for _ in range(instance.n):
-            instance.p.append([int(x) for x in f.readline().strip().split()])
+        n = int(f.readline().strip().split()[0])
+        g = int(f.readline().strip().split()[0])
+        m = np.array(f.readline().split(), dtype=np.int32)
+        body = read_integers(f, n * g, file_path)
+    return {'m': m[:g], 'p': body[:n * g].reshape(n, g)}
+
+
+def parser(file_path, cache=True):
+    # opening an .npz archive costs more than parsing a small file, so only large files are cached
+    cache = cache and os.path.getsize(file_path) >= CACHE_MIN_SIZE
+    arrays = read_cache(file_path) if cache else None
+    if arrays is None:
+        arrays = read_text(file_path)
+        if cache:
+            write_cache(file_path, arrays)
+    instance = HFSP()
+    instance.m = arrays['m']
+    instance.p = arrays['p']
+    instance.n, instance.g = (int(x) for x in instance.p.shape)
     return instance
 
 
-def hfsp_mip_cplex_model(file_path, threads=1, time_limit=3600):
+def hfsp_mip_start(instance, start):
+    """
+    Translate a full schedule, given as the job sequence start[i][k] of machine k at stage i, into consistent values of
+    the MIP variables x, w, c and Cmax.
+    Returns a dictionary that maps each variable family to {index: value} (Cmax maps to its value).
+    """
+    c = [[0] * instance.g for _ in range(instance.n)]
+    machine = {}
+    position = {}
+    for i in range(instance.g):
+        for k, sequence in enumerate(start[i]):
+            t = 0
+            for pos, j in enumerate(sequence):
+                t = max(t, c[j][i - 1] if i > 0 else 0) + int(instance.p[j][i])
+                c[j][i] = t
+                machine[(j, i)] = k
+                position[(j, i)] = pos
+    x_values = {(i, j1, j2): int(machine[(j1, i)] == machine[(j2, i)] and position[(j1, i)] > position[(j2, i)]) for i in range(instance.g) for j1 in range(instance.n - 1) for j2 in range(j1 + 1, instance.n)}
+    w_values = {(j, i, k): int(machine[(j, i)] == k) for j in range(instance.n) for i in range(instance.g) for k in range(instance.m[i])}
+    c_values = {(j, i): c[j][i] for j in range(instance.n) for i in range(instance.g)}
+    return {'x': x_values, 'w': w_values, 'c': c_values, 'Cmax': max(c[j][instance.g - 1] for j in range(instance.n))}
+
+
+def hfsp_big_m(instance, start=None):
+    """
+    Return an instance-derived big-M for the disjunctive constraints: the makespan of the schedule that spreads the
+    jobs over the machines of every stage in round-robin order, or of the MIP start if that is larger (so the start
+    stays feasible). Some optimal schedule completes every operation by then, so the gap between two completion times
+    never exceeds it.
+    """
+    schedule = [[list(range(k, instance.n, instance.m[i])) for k in range(instance.m[i])] for i in range(instance.g)]
+    horizon = hfsp_mip_start(instance, schedule)['Cmax']
+    if start is not None:
+        horizon = max(horizon, hfsp_mip_start(instance, start)['Cmax'])
+    return int(horizon)
+
+
+def hfsp_decode(instance, permutation):
+    """
+    List scheduling of a job permutation with the first-available-machine rule: the jobs enter stage 0 in the order of
+    the permutation and every later stage in the order of their completion at the previous one (ties keep the previous
+    order), and each job goes to the machine of the stage that becomes idle first (the lowest index in case of ties),
+    kept in a heap. O(n g (log m + log n)) per permutation: the heap operations and the sorts of the jobs between
+    stages.
+    Returns the job sequence start[i][k] of machine k at every stage i (a start for the MIP and CP models) and the
+    makespan.
+    """
+    p = instance.p.tolist()
+    order = [int(j) for j in permutation]
+    ready = [0] * instance.n
+    start = []
+    for i in range(instance.g):
+        idle = [(0, k) for k in range(instance.m[i])]
+        sequences = [[] for _ in range(instance.m[i])]
+        for j in order:
+            t, k = heapq.heappop(idle)
+            ready[j] = max(t, ready[j]) + p[j][i]
+            heapq.heappush(idle, (ready[j], k))
+            sequences[k].append(j)
+        start.append(sequences)
+        order.sort(key=ready.__getitem__)
+    return start, max(ready)
+
+
+def hfsp_makespans(instance, permutations):
+    """
+    Return the makespans of the schedules that hfsp_decode builds from a population of job permutations (one per row),
+    evaluated for the whole population at once: every step schedules one job of every permutation, on the machine of
+    the stage that becomes idle first.
+    """
+    order = np.array(permutations, dtype=np.intp, ndmin=2)
+    rows = np.arange(len(order))
+    p = instance.p.astype(np.int64)
+    ready = np.zeros(order.shape, dtype=np.int64)
+    for i in range(instance.g):
+        idle = np.zeros((len(order), instance.m[i]), dtype=np.int64)
+        for t in range(instance.n):
+            j = order[:, t]
+            k = idle.argmin(axis=1)
+            ready[rows, j] = idle[rows, k] = np.maximum(idle[rows, k], ready[rows, j]) + p[j, i]
+        order = np.take_along_axis(order, np.argsort(np.take_along_axis(ready, order, axis=1), axis=1, kind='stable'), axis=1)
+    return ready.max(axis=1)
+
+
+def hfsp_schedule(instance, c, machine):
+    """
+    Return the (job, operation, machine, start, end) tuples of the schedule with completion times c[j][i] and machine
+    assignment machine[j][i], where operation i of job j is processed on machine (i, machine[j][i]) of stage i.
+    """
+    return [(j, i, (i, int(machine[j][i])), float(c[j][i] - instance.p[j][i]), float(c[j][i])) for j in range(instance.n) for i in range(instance.g)]
+
+
+def hfsp_machines(instance, c):
+    """
+    Assign the jobs of every stage to its machines given only their completion times c[j][i], for models that limit the
+    number of jobs in process at stage i to m[i] instead of assigning machines: in order of start time, each job goes
+    to the machine of its stage that became idle first.
+    """
+    machine = [[0] * instance.g for _ in range(instance.n)]
+    for i in range(instance.g):
+        idle = [0] * instance.m[i]
+        for j in sorted(range(instance.n), key=lambda j: c[j][i] - instance.p[j][i]):
+            k = min(range(instance.m[i]), key=lambda k: idle[k])
+            machine[j][i] = k
+            idle[k] = c[j][i]
+    return machine
+
+
+def hfsp_mip_cplex_model(file_path, threads=1, time_limit=3600, start=None, big_m=None, names=False, model_cache=None, lower_bound=None):
+    result = Result('CPLEX')
+    tic = time.perf_counter()
     instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
 
     # create the model
     mdl = cplex.Cplex()
 
     # variable x
-    x_names = [f'x_{i}_{j1}_{j2}' for i in range(instance.g) for j1 in range(instance.n - 1) for j2 in range(j1 + 1, instance.n)]
-    x_objs = [0] * len(x_names)
-    x_lbs = [0] * len(x_names)
-    x_ubs = [1] * len(x_names)
-    x_types = ['B'] * len(x_names)
+    x_keys = [(i, j1, j2) for i in range(instance.g) for j1 in range(instance.n - 1) for j2 in range(j1 + 1, instance.n)]
+    x_objs = [0] * len(x_keys)
+    x_lbs = [0] * len(x_keys)
+    x_ubs = [1] * len(x_keys)
+    x_types = ['B'] * len(x_keys)
 
     # variable w
-    w_names = [f'w_{j}_{i}_{k}' for j in range(instance.n) for i in range(instance.g) for k in range(instance.m[i])]
-    w_objs = [0] * len(w_names)
-    w_lbs = [0] * len(w_names)
-    w_ubs = [1] * len(w_names)
-    w_types = ['B'] * len(w_names)
+    w_keys = [(j, i, k) for j in range(instance.n) for i in range(instance.g) for k in range(instance.m[i])]
+    w_objs = [0] * len(w_keys)
+    w_lbs = [0] * len(w_keys)
+    w_ubs = [1] * len(w_keys)
+    w_types = ['B'] * len(w_keys)
 
     # variable c
-    c_names = [f'c_{j}_{i}' for j in range(instance.n) for i in range(instance.g)]
-    c_objs = [0] * len(c_names)
-    c_lbs = [0] * len(c_names)
-    c_ubs = [float('inf')] * len(c_names)
-    c_types = ['C'] * len(c_names)
+    c_keys = [(j, i) for j in range(instance.n) for i in range(instance.g)]
+    c_objs = [0] * len(c_keys)
+    c_lbs = [0] * len(c_keys)
+    c_ubs = [float('inf')] * len(c_keys)
+    c_types = ['C'] * len(c_keys)
 
     # variable Cmax
-    Cmax_name = ['Cmax']
     Cmax_obj = [1]
     Cmax_lb = [0]
     Cmax_ub = [float('inf')]
     Cmax_type = ['C']
 
-    # constraints
-    constrs = []
-    senses = []
-    rhs = []
-
-    # constraint (1)
-    for j in range(instance.n):
-        variables = [f'c_{j}_{0}']
-        coefficients = [1]
-        constrs.append([variables, coefficients])
-        senses.append('G')
-        rhs.append(instance.p[j][0])
-
-    # constraint (2)
-    for j in range(instance.n):
-        for i in range(1, instance.g):
-            variables = [f'c_{j}_{i}', f'c_{j}_{i - 1}']
-            coefficients = [1, -1]
+    # variable indices
+    x_ids = {key: index for index, key in enumerate(x_keys)}
+    w_ids = {key: len(x_keys) + index for index, key in enumerate(w_keys)}
+    c_ids = {key: len(x_keys) + len(w_keys) + index for index, key in enumerate(c_keys)}
+    Cmax_id = len(x_keys) + len(w_keys) + len(c_keys)
+
+    # read the model from the model cache, or else build it
+    M = hfsp_big_m(instance, start) if big_m is None else big_m
+    model_file, cached = (None, False) if model_cache is None else model_cache.lookup(hfsp_mip_cplex_model, file_path, '.sav', M, names)
+    if cached:
+        mdl.read(model_file)
+        FamilySizes(model_cache.families(model_file)).report(result)
+    else:
+        # constraints
+        constrs = []
+        senses = []
+        rhs = []
+        sizes = FamilySizes()
+
+        # constraint (1)
+        for j in range(instance.n):
+            variables = [c_ids[(j, 0)]]
+            coefficients = [1]
             constrs.append([variables, coefficients])
             senses.append('G')
-            rhs.append(instance.p[j][i])
-
-    # constraint (3)
-    for j in range(instance.n):
-        for i in range(instance.g):
-            variables = [f'w_{j}_{i}_{k}' for k in range(instance.m[i])]
-            coefficients = [1] * instance.m[i]
-            constrs.append([variables, coefficients])
-            senses.append('E')
-            rhs.append(1)
-
-    # constraint (4)
-    M = 100000
-    for j1 in range(instance.n - 1):
-        for j2 in range(j1 + 1, instance.n):
+            rhs.append(int(instance.p[j][0]))
+        sizes.close_cplex('constraint (1)', constrs)
+
+        # constraint (2)
+        for j in range(instance.n):
+            for i in range(1, instance.g):
+                variables = [c_ids[(j, i)], c_ids[(j, i - 1)]]
+                coefficients = [1, -1]
+                constrs.append([variables, coefficients])
+                senses.append('G')
+                rhs.append(int(instance.p[j][i]))
+        sizes.close_cplex('constraint (2)', constrs)
+
+        # constraint (3)
+        for j in range(instance.n):
             for i in range(instance.g):
-                for k in range(instance.m[i]):
-                    variables = [f'c_{j1}_{i}', f'c_{j2}_{i}', f'x_{i}_{j1}_{j2}', f'w_{j1}_{i}_{k}', f'w_{j2}_{i}_{k}']
-                    coefficients = [1, -1, -M, -M, -M]
-                    constrs.append([variables, coefficients])
-                    senses.append('G')
-                    rhs.append(instance.p[j1][i] - 3 * M)
-
-    # constraint (5)
-    for j1 in range(instance.n - 1):
-        for j2 in range(j1 + 1, instance.n):
-            for i in range(instance.g):
-                for k in range(instance.m[i]):
-                    variables = [f'c_{j2}_{i}', f'c_{j1}_{i}', f'x_{i}_{j1}_{j2}', f'w_{j1}_{i}_{k}', f'w_{j2}_{i}_{k}']
-                    coefficients = [1, -1, M, -M, -M]
-                    constrs.append([variables, coefficients])
-                    senses.append('G')
-                    rhs.append(instance.p[j2][i] - 2 * M)
-
-    # constraint (6)
-    for j in range(instance.n):
-        variables = ['Cmax', f'c_{j}_{instance.g - 1}']
-        coefficients = [1, -1]
-        constrs.append([variables, coefficients])
-        senses.append('G')
-        rhs.append(0)
-
-    # add variables
-    all_names = x_names + w_names + c_names + Cmax_name
-    all_objs = x_objs + w_objs + c_objs + Cmax_obj
-    all_lbs = x_lbs + w_lbs + c_lbs + Cmax_lb
-    all_ubs = x_ubs + w_ubs + c_ubs + Cmax_ub
-    all_types = x_types + w_types + c_types + Cmax_type
-    mdl.variables.add(obj=all_objs, lb=all_lbs, ub=all_ubs, names=all_names, types=all_types)
-
-    # add constraints
-    mdl.linear_constraints.add(lin_expr=constrs, senses=senses, rhs=rhs)
+                variables = [w_ids[(j, i, k)] for k in range(instance.m[i])]
+                coefficients = [1] * instance.m[i]
+                constrs.append([variables, coefficients])
+                senses.append('E')
+                rhs.append(1)
+        sizes.close_cplex('constraint (3)', constrs)
+
+        # constraints (4) and (5)
+        for j1 in range(instance.n - 1):
+            for j2 in range(j1 + 1, instance.n):
+                for i in range(instance.g):
+                    for k in range(instance.m[i]):
+                        variables = [c_ids[(j1, i)], c_ids[(j2, i)], x_ids[(i, j1, j2)], w_ids[(j1, i, k)], w_ids[(j2, i, k)]]
+                        coefficients = [1, -1, -M, -M, -M]
+                        constrs.append([variables, coefficients])
+                        senses.append('G')
+                        rhs.append(int(instance.p[j1][i]) - 3 * M)
+
+                        variables = [c_ids[(j2, i)], c_ids[(j1, i)], x_ids[(i, j1, j2)], w_ids[(j1, i, k)], w_ids[(j2, i, k)]]
+                        coefficients = [1, -1, M, -M, -M]
+                        constrs.append([variables, coefficients])
+                        senses.append('G')
+                        rhs.append(int(instance.p[j2][i]) - 2 * M)
+        sizes.close_cplex('constraints (4) and (5)', constrs, big_m=True)
+
+        # constraint (6)
+        for j in range(instance.n):
+            variables = [Cmax_id, c_ids[(j, instance.g - 1)]]
+            coefficients = [1, -1]
+            constrs.append([variables, coefficients])
+            senses.append('G')
+            rhs.append(0)
+        sizes.close_cplex('constraint (6)', constrs)
+        sizes.report(result)
+
+        # add variables
+        all_objs = x_objs + w_objs + c_objs + Cmax_obj
+        all_lbs = x_lbs + w_lbs + c_lbs + Cmax_lb
+        all_ubs = x_ubs + w_ubs + c_ubs + Cmax_ub
+        all_types = x_types + w_types + c_types + Cmax_type
+        mdl.variables.add(obj=all_objs, lb=all_lbs, ub=all_ubs, types=all_types)
+        if names:
+            all_names = [f'x_{i}_{j1}_{j2}' for i, j1, j2 in x_keys] + [f'w_{j}_{i}_{k}' for j, i, k in w_keys] + [f'c_{j}_{i}' for j, i in c_keys] + ['Cmax']
+            mdl.variables.set_names(list(enumerate(all_names)))
+
+        # add constraints
+        mdl.linear_constraints.add(lin_expr=constrs, senses=senses, rhs=rhs)
+        if model_cache is not None:
+            model_cache.store(model_file, mdl.write, sizes.families)
+
+    # add the MIP start
+    if start is not None:
+        values = hfsp_mip_start(instance, start)
+        start_indices = [x_ids[key] for key in values['x']] + [w_ids[key] for key in values['w']] + [c_ids[key] for key in values['c']] + [Cmax_id]
+        start_values = list(values['x'].values()) + list(values['w'].values()) + list(values['c'].values()) + [values['Cmax']]
+        mdl.MIP_starts.add(cplex.SparsePair(ind=start_indices, val=start_values), mdl.MIP_starts.effort_level.auto)
 
     # set the objective sense
     mdl.objective.set_sense(mdl.objective.sense.minimize)
@@ -138,87 +300,263 @@ def hfsp_mip_cplex_model(file_path, threads=1, time_limit=3600):
     mdl.set_warning_stream(None)
     mdl.parameters.threads.set(threads)
     mdl.parameters.timelimit.set(time_limit)
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    callback = mdl.register_callback(CplexProgressCallback)
+    callback.result, callback.lower_bound = result, lower_bound
+    mip_cutoff(mdl, lower_bound)
+    tic = time.perf_counter()
     mdl.solve()
-
-    if mdl.solution.is_primal_feasible():
-        Cmax = mdl.solution.get_values('Cmax')
-        print(f'Optimal objective value (CPLEX): {Cmax}')
+    result.solve_time = time.perf_counter() - tic
+    cplex_result(result, mdl, lower_bound)
+
+    if result.objective is not None:
+        values = mdl.solution.get_values()
+        c = [[values[c_ids[(j, i)]] for i in range(instance.g)] for j in range(instance.n)]
+        machine = [[max(range(instance.m[i]), key=lambda k: values[w_ids[(j, i, k)]]) for i in range(instance.g)] for j in range(instance.n)]
+        result.schedule = hfsp_schedule(instance, c, machine)
+        print(f'Optimal objective value (CPLEX): {result.objective}')
     else:
         print('No feasible solution found by CPLEX!')
 
+    return result
 
-def hfsp_mip_gurobi_model(file_path, threads=1, time_limit=3600):
-    instance = parser(file_path)
-
-    # create the model
-    mdl = gp.Model()
 
-    # variable x
-    x_vars = {}
-    for i in range(instance.g):
-        for j1 in range(instance.n - 1):
-            for j2 in range(j1 + 1, instance.n):
-                x_vars[(i, j1, j2)] = mdl.addVar(vtype=GRB.BINARY, name=f'x_{i}_{j1}_{j2}')
+def hfsp_mip_gurobi_model(file_path, threads=1, time_limit=3600, start=None, big_m=None, model_cache=None, lower_bound=None):
+    result = Result('Gurobi')
+    tic = time.perf_counter()
+    instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
+
+    # read the model from the model cache, or else build it
+    M = hfsp_big_m(instance, start) if big_m is None else big_m
+    model_file, cached = (None, False) if model_cache is None else model_cache.lookup(hfsp_mip_gurobi_model, file_path, '.mps.bz2', M)
+    if cached:
+        mdl = gp.read(model_file)
+        FamilySizes(model_cache.families(model_file)).report(result)
+        variables = gurobi_variables(mdl)
+        x_vars, w_vars, c_vars, Cmax = variables['x'], variables['w'], variables['c'], variables['Cmax']
+    else:
+        # create the model
+        mdl = gp.Model()
 
-    # variable w
-    w_vars = {}
-    for j in range(instance.n):
+        # variable x
+        x_vars = {}
         for i in range(instance.g):
-            for k in range(instance.m[i]):
-                w_vars[(j, i, k)] = mdl.addVar(vtype=GRB.BINARY, name=f'w_{j}_{i}_{k}')
+            for j1 in range(instance.n - 1):
+                for j2 in range(j1 + 1, instance.n):
+                    x_vars[(i, j1, j2)] = mdl.addVar(vtype=GRB.BINARY, name=f'x_{i}_{j1}_{j2}')
 
-    # variable c
-    c_vars = {}
-    for j in range(instance.n):
-        for i in range(instance.g):
-            c_vars[(j, i)] = mdl.addVar(vtype=GRB.CONTINUOUS, name=f'c_{j}_{i}', lb=0)
+        # variable w
+        w_vars = {}
+        for j in range(instance.n):
+            for i in range(instance.g):
+                for k in range(instance.m[i]):
+                    w_vars[(j, i, k)] = mdl.addVar(vtype=GRB.BINARY, name=f'w_{j}_{i}_{k}')
 
-    # variable Cmax
-    Cmax = mdl.addVar(vtype=GRB.CONTINUOUS, name='Cmax', lb=0)
+        # variable c
+        c_vars = {}
+        for j in range(instance.n):
+            for i in range(instance.g):
+                c_vars[(j, i)] = mdl.addVar(vtype=GRB.CONTINUOUS, name=f'c_{j}_{i}', lb=0)
 
-    # constraint (1)
-    for j in range(instance.n):
-        mdl.addConstr(c_vars[(j, 0)] >= instance.p[j][0], name=f'constr1_{j}')
+        # variable Cmax
+        Cmax = mdl.addVar(vtype=GRB.CONTINUOUS, name='Cmax', lb=0)
 
-    # constraint (2)
-    for j in range(instance.n):
-        for i in range(1, instance.g):
-            mdl.addConstr(c_vars[(j, i)] >= c_vars[(j, i - 1)] + instance.p[j][i], name=f'constr2_{j}_{i}')
+        # constraint families
+        sizes = FamilySizes()
 
-    # constraint (3)
-    for j in range(instance.n):
-        for i in range(instance.g):
-            mdl.addConstr(gp.quicksum([w_vars[(j, i, k)] for k in range(instance.m[i])]) == 1, name=f'constr3_{j}_{i}')
+        # constraint (1)
+        for j in range(instance.n):
+            mdl.addConstr(c_vars[(j, 0)] >= instance.p[j][0], name=f'constr1_{j}')
+        sizes.close_gurobi('constraint (1)', mdl)
 
-    # constraints (4) and (5)
-    M = 100000
-    for j1 in range(instance.n - 1):
-        for j2 in range(j1 + 1, instance.n):
-            for i in range(instance.g):
-                for k in range(instance.m[i]):
-                    mdl.addConstr(c_vars[(j1, i)] - c_vars[(j2, i)] - M * x_vars[(i, j1, j2)] - M * w_vars[(j1, i, k)] - M * w_vars[(j2, i, k)] >= instance.p[j1][i] - 3 * M, name=f'constr4_{j1}_{j2}_{i}_{k}')
-                    mdl.addConstr(c_vars[(j2, i)] - c_vars[(j1, i)] + M * x_vars[(i, j1, j2)] - M * w_vars[(j1, i, k)] - M * w_vars[(j2, i, k)] >= instance.p[j2][i] - 2 * M, name=f'constr5_{j1}_{j2}_{i}_{k}')
+        # constraint (2)
+        for j in range(instance.n):
+            for i in range(1, instance.g):
+                mdl.addConstr(c_vars[(j, i)] >= c_vars[(j, i - 1)] + instance.p[j][i], name=f'constr2_{j}_{i}')
+        sizes.close_gurobi('constraint (2)', mdl)
 
-    # constraint (6)
-    for j in range(instance.n):
-        mdl.addConstr(Cmax >= c_vars[(j, instance.g - 1)], name=f'constr6_{j}')
+        # constraint (3)
+        for j in range(instance.n):
+            for i in range(instance.g):
+                mdl.addConstr(gp.quicksum([w_vars[(j, i, k)] for k in range(instance.m[i])]) == 1, name=f'constr3_{j}_{i}')
+        sizes.close_gurobi('constraint (3)', mdl)
 
-    # set the objective
-    mdl.setObjective(Cmax, GRB.MINIMIZE)
+        # constraints (4) and (5)
+        for j1 in range(instance.n - 1):
+            for j2 in range(j1 + 1, instance.n):
+                for i in range(instance.g):
+                    for k in range(instance.m[i]):
+                        mdl.addConstr(c_vars[(j1, i)] - c_vars[(j2, i)] - M * x_vars[(i, j1, j2)] - M * w_vars[(j1, i, k)] - M * w_vars[(j2, i, k)] >= instance.p[j1][i] - 3 * M, name=f'constr4_{j1}_{j2}_{i}_{k}')
+                        mdl.addConstr(c_vars[(j2, i)] - c_vars[(j1, i)] + M * x_vars[(i, j1, j2)] - M * w_vars[(j1, i, k)] - M * w_vars[(j2, i, k)] >= instance.p[j2][i] - 2 * M, name=f'constr5_{j1}_{j2}_{i}_{k}')
+        sizes.close_gurobi('constraints (4) and (5)', mdl, big_m=True)
+
+        # constraint (6)
+        for j in range(instance.n):
+            mdl.addConstr(Cmax >= c_vars[(j, instance.g - 1)], name=f'constr6_{j}')
+        sizes.close_gurobi('constraint (6)', mdl)
+        sizes.report(result)
+
+        # set the objective
+        mdl.setObjective(Cmax, GRB.MINIMIZE)
+        if model_cache is not None:
+            model_cache.store(model_file, mdl.write, sizes.families)
+
+    # set the MIP start
+    if start is not None:
+        values = hfsp_mip_start(instance, start)
+        for key, value in values['x'].items():
+            x_vars[key].Start = value
+        for key, value in values['w'].items():
+            w_vars[key].Start = value
+        for key, value in values['c'].items():
+            c_vars[key].Start = value
+        Cmax.Start = values['Cmax']
 
     # solve the model
     mdl.setParam('Threads', threads)
     mdl.setParam('TimeLimit', time_limit)
-    mdl.optimize()
+    mip_cutoff(mdl, lower_bound)
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    tic = time.perf_counter()
+    mdl.optimize(gurobi_progress_callback(result, lower_bound))
+    result.solve_time = time.perf_counter() - tic
+    gurobi_result(result, mdl, lower_bound)
+
+    if result.objective is not None:
+        c = [[c_vars[(j, i)].X for i in range(instance.g)] for j in range(instance.n)]
+        machine = [[max(range(instance.m[i]), key=lambda k: w_vars[(j, i, k)].X) for i in range(instance.g)] for j in range(instance.n)]
+        result.schedule = hfsp_schedule(instance, c, machine)
+        print(f'Optimal objective value (Gurobi): {result.objective}')
+    else:
+        print('No feasible solution found by Gurobi!')
+
+    return result
+
+
+def hfsp_mip_gurobi_matrix_model(file_path, threads=1, time_limit=3600, start=None, big_m=None, model_cache=None, lower_bound=None):
+    """
+    Same model as hfsp_mip_gurobi_model (same variable and constraint order), but every variable family is one slice
+    of a single MVar and every constraint family is added at once with addMConstr from a sparse coefficient matrix.
+    """
+    result = Result('Gurobi')
+    tic = time.perf_counter()
+    instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
+    p = np.asarray(instance.p, dtype=np.float64)
+    m = np.asarray(instance.m)
+
+    # variable indices (w_ids[j, i] + k is the index of w_{j}_{i}_{k})
+    J1, J2 = np.triu_indices(instance.n, 1)
+    num_x = instance.g * len(J1)
+    x_ids = np.full((instance.g, instance.n, instance.n), -1)
+    x_ids[:, J1, J2] = np.arange(num_x).reshape(instance.g, len(J1))
+    w_ids = num_x + np.arange(instance.n)[:, None] * m.sum() + np.concatenate([[0], np.cumsum(m)[:-1]])[None, :]
+    c_ids = num_x + instance.n * m.sum() + np.arange(instance.n * instance.g).reshape(instance.n, instance.g)
+    Cmax_id = num_x + instance.n * m.sum() + instance.n * instance.g
+    num_vars = Cmax_id + 1
+
+    # read the model from the model cache, or else build it
+    M = hfsp_big_m(instance, start) if big_m is None else big_m
+    model_file, cached = (None, False) if model_cache is None else model_cache.lookup(hfsp_mip_gurobi_matrix_model, file_path, '.mps.bz2', M)
+    if cached:
+        mdl = gp.read(model_file)
+        FamilySizes(model_cache.families(model_file)).report(result)
+        v = gp.MVar.fromlist(mdl.getVars())
+    else:
+        mdl = gp.Model()
+
+        # variables x, w, c and Cmax
+        vtypes = np.full(num_vars, GRB.CONTINUOUS)
+        vtypes[:num_x + instance.n * m.sum()] = GRB.BINARY
+        ubs = np.full(num_vars, float('inf'))
+        ubs[:num_x + instance.n * m.sum()] = 1
+        objs = np.zeros(num_vars)
+        objs[Cmax_id] = 1
+        v = mdl.addMVar(num_vars, lb=0, ub=ubs, obj=objs, vtype=vtypes)
+
+        # constraint families
+        sizes = FamilySizes()
+
+        # constraint (1)
+        mdl.addMConstr(sparse_rows(c_ids[:, :1], [1], num_vars), v, GRB.GREATER_EQUAL, p[:, 0])
+        sizes.close_gurobi('constraint (1)', mdl)
+
+        # constraint (2)
+        columns = np.stack([c_ids[:, 1:], c_ids[:, :-1]], axis=-1)
+        mdl.addMConstr(sparse_rows(columns, [1, -1], num_vars), v, GRB.GREATER_EQUAL, p[:, 1:].ravel())
+        sizes.close_gurobi('constraint (2)', mdl)
+
+        # constraint (3), one row of m[i] nonzeros per (j, i)
+        columns = num_x + np.arange(instance.n * m.sum())
+        indptr = np.concatenate([[0], np.cumsum(np.tile(m, instance.n))])
+        A = sp.csr_matrix((np.ones(len(columns)), columns, indptr), shape=(instance.n * instance.g, num_vars))
+        mdl.addMConstr(A, v, GRB.EQUAL, np.ones(instance.n * instance.g))
+        sizes.close_gurobi('constraint (3)', mdl)
+
+        # constraints (4) and (5), interleaved per (j1, j2, i, k) as in hfsp_mip_gurobi_model
+        columns = []
+        coefficients = []
+        rhs = []
+        for i in range(instance.g):
+            k = np.arange(instance.m[i])
+            c1, c2, x, w1, w2 = np.broadcast_arrays(c_ids[J1, i][:, None], c_ids[J2, i][:, None], x_ids[i, J1, J2][:, None], w_ids[J1, i][:, None] + k, w_ids[J2, i][:, None] + k)
+            columns.append(np.stack([np.stack([c1, c2, x, w1, w2], axis=-1), np.stack([c2, c1, x, w1, w2], axis=-1)], axis=2).reshape(len(J1), 2 * instance.m[i], 5))
+            coefficients.append(np.broadcast_to([[1, -1, -M, -M, -M], [1, -1, M, -M, -M]], (len(J1), instance.m[i], 2, 5)).reshape(len(J1), 2 * instance.m[i], 5))
+            shape = (len(J1), instance.m[i])
+            rhs.append(np.stack([np.broadcast_to(p[J1, i][:, None] - 3 * M, shape), np.broadcast_to(p[J2, i][:, None] - 2 * M, shape)], axis=2).reshape(len(J1), 2 * instance.m[i]))
+        columns = np.concatenate(columns, axis=1)
+        coefficients = np.concatenate(coefficients, axis=1)
+        rhs = np.concatenate(rhs, axis=1)
+        mdl.addMConstr(sparse_rows(columns, coefficients, num_vars), v, GRB.GREATER_EQUAL, rhs.ravel())
+        sizes.close_gurobi('constraints (4) and (5)', mdl, big_m=True)
+
+        # constraint (6)
+        columns = np.stack(np.broadcast_arrays(Cmax_id, c_ids[:, -1]), axis=-1)
+        mdl.addMConstr(sparse_rows(columns, [1, -1], num_vars), v, GRB.GREATER_EQUAL, np.zeros(instance.n))
+        sizes.close_gurobi('constraint (6)', mdl)
+        sizes.report(result)
+
+        # set the objective sense
+        mdl.ModelSense = GRB.MINIMIZE
+        if model_cache is not None:
+            model_cache.store(model_file, mdl.write, sizes.families)
+
+    # set the MIP start
+    if start is not None:
+        values = hfsp_mip_start(instance, start)
+        start_values = np.zeros(num_vars)
+        for key, value in values['x'].items():
+            start_values[x_ids[key]] = value
+        for (j, i, k), value in values['w'].items():
+            start_values[w_ids[j, i] + k] = value
+        for key, value in values['c'].items():
+            start_values[c_ids[key]] = value
+        start_values[Cmax_id] = values['Cmax']
+        v.Start = start_values
 
-    if mdl.status == GRB.OPTIMAL or mdl.status == GRB.SUBOPTIMAL:
-        Cmax_value = Cmax.X
-        print(f'Optimal objective value (Gurobi): {Cmax_value}')
+    # solve the model
+    mdl.setParam('Threads', threads)
+    mdl.setParam('TimeLimit', time_limit)
+    mip_cutoff(mdl, lower_bound)
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    tic = time.perf_counter()
+    mdl.optimize(gurobi_progress_callback(result, lower_bound))
+    result.solve_time = time.perf_counter() - tic
+    gurobi_result(result, mdl, lower_bound)
+
+    if result.objective is not None:
+        values = v.X
+        machine = [[np.argmax(values[w_ids[j, i]:w_ids[j, i] + instance.m[i]]) for i in range(instance.g)] for j in range(instance.n)]
+        result.schedule = hfsp_schedule(instance, values[c_ids], machine)
+        print(f'Optimal objective value (Gurobi): {result.objective}')
     else:
         print('No feasible solution found by Gurobi!')
 
+    return result
 
-def hfsp_cp_model1(file_path, threads=1, time_limit=3600, agent='local', execfile='/Applications/CPLEX_Studio1210/cpoptimizer/bin/x86-64_osx/cpoptimizer'):
+
+def hfsp_cp_model1(file_path, threads=1, time_limit=3600, start=None, agent='local', execfile='/Applications/CPLEX_Studio1210/cpoptimizer/bin/x86-64_osx/cpoptimizer', lower_bound=None):
     """
     The execfile parameter specifies the path to the CP Optimizer executable.
     This is required to run the solver, as it defines the core binary that handles the solving process.
@@ -228,8 +566,15 @@ def hfsp_cp_model1(file_path, threads=1, time_limit=3600, agent='local', execfil
       - On Windows: 'C:\\Program Files\\IBM\\ILOG\\CPLEX_Studio1210\\cpoptimizer\\bin\\x64_win64\\cpoptimizer.exe'
       - On Linux: '/opt/ibm/ILOG/CPLEX_Studio1210/cpoptimizer/bin/x86-64_linux/cpoptimizer'
     Ensure the provided path matches the location of the installed CP Optimizer executable on your system.
+    If start (the job sequence start[i][k] of machine k at every stage i, e.g. from hfsp_decode) is given, its schedule
+    is the starting point of the search.
+    If lower_bound (a proven lower bound on the makespan, e.g. from bounds.py) is given, the search stops as soon as a
+    solution reaches it, and that solution is reported as optimal.
     """
+    result = Result('CP Optimizer')
+    tic = time.perf_counter()
     instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
 
     # create the model
     mdl = CpoModel()
@@ -239,7 +584,7 @@ def hfsp_cp_model1(file_path, threads=1, time_limit=3600, agent='local', execfil
     for j in range(instance.n):
         tasks.append([])
         for i in range(instance.g):
-            tasks[j].append(mdl.interval_var(name=f'tasks_{j}_{i}', size=instance.p[j][i]))
+            tasks[j].append(mdl.interval_var(name=f'tasks_{j}_{i}', size=int(instance.p[j][i])))
 
     # constraint (2)
     for j in range(instance.n):
@@ -248,22 +593,43 @@ def hfsp_cp_model1(file_path, threads=1, time_limit=3600, agent='local', execfil
 
     # constraint (3)
     for i in range(instance.g):
-        mdl.add(mdl.sum([mdl.pulse(tasks[j][i], 1) for j in range(instance.n)]) <= instance.m[i])
+        mdl.add(mdl.sum([mdl.pulse(tasks[j][i], 1) for j in range(instance.n)]) <= int(instance.m[i]))
 
     # constraint (4)
     mdl.add(mdl.minimize(mdl.max([mdl.end_of(tasks[j][instance.g - 1]) for j in range(instance.n)])))
 
-    # solve the model
-    result = mdl.solve(TimeLimit=time_limit, Workers=threads, LogVerbosity='Quiet', agent=agent, execfile=execfile)
+    # set the starting point
+    if start is not None:
+        values = hfsp_mip_start(instance, start)
+        starting_point = mdl.create_empty_solution()
+        for j in range(instance.n):
+            for i in range(instance.g):
+                starting_point.add_interval_var_solution(tasks[j][i], start=values['c'][(j, i)] - int(instance.p[j][i]), end=values['c'][(j, i)])
+        mdl.set_starting_point(starting_point)
 
-    if result:
-        print(f'Optimal objective value (CP Optimizer): {result.get_objective_value()}')
+    # solve the model
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    mdl.add_solver_callback(CpProgressCallback(result, lower_bound))
+    tic = time.perf_counter()
+    solution = mdl.solve(TimeLimit=time_limit, Workers=threads, LogVerbosity='Quiet', agent=agent, execfile=execfile)
+    result.solve_time = time.perf_counter() - tic
+    cp_result(result, solution, lower_bound)
+
+    if result.objective is not None:
+        c = [[solution.get_var_solution(tasks[j][i]).get_end() for i in range(instance.g)] for j in range(instance.n)]
+        result.schedule = hfsp_schedule(instance, c, hfsp_machines(instance, c))
+        print(f'Optimal objective value (CP Optimizer): {result.objective}')
     else:
         print('No feasible solution found by CP Optimizer!')
 
+    return result
+
 
-def hfsp_cp_model2(file_path, threads=1, time_limit=3600, agent='local', execfile='/Applications/CPLEX_Studio1210/cpoptimizer/bin/x86-64_osx/cpoptimizer'):
+def hfsp_cp_model2(file_path, threads=1, time_limit=3600, start=None, agent='local', execfile='/Applications/CPLEX_Studio1210/cpoptimizer/bin/x86-64_osx/cpoptimizer', lower_bound=None):
+    result = Result('CP Optimizer')
+    tic = time.perf_counter()
     instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
 
     # create the model
     mdl = CpoModel()
@@ -275,7 +641,7 @@ def hfsp_cp_model2(file_path, threads=1, time_limit=3600, agent='local', execfil
         for i in range(instance.g):
             tasks[j].append([])
             for k in range(instance.m[i]):
-                tasks[j][i].append(mdl.interval_var(name=f'tasks_{j}_{i}_{k}', optional=True, size=instance.p[j][i]))
+                tasks[j][i].append(mdl.interval_var(name=f'tasks_{j}_{i}_{k}', optional=True, size=int(instance.p[j][i])))
 
     # constraint (2)
     _tasks = []
@@ -300,21 +666,50 @@ def hfsp_cp_model2(file_path, threads=1, time_limit=3600, agent='local', execfil
     # constraint (5)
     mdl.add(mdl.minimize(mdl.max([mdl.end_of(_tasks[j][instance.g - 1]) for j in range(instance.n)])))
 
-    # solve the model
-    result = mdl.solve(TimeLimit=time_limit, Workers=threads, LogVerbosity='Quiet', agent=agent, execfile=execfile)
+    # set the starting point
+    if start is not None:
+        values = hfsp_mip_start(instance, start)
+        starting_point = mdl.create_empty_solution()
+        for j in range(instance.n):
+            for i in range(instance.g):
+                end = values['c'][(j, i)]
+                starting_point.add_interval_var_solution(_tasks[j][i], start=end - int(instance.p[j][i]), end=end)
+                for k in range(instance.m[i]):
+                    if values['w'][(j, i, k)]:
+                        starting_point.add_interval_var_solution(tasks[j][i][k], presence=True, start=end - int(instance.p[j][i]), end=end)
+                    else:
+                        starting_point.add_interval_var_solution(tasks[j][i][k], presence=False)
+        mdl.set_starting_point(starting_point)
 
-    if result:
-        print(f'Optimal objective value (CP Optimizer): {result.get_objective_value()}')
+    # solve the model
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    mdl.add_solver_callback(CpProgressCallback(result, lower_bound))
+    tic = time.perf_counter()
+    solution = mdl.solve(TimeLimit=time_limit, Workers=threads, LogVerbosity='Quiet', agent=agent, execfile=execfile)
+    result.solve_time = time.perf_counter() - tic
+    cp_result(result, solution, lower_bound)
+
+    if result.objective is not None:
+        c = [[solution.get_var_solution(_tasks[j][i]).get_end() for i in range(instance.g)] for j in range(instance.n)]
+        machine = [[next(k for k in range(instance.m[i]) if solution.get_var_solution(tasks[j][i][k]).is_present()) for i in range(instance.g)] for j in range(instance.n)]
+        result.schedule = hfsp_schedule(instance, c, machine)
+        print(f'Optimal objective value (CP Optimizer): {result.objective}')
     else:
         print('No feasible solution found by CP Optimizer!')
 
+    return result
+
 
 if __name__ == '__main__':
     path = 'test cases/0.txt'
-    print('-------------------------------CPLEX-------------------------------')
-    hfsp_mip_cplex_model(path, threads=6)
+    print('-------------------------------List scheduling-------------------------------')
+    instance = parser(path)
+    start, Cmax = hfsp_decode(instance, np.argsort(-instance.p.sum(axis=1), kind='stable'))
+    print(f'Objective value (list scheduling): {Cmax}')
+    print('\n\n\n-------------------------------CPLEX-------------------------------')
+    hfsp_mip_cplex_model(path, threads=6, start=start)
     print('\n\n\n-------------------------------Gurobi-------------------------------')
-    hfsp_mip_gurobi_model(path, threads=6)
+    hfsp_mip_gurobi_model(path, threads=6, start=start)
     print('\n\n\n-------------------------------Constraint Programming------------------------------')
-    hfsp_cp_model1(path)
-    hfsp_cp_model2(path)
+    hfsp_cp_model1(path, start=start)
+    hfsp_cp_model2(path, start=start)
@@ -1,119 +1,590 @@
+import os
+import sys
+import random
+import time
+from collections import deque
+import numpy as np
 import cplex
 import gurobipy as gp
 from gurobipy import GRB
 from docplex.cp.model import CpoModel
 
+# the code shared by the model scripts lives in common.py at the top of the repository
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import CACHE_MIN_SIZE, read_integers, read_cache, write_cache, disjunctive_keys, Result, cplex_result, gurobi_result, cp_result, CplexProgressCallback, gurobi_progress_callback, mip_cutoff, CpProgressCallback, FamilySizes, Disjunctions, CplexDisjunctionCallback, gurobi_disjunction_callback, gurobi_variables, sparse_rows
+
 
 class JSP:
+    __slots__ = ('n', 'g', 'p', 'r', 'machine', 'position', 'duration', 'operations')
+
     def __init__(self):
         self.n = 0  # the number of jobs
         self.g = 0  # the number of stages
-        self.p = []  # the set of processing times
-        self.r = []  # the set of routes
+        self.p = np.zeros((0, 0), dtype=np.int32)  # the set of processing times, p[j][i] of the i-th operation of job j
+        self.r = np.zeros((0, 0), dtype=np.int32)  # the set of routes, r[j][i] the (1-based) machine of that operation
+        # the disjunctive graph, derived from p and r by the parser: operation o = j * g + k is the k-th operation of
+        # job j, its job successor is o + 1 (if k < g - 1), and p.ravel()[o] and machine.ravel()[o] are its data
+        self.machine = np.zeros((0, 0), dtype=np.int32)  # machine[j][k], the 0-based machine of operation k of job j
+        self.position = np.zeros((0, 0), dtype=np.int32)  # position[j][i], the route position of job j on machine i
+        self.duration = np.zeros((0, 0), dtype=np.int32)  # duration[j][i], the processing time of job j on machine i
+        self.operations = np.zeros((0, 0), dtype=np.int32)  # operations[i], the operations of machine i in job order
 
 
-def parser(file_path):
-    instance = JSP()
+def read_text(file_path):
+    """
+    Parse an instance file in bulk: the header lines one by one and the rest of the file as one block of integers.
+    """
     with open(file_path, 'r') as f:
-        instance.n = int(f.readline().strip().split()[0])
-        instance.g = int(f.readline().strip().split()[0])
-        instance.p = []
-        for _ in range(instance.n):
-            instance.p.append([int(x) for x in f.readline().strip().split()])
-        instance.r = []
-        for _ in range(instance.n):
-            instance.r.append([int(x) for x in f.readline().strip().split()])
+        n = int(f.readline().strip().split()[0])
+        g = int(f.readline().strip().split()[0])
+        body = read_integers(f, 2 * n * g, file_path)
+    return {'p': body[:n * g].reshape(n, g), 'r': body[n * g:2 * n * g].reshape(n, g)}
+
+
+def parser(file_path, cache=True):
+    # opening an .npz archive costs more than parsing a small file, so only large files are cached
+    cache = cache and os.path.getsize(file_path) >= CACHE_MIN_SIZE
+    arrays = read_cache(file_path) if cache else None
+    if arrays is None:
+        arrays = read_text(file_path)
+        if cache:
+            write_cache(file_path, arrays)
+    instance = JSP()
+    instance.p = arrays['p']
+    instance.r = arrays['r']
+    instance.n, instance.g = (int(x) for x in instance.p.shape)
+    instance.machine = instance.r - 1
+    instance.position = np.argsort(instance.machine, axis=1).astype(np.int32)
+    instance.duration = np.take_along_axis(instance.p, instance.position, axis=1)
+    instance.operations = (np.arange(instance.n, dtype=np.int32) * instance.g + instance.position.T).astype(np.int32)
     return instance
 
 
-def jsp_mip_cplex_model(file_path, threads=1, time_limit=3600):
+def jsp_completion_times(instance, sequences):
+    """
+    Return the completion times c[j][i] of job j on machine i (0-based) of the semi-active schedule defined by one job
+    sequence per machine. Raises ValueError if the sequences conflict with the routes (cyclic disjunctive graph).
+    """
+    c = [[0] * instance.g for _ in range(instance.n)]
+    job_next = [0] * instance.n
+    job_ready = [0] * instance.n
+    machine_next = [0] * instance.g
+    machine_ready = [0] * instance.g
+    scheduled = 0
+    while scheduled < instance.n * instance.g:
+        progress = False
+        for i in range(instance.g):
+            while machine_next[i] < len(sequences[i]):
+                j = sequences[i][machine_next[i]]
+                k = job_next[j]
+                if k == instance.g or instance.machine[j][k] != i:
+                    break
+                t = max(job_ready[j], machine_ready[i]) + int(instance.p[j][k])
+                c[j][i] = t
+                job_ready[j] = machine_ready[i] = t
+                job_next[j] += 1
+                machine_next[i] += 1
+                scheduled += 1
+                progress = True
+        if not progress:
+            raise ValueError('The machine sequences are infeasible for the job routes!')
+    return c
+
+
+def jsp_dispatch(instance):
+    """
+    Giffler and Thompson's active schedule generation with the most-work-remaining priority rule: repeatedly take the
+    machine of the operation that can complete first, and schedule on it the job with the most work remaining among
+    those whose next operation could start there before that completion.
+    Returns one job sequence per machine.
+    """
+    p = instance.p.tolist()
+    machine = instance.machine.tolist()
+    remaining = [sum(row) for row in p]
+    job_next = [0] * instance.n
+    job_ready = [0] * instance.n
+    machine_ready = [0] * instance.g
+    sequences = [[] for _ in range(instance.g)]
+    for _ in range(instance.n * instance.g):
+        first_end, i = min((max(job_ready[j], machine_ready[machine[j][k]]) + p[j][k], machine[j][k]) for j, k in enumerate(job_next) if k < instance.g)
+        candidates = [j for j, k in enumerate(job_next) if k < instance.g and machine[j][k] == i and job_ready[j] < first_end]
+        j = max(candidates, key=remaining.__getitem__)
+        k = job_next[j]
+        job_ready[j] = machine_ready[i] = max(job_ready[j], machine_ready[i]) + p[j][k]
+        job_next[j] += 1
+        remaining[j] -= p[j][k]
+        sequences[i].append(j)
+    return sequences
+
+
+class DisjunctiveGraph:
+    """
+    A schedule of a JSP instance as its disjunctive graph: the operation sequence of every machine, together with the
+    head (earliest start) and tail (longest path from its end to the sink) of every operation. Operation o = j * g + k
+    is the k-th operation of job j, as in JSP.
+    """
+    __slots__ = ('g', 'd', 'machine', 'jp', 'js', 'last', 'sequences', 'mp', 'ms', 'position', 'head', 'tail')
+
+    def __init__(self, instance, sequences):
+        size = instance.n * instance.g
+        self.g = instance.g  # the number of operations per job
+        self.d = instance.p.ravel().tolist()  # d[o], the processing time of operation o
+        self.machine = instance.machine.ravel().tolist()  # machine[o], the machine of operation o
+        self.jp = [o - 1 if o % instance.g else -1 for o in range(size)]  # jp[o], the job predecessor of o (or -1)
+        self.js = [o + 1 if (o + 1) % instance.g else -1 for o in range(size)]  # js[o], the job successor of o (or -1)
+        self.last = list(range(instance.g - 1, size, instance.g))  # the last operation of every job
+        # sequences[i], the operations of machine i in processing order
+        operations = instance.operations.tolist()
+        self.sequences = [[operations[i][j] for j in sequence] for i, sequence in enumerate(sequences)]
+        self.mp = [-1] * size  # mp[o], the machine predecessor of o (or -1)
+        self.ms = [-1] * size  # ms[o], the machine successor of o (or -1)
+        self.position = [0] * size  # position[o], the index of o in the sequence of its machine
+        self.head = [0] * size  # head[o], the length of the longest path from the source to the start of o
+        self.tail = [0] * size  # tail[o], the length of the longest path from the end of o to the sink
+        for sequence in self.sequences:
+            self.link(sequence, 0, len(sequence) - 1)
+        self.evaluate()
+
+    def link(self, sequence, lo, hi):
+        """
+        Update the machine arcs and positions of the operations sequence[lo], ..., sequence[hi] and of their neighbours.
+        """
+        mp, ms, position = self.mp, self.ms, self.position
+        for t in range(max(lo - 1, 0), min(hi + 2, len(sequence))):
+            o = sequence[t]
+            position[o] = t
+            mp[o] = sequence[t - 1] if t else -1
+            ms[o] = sequence[t + 1] if t + 1 < len(sequence) else -1
+
+    def evaluate(self):
+        """
+        Compute all the heads and tails in one topological pass over the graph. Raises ValueError if the sequences
+        conflict with the routes (cyclic graph).
+        """
+        d, jp, js, mp, ms, head, tail = self.d, self.jp, self.js, self.mp, self.ms, self.head, self.tail
+        indegree = [(a >= 0) + (b >= 0) for a, b in zip(jp, mp)]
+        order = [o for o, count in enumerate(indegree) if not count]
+        head[:] = [0] * len(d)
+        for o in order:
+            end = head[o] + d[o]
+            for s in (js[o], ms[o]):
+                if s >= 0:
+                    if head[s] < end:
+                        head[s] = end
+                    indegree[s] -= 1
+                    if not indegree[s]:
+                        order.append(s)
+        if len(order) < len(d):
+            raise ValueError('The machine sequences are infeasible for the job routes!')
+        for o in reversed(order):
+            a, b = js[o], ms[o]
+            t = tail[a] + d[a] if a >= 0 else 0
+            tail[o] = max(t, tail[b] + d[b]) if b >= 0 else t
+
+    def update_heads(self, seeds):
+        """
+        Recompute the heads of the seed operations and propagate every change to their successors.
+        """
+        d, jp, js, mp, ms, head = self.d, self.jp, self.js, self.mp, self.ms, self.head
+        queue = deque(seeds)
+        queued = set(seeds)
+        while queue:
+            o = queue.popleft()
+            queued.discard(o)
+            a, b = jp[o], mp[o]
+            h = head[a] + d[a] if a >= 0 else 0
+            if b >= 0 and head[b] + d[b] > h:
+                h = head[b] + d[b]
+            if h != head[o]:
+                head[o] = h
+                for s in (js[o], ms[o]):
+                    if s >= 0 and s not in queued:
+                        queue.append(s)
+                        queued.add(s)
+
+    def update_tails(self, seeds):
+        """
+        Recompute the tails of the seed operations and propagate every change to their predecessors.
+        """
+        d, jp, js, mp, ms, tail = self.d, self.jp, self.js, self.mp, self.ms, self.tail
+        queue = deque(seeds)
+        queued = set(seeds)
+        while queue:
+            o = queue.popleft()
+            queued.discard(o)
+            a, b = js[o], ms[o]
+            t = tail[a] + d[a] if a >= 0 else 0
+            if b >= 0 and tail[b] + d[b] > t:
+                t = tail[b] + d[b]
+            if t != tail[o]:
+                tail[o] = t
+                for s in (jp[o], mp[o]):
+                    if s >= 0 and s not in queued:
+                        queue.append(s)
+                        queued.add(s)
+
+    def makespan(self):
+        return max(self.head[o] + self.d[o] for o in self.last)
+
+    def critical_blocks(self):
+        """
+        Return the blocks of a critical path, i.e. its maximal runs of operations on one machine, as (machine, first
+        position, last position) in the sequence of the machine, in path order.
+        """
+        d, jp, mp, head, machine = self.d, self.jp, self.mp, self.head, self.machine
+        Cmax = self.makespan()
+        o = next(o for o in self.last if head[o] + d[o] == Cmax)
+        path = [o]
+        while head[o]:
+            b = mp[o]
+            o = b if b >= 0 and head[b] + d[b] == head[o] else jp[o]
+            path.append(o)
+        blocks = []
+        end = path[0]
+        for k in range(1, len(path) + 1):
+            if k == len(path) or machine[path[k]] != machine[end]:
+                blocks.append((machine[end], self.position[path[k - 1]], self.position[end]))
+                if k < len(path):
+                    end = path[k]
+        blocks.reverse()
+        return blocks
+
+    def feasible(self, i, a, b):
+        """
+        Return whether moving the operation at position a of machine i to position b keeps the graph acyclic, by the
+        sufficient conditions of Balas and Vazacopoulos for operations of a critical block.
+        """
+        sequence, d, head, tail = self.sequences[i], self.d, self.head, self.tail
+        if a < b:
+            u, v = sequence[a], sequence[b]
+            s = self.js[u]
+            return s < 0 or tail[v] + d[v] >= tail[s] + d[s]
+        u, v = sequence[b], sequence[a]
+        s = self.jp[v]
+        return s < 0 or head[u] + d[u] >= head[s] + d[s]
+
+    def moved(self, i, a, b):
+        """
+        Return the operations of positions min(a, b), ..., max(a, b) of machine i in their order after the move.
+        """
+        sequence = self.sequences[i]
+        if a < b:
+            return sequence[a + 1:b + 1] + [sequence[a]]
+        return [sequence[a]] + sequence[b:a]
+
+    def estimate(self, i, a, b):
+        """
+        Estimate the makespan after moving the operation at position a of machine i to position b: the longest path
+        through the moved operations, with their heads and tails recomputed from those of their neighbours.
+        """
+        sequence, d, jp, js, head, tail = self.sequences[i], self.d, self.jp, self.js, self.head, self.tail
+        moved = self.moved(i, a, b)
+        lo, hi = min(a, b), max(a, b)
+        end = head[sequence[lo - 1]] + d[sequence[lo - 1]] if lo else 0
+        heads = []
+        for o in moved:
+            s = jp[o]
+            h = head[s] + d[s] if s >= 0 and head[s] + d[s] > end else end
+            heads.append(h)
+            end = h + d[o]
+        rest = tail[sequence[hi + 1]] + d[sequence[hi + 1]] if hi + 1 < len(sequence) else 0
+        longest = 0
+        for o, h in zip(reversed(moved), reversed(heads)):
+            s = js[o]
+            t = tail[s] + d[s] if s >= 0 and tail[s] + d[s] > rest else rest
+            longest = max(longest, h + d[o] + t)
+            rest = t + d[o]
+        return longest
+
+    def apply(self, i, a, b):
+        """
+        Move the operation at position a of machine i to position b and update the heads and tails incrementally.
+        """
+        sequence = self.sequences[i]
+        sequence.insert(b, sequence.pop(a))
+        lo, hi = min(a, b), max(a, b)
+        self.link(sequence, lo, hi)
+        moved = sequence[lo:hi + 1]
+        self.update_heads(moved + sequence[hi + 1:hi + 2])
+        self.update_tails(moved[::-1] + sequence[max(lo - 1, 0):lo])
+
+    def moves(self):
+        """
+        Return the feasible moves (machine, from position, to position) of the N7 neighbourhood of Zhang et al. on a
+        critical path: in every block, any operation moves to the front or the back of the block and the first or last
+        operation moves to any position inside it. Swaps of the first two operations of the first block and of the last
+        two of the last block are left out, as in the N5 neighbourhood of Nowicki and Smutnicki, since they cannot
+        shorten the path.
+        """
+        blocks = self.critical_blocks()
+        moves = set()
+        for index, (i, s, e) in enumerate(blocks):
+            if s == e:
+                continue
+            for t in range(s, e):
+                moves.update(((i, s, t + 1), (i, t, e), (i, e, t), (i, t + 1, s)))
+            # the swaps of neighbours, each kept once as a forward move
+            moves.difference_update(((i, s, s + 1), (i, s + 1, s), (i, e - 1, e), (i, e, e - 1)))
+            if index > 0:
+                moves.add((i, s, s + 1))
+            if index < len(blocks) - 1:
+                moves.add((i, e - 1, e))
+        # swaps of neighbours on a critical path are always feasible
+        return [(i, a, b) for i, a, b in moves if b == a + 1 or self.feasible(i, a, b)]
+
+    def job_sequences(self):
+        """
+        Return the job sequence of every machine.
+        """
+        return [[o // self.g for o in sequence] for sequence in self.sequences]
+
+
+def jsp_tabu_search(instance, time_limit=10, iterations=None, start=None, lower_bound=None, seed=0):
+    """
+    Tabu search on the critical path (in the spirit of Nowicki and Smutnicki's TSAB) from a start given as one job
+    sequence per machine, by default the schedule of jsp_dispatch. Every iteration makes the move of the N7
+    neighbourhood (see DisjunctiveGraph.moves) with the smallest estimated makespan that does not restore the order of
+    two operations swapped within the last tabu tenure iterations, unless it beats the best makespan. The heads and
+    tails are updated incrementally after each move. After 'patience' iterations without improvement the search
+    restarts from the best schedule, perturbed by a few random moves.
+    The search stops after time_limit seconds or the given number of iterations, or as soon as it reaches lower_bound.
+    Returns one job sequence per machine (a start for the MIP and CP models) and its makespan.
+    """
+    tic = time.perf_counter()
+    rng = random.Random(seed)
+    graph = DisjunctiveGraph(instance, jsp_dispatch(instance) if start is None else start)
+    best = graph.makespan()
+    best_sequences = graph.job_sequences()
+    size = instance.n * instance.g
+    tenure = 10 + instance.n // instance.g
+    patience = 5 * size
+    tabu = {}  # tabu[o1 * size + o2], the last iteration in which o1 may not be put back before o2
+    iteration = stall = 0
+    while best > (lower_bound or 0) and (iterations is None or iteration < iterations) and time.perf_counter() - tic < time_limit:
+        iteration += 1
+        moves = graph.moves()
+        if not moves:
+            # the critical path is a single job or a single machine, so the schedule is optimal
+            break
+        chosen = fallback = None
+        chosen_value = fallback_value = float('inf')
+        ties = 0
+        for i, a, b in moves:
+            value = graph.estimate(i, a, b)
+            sequence = graph.sequences[i]
+            if a < b:
+                u = sequence[a]
+                forbidden = any(tabu.get(o * size + u, 0) >= iteration for o in sequence[a + 1:b + 1])
+            else:
+                v = sequence[a]
+                forbidden = any(tabu.get(v * size + o, 0) >= iteration for o in sequence[b:a])
+            if forbidden and value >= best:
+                if value < fallback_value:
+                    fallback, fallback_value = (i, a, b), value
+                continue
+            # break ties at random
+            if value < chosen_value:
+                chosen, chosen_value, ties = (i, a, b), value, 1
+            elif value == chosen_value:
+                ties += 1
+                if rng.randrange(ties) == 0:
+                    chosen = (i, a, b)
+        i, a, b = chosen or fallback
+        sequence = graph.sequences[i]
+        expiry = iteration + rng.randint(tenure, tenure + tenure // 2)
+        if a < b:
+            u = sequence[a]
+            tabu.update((u * size + o, expiry) for o in sequence[a + 1:b + 1])
+        else:
+            v = sequence[a]
+            tabu.update((o * size + v, expiry) for o in sequence[b:a])
+        graph.apply(i, a, b)
+        Cmax = graph.makespan()
+        if Cmax < best:
+            best, best_sequences, stall = Cmax, graph.job_sequences(), 0
+        else:
+            stall += 1
+        if stall >= patience:
+            graph = DisjunctiveGraph(instance, best_sequences)
+            for _ in range(rng.randint(2, 5)):
+                moves = graph.moves()
+                if moves:
+                    graph.apply(*rng.choice(moves))
+            tabu.clear()
+            stall = 0
+    return best_sequences, best
+
+
+def jsp_mip_start(instance, start):
+    """
+    Translate one job sequence per machine into consistent values of the MIP variables x, c and Cmax.
+    Returns a dictionary that maps each variable family to {index: value} (Cmax maps to its value).
+    """
+    c = jsp_completion_times(instance, start)
+    position = [{job: k for k, job in enumerate(start[i])} for i in range(instance.g)]
+    x_values = {(i, j1, j2): int(position[i][j1] > position[i][j2]) for j1 in range(instance.n - 1) for j2 in range(j1 + 1, instance.n) for i in range(instance.g)}
+    c_values = {(j, i): c[j][i] for j in range(instance.n) for i in range(instance.g)}
+    return {'x': x_values, 'c': c_values, 'Cmax': max(max(c[j]) for j in range(instance.n))}
+
+
+def jsp_big_m(instance, start=None):
+    """
+    Return an instance-derived big-M for the disjunctive constraints: the makespan of the semi-active schedule that
+    dispatches the operations job by job in round-robin order (never more than the sum of all processing times), or of
+    the MIP start if that is larger (so the start stays feasible). Some optimal schedule completes every operation by
+    then, so the gap between two completion times never exceeds it.
+    """
+    sequences = [[] for _ in range(instance.g)]
+    for k in range(instance.g):
+        for j in range(instance.n):
+            sequences[instance.machine[j][k]].append(j)
+    horizon = max(max(c) for c in jsp_completion_times(instance, sequences))
+    if start is not None:
+        horizon = max(horizon, jsp_mip_start(instance, start)['Cmax'])
+    return int(horizon)
+
+
+def jsp_lazy_seed(instance):
+    """
+    Return the seed of the lazy MIP models (see Disjunctions) as the arrays (j1, j2, i) of its disjunctive constraints:
+    the pairs of jobs j1 < j2 that are adjacent in the sequence of machine i in the schedule of jsp_dispatch.
+    """
+    sequences = np.asarray(jsp_dispatch(instance)).reshape(instance.g, instance.n)
+    first, second = np.minimum(sequences[:, :-1], sequences[:, 1:]), np.maximum(sequences[:, :-1], sequences[:, 1:])
+    return first.ravel(), second.ravel(), np.repeat(np.arange(instance.g), instance.n - 1)
+
+
+def jsp_schedule(instance, c):
+    """
+    Return the (job, operation, machine, start, end) tuples of the schedule with completion times c[j][i] of job j on
+    machine i, where operation k of job j is processed on machine machine[j][k].
+    """
+    schedule = []
+    for j in range(instance.n):
+        for k in range(instance.g):
+            i = int(instance.machine[j][k])
+            schedule.append((j, k, i, float(c[j][i] - instance.p[j][k]), float(c[j][i])))
+    return schedule
+
+
+def jsp_mip_cplex_model(file_path, threads=1, time_limit=3600, start=None, big_m=None, names=False, model_cache=None, lower_bound=None, lazy=False):
+    result = Result('CPLEX')
+    tic = time.perf_counter()
     instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
 
     # create the model
     mdl = cplex.Cplex()
 
     # variable x
-    x_names = [f'x_{i}_{j1}_{j2}' for j1 in range(instance.n - 1) for j2 in range(j1 + 1, instance.n) for i in range(instance.g)]
-    x_objs = [0] * len(x_names)
-    x_lbs = [0] * len(x_names)
-    x_ubs = [1] * len(x_names)
-    x_types = ['B'] * len(x_names)
+    x_keys = [(i, j1, j2) for j1 in range(instance.n - 1) for j2 in range(j1 + 1, instance.n) for i in range(instance.g)]
+    x_objs = [0] * len(x_keys)
+    x_lbs = [0] * len(x_keys)
+    x_ubs = [1] * len(x_keys)
+    x_types = ['B'] * len(x_keys)
 
     # variable c
-    c_names = [f'c_{j}_{i}' for j in range(instance.n) for i in range(instance.g)]
-    c_objs = [0] * len(c_names)
-    c_lbs = [0] * len(c_names)
-    c_ubs = [float('inf')] * len(c_names)
-    c_types = ['C'] * len(c_names)
+    c_keys = [(j, i) for j in range(instance.n) for i in range(instance.g)]
+    c_objs = [0] * len(c_keys)
+    c_lbs = [0] * len(c_keys)
+    c_ubs = [float('inf')] * len(c_keys)
+    c_types = ['C'] * len(c_keys)
 
     # variable Cmax
-    Cmax_name = ['Cmax']
     Cmax_obj = [1]
     Cmax_lb = [0]
     Cmax_ub = [float('inf')]
     Cmax_type = ['C']
 
-    # constraints
-    constrs = []
-    senses = []
-    rhs = []
-
-    # constraint (1)
-    for j in range(instance.n):
-        variables = [f'c_{j}_{instance.r[j][0] - 1}']
-        coefficients = [1]
-        constrs.append([variables, coefficients])
-        senses.append('G')
-        rhs.append(instance.p[j][0])
-
-    # constraint (2)
-    for j in range(instance.n):
-        for i in range(1, instance.g):
-            variables = [f'c_{j}_{instance.r[j][i] - 1}', f'c_{j}_{instance.r[j][i - 1] - 1}']
-            coefficients = [1, -1]
+    # variable indices
+    x_ids = {key: index for index, key in enumerate(x_keys)}
+    c_ids = {key: len(x_keys) + index for index, key in enumerate(c_keys)}
+    Cmax_id = len(x_keys) + len(c_keys)
+
+    # read the model from the model cache, or else build it
+    M = jsp_big_m(instance, start) if big_m is None else big_m
+    model_file, cached = (None, False) if model_cache is None else model_cache.lookup(jsp_mip_cplex_model, file_path, '.sav', M, names, lazy)
+    if cached:
+        mdl.read(model_file)
+        FamilySizes(model_cache.families(model_file)).report(result)
+    else:
+        # in lazy mode, only the disjunctive constraints of the seed (the callback adds the others on demand)
+        seed = jsp_lazy_seed(instance) if lazy else None
+
+        # constraints
+        constrs = []
+        senses = []
+        rhs = []
+        sizes = FamilySizes()
+
+        # constraint (1)
+        for j in range(instance.n):
+            variables = [c_ids[(j, instance.machine[j][0])]]
+            coefficients = [1]
             constrs.append([variables, coefficients])
             senses.append('G')
-            rhs.append(instance.p[j][i])
-
-    # constraint (3)
-    M = 1000000
-    for j1 in range(instance.n - 1):
-        for j2 in range(j1 + 1, instance.n):
-            for i in range(instance.g):
-                variables = [f'c_{j1}_{i}', f'c_{j2}_{i}', f'x_{i}_{j1}_{j2}']
-                coefficients = [1, -1, -M]
+            rhs.append(int(instance.p[j][0]))
+        sizes.close_cplex('constraint (1)', constrs)
+
+        # constraint (2)
+        for j in range(instance.n):
+            for i in range(1, instance.g):
+                variables = [c_ids[(j, instance.machine[j][i])], c_ids[(j, instance.machine[j][i - 1])]]
+                coefficients = [1, -1]
                 constrs.append([variables, coefficients])
                 senses.append('G')
-                rhs.append(instance.p[j1][instance.r[j1].index(i + 1)] - M)
+                rhs.append(int(instance.p[j][i]))
+        sizes.close_cplex('constraint (2)', constrs)
 
-    # constraint (4)
-    for j1 in range(instance.n - 1):
-        for j2 in range(j1 + 1, instance.n):
-            for i in range(instance.g):
-                variables = [f'c_{j2}_{i}', f'c_{j1}_{i}', f'x_{i}_{j1}_{j2}']
-                coefficients = [1, -1, M]
-                constrs.append([variables, coefficients])
-                senses.append('G')
-                rhs.append(instance.p[j2][instance.r[j2].index(i + 1)])
+        # constraint (3)
+        for j1, j2, i in disjunctive_keys(instance, seed):
+            variables = [c_ids[(j1, i)], c_ids[(j2, i)], x_ids[(i, j1, j2)]]
+            coefficients = [1, -1, -M]
+            constrs.append([variables, coefficients])
+            senses.append('G')
+            rhs.append(int(instance.duration[j1][i]) - M)
+        sizes.close_cplex('constraint (3)', constrs, big_m=True)
 
-    # constraint (5)
-    for j in range(instance.n):
-        variables = ['Cmax', f'c_{j}_{instance.r[j][-1] - 1}']
-        coefficients = [1, -1]
-        constrs.append([variables, coefficients])
-        senses.append('G')
-        rhs.append(0)
-
-    # add variables
-    all_names = x_names + c_names + Cmax_name
-    all_objs = x_objs + c_objs + Cmax_obj
-    all_lbs = x_lbs + c_lbs + Cmax_lb
-    all_ubs = x_ubs + c_ubs + Cmax_ub
-    all_types = x_types + c_types + Cmax_type
-    mdl.variables.add(obj=all_objs, lb=all_lbs, ub=all_ubs, names=all_names, types=all_types)
-
-    # add constraints
-    mdl.linear_constraints.add(lin_expr=constrs, senses=senses, rhs=rhs)
+        # constraint (4)
+        for j1, j2, i in disjunctive_keys(instance, seed):
+            variables = [c_ids[(j2, i)], c_ids[(j1, i)], x_ids[(i, j1, j2)]]
+            coefficients = [1, -1, M]
+            constrs.append([variables, coefficients])
+            senses.append('G')
+            rhs.append(int(instance.duration[j2][i]))
+        sizes.close_cplex('constraint (4)', constrs, big_m=True)
+
+        # constraint (5)
+        for j in range(instance.n):
+            variables = [Cmax_id, c_ids[(j, instance.machine[j][-1])]]
+            coefficients = [1, -1]
+            constrs.append([variables, coefficients])
+            senses.append('G')
+            rhs.append(0)
+        sizes.close_cplex('constraint (5)', constrs)
+        sizes.report(result)
+
+        # add variables
+        all_objs = x_objs + c_objs + Cmax_obj
+        all_lbs = x_lbs + c_lbs + Cmax_lb
+        all_ubs = x_ubs + c_ubs + Cmax_ub
+        all_types = x_types + c_types + Cmax_type
+        mdl.variables.add(obj=all_objs, lb=all_lbs, ub=all_ubs, types=all_types)
+        if names:
+            all_names = [f'x_{i}_{j1}_{j2}' for i, j1, j2 in x_keys] + [f'c_{j}_{i}' for j, i in c_keys] + ['Cmax']
+            mdl.variables.set_names(list(enumerate(all_names)))
+
+        # add constraints
+        mdl.linear_constraints.add(lin_expr=constrs, senses=senses, rhs=rhs)
+        if model_cache is not None:
+            model_cache.store(model_file, mdl.write, sizes.families)
+
+    # add the MIP start
+    if start is not None:
+        values = jsp_mip_start(instance, start)
+        start_indices = [x_ids[key] for key in values['x']] + [c_ids[key] for key in values['c']] + [Cmax_id]
+        start_values = list(values['x'].values()) + list(values['c'].values()) + [values['Cmax']]
+        mdl.MIP_starts.add(cplex.SparsePair(ind=start_indices, val=start_values), mdl.MIP_starts.effort_level.auto)
 
     # set the objective sense
     mdl.objective.set_sense(mdl.objective.sense.minimize)
@@ -122,79 +593,254 @@ def jsp_mip_cplex_model(file_path, threads=1, time_limit=3600):
     mdl.set_warning_stream(None)
     mdl.parameters.threads.set(threads)
     mdl.parameters.timelimit.set(time_limit)
+    if lazy:
+        # no dual reductions, which may cut off solutions with the constraints that are not in the model yet
+        mdl.parameters.preprocessing.reduce.set(1)
+        mdl.parameters.preprocessing.linear.set(0)
+        J1, J2 = np.triu_indices(instance.n, 1)
+        c_columns = np.array([[c_ids[(j, i)] for i in range(instance.g)] for j in range(instance.n)])
+        x_columns = np.array([[x_ids[(i, j1, j2)] for i in range(instance.g)] for j1, j2 in zip(J1.tolist(), J2.tolist())], dtype=np.int64).reshape(len(J1), instance.g)
+        lazy_callback = mdl.register_callback(CplexDisjunctionCallback)
+        lazy_callback.disjunctions = Disjunctions(J1, J2, c_columns, x_columns, instance.duration, M)
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    callback = mdl.register_callback(CplexProgressCallback)
+    callback.result, callback.lower_bound = result, lower_bound
+    mip_cutoff(mdl, lower_bound)
+    tic = time.perf_counter()
     mdl.solve()
+    result.solve_time = time.perf_counter() - tic
+    cplex_result(result, mdl, lower_bound)
 
-    if mdl.solution.is_primal_feasible():
-        Cmax = mdl.solution.get_values('Cmax')
-        print(f'Optimal objective value (CPLEX): {Cmax}')
+    if result.objective is not None:
+        values = mdl.solution.get_values()
+        result.schedule = jsp_schedule(instance, [[values[c_ids[(j, i)]] for i in range(instance.g)] for j in range(instance.n)])
+        print(f'Optimal objective value (CPLEX): {result.objective}')
     else:
         print('No feasible solution found by CPLEX!')
 
+    return result
 
-def jsp_mip_gurobi_model(file_path, threads=1, time_limit=3600):
-    instance = parser(file_path)
-
-    # create the model
-    mdl = gp.Model()
 
-    # variable x
-    x_vars = {}
-    for i in range(instance.g):
-        for j1 in range(instance.n - 1):
-            for j2 in range(j1 + 1, instance.n):
-                x_vars[(i, j1, j2)] = mdl.addVar(vtype=GRB.BINARY, name=f'x_{i}_{j1}_{j2}')
+def jsp_mip_gurobi_model(file_path, threads=1, time_limit=3600, start=None, big_m=None, model_cache=None, lower_bound=None, lazy=False):
+    result = Result('Gurobi')
+    tic = time.perf_counter()
+    instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
+
+    # read the model from the model cache, or else build it
+    M = jsp_big_m(instance, start) if big_m is None else big_m
+    model_file, cached = (None, False) if model_cache is None else model_cache.lookup(jsp_mip_gurobi_model, file_path, '.mps.bz2', M, lazy)
+    if cached:
+        mdl = gp.read(model_file)
+        FamilySizes(model_cache.families(model_file)).report(result)
+        variables = gurobi_variables(mdl)
+        x_vars, c_vars, Cmax = variables['x'], variables['c'], variables['Cmax']
+    else:
+        # create the model
+        mdl = gp.Model()
 
-    # variable c
-    c_vars = {}
-    for j in range(instance.n):
+        # variable x
+        x_vars = {}
         for i in range(instance.g):
-            c_vars[(j, i)] = mdl.addVar(vtype=GRB.CONTINUOUS, name=f'c_{j}_{i}', lb=0)
-
-    # variable Cmax
-    Cmax = mdl.addVar(vtype=GRB.CONTINUOUS, name='Cmax', lb=0)
-
-    # constraint (1)
-    for j in range(instance.n):
-        mdl.addConstr(c_vars[(j, instance.r[j][0] - 1)] >= instance.p[j][0], name=f'constr1_{j}')
+            for j1 in range(instance.n - 1):
+                for j2 in range(j1 + 1, instance.n):
+                    x_vars[(i, j1, j2)] = mdl.addVar(vtype=GRB.BINARY, name=f'x_{i}_{j1}_{j2}')
 
-    # constraint (2)
-    for j in range(instance.n):
-        for i in range(1, instance.g):
-            mdl.addConstr(c_vars[(j, instance.r[j][i] - 1)] - c_vars[(j, instance.r[j][i - 1] - 1)] >= instance.p[j][i], name=f'constr2_{j}_{i}')
-
-    # constraint (3)
-    M = 100000
-    for j1 in range(instance.n - 1):
-        for j2 in range(j1 + 1, instance.n):
+        # variable c
+        c_vars = {}
+        for j in range(instance.n):
             for i in range(instance.g):
-                mdl.addConstr(c_vars[(j1, i)] - c_vars[(j2, i)] - M * x_vars[(i, j1, j2)] >= instance.p[j1][instance.r[j1].index(i + 1)] - M, name=f'constr3_{i}_{j1}_{j2}')
+                c_vars[(j, i)] = mdl.addVar(vtype=GRB.CONTINUOUS, name=f'c_{j}_{i}', lb=0)
+
+        # variable Cmax
+        Cmax = mdl.addVar(vtype=GRB.CONTINUOUS, name='Cmax', lb=0)
+
+        # in lazy mode, only the disjunctive constraints of the seed (the callback adds the others on demand)
+        seed = jsp_lazy_seed(instance) if lazy else None
+
+        # constraint families
+        sizes = FamilySizes()
+
+        # constraint (1)
+        for j in range(instance.n):
+            mdl.addConstr(c_vars[(j, instance.machine[j][0])] >= instance.p[j][0], name=f'constr1_{j}')
+        sizes.close_gurobi('constraint (1)', mdl)
+
+        # constraint (2)
+        for j in range(instance.n):
+            for i in range(1, instance.g):
+                mdl.addConstr(c_vars[(j, instance.machine[j][i])] - c_vars[(j, instance.machine[j][i - 1])] >= instance.p[j][i], name=f'constr2_{j}_{i}')
+        sizes.close_gurobi('constraint (2)', mdl)
+
+        # constraint (3)
+        for j1, j2, i in disjunctive_keys(instance, seed):
+            mdl.addConstr(c_vars[(j1, i)] - c_vars[(j2, i)] - M * x_vars[(i, j1, j2)] >= instance.duration[j1][i] - M, name=f'constr3_{i}_{j1}_{j2}')
+        sizes.close_gurobi('constraint (3)', mdl, big_m=True)
+
+        # constraint (4)
+        for j1, j2, i in disjunctive_keys(instance, seed):
+            mdl.addConstr(c_vars[(j2, i)] - c_vars[(j1, i)] + M * x_vars[(i, j1, j2)] >= instance.duration[j2][i], name=f'constr4_{i}_{j1}_{j2}')
+        sizes.close_gurobi('constraint (4)', mdl, big_m=True)
+
+        # constraint (5)
+        for j in range(instance.n):
+            mdl.addConstr(Cmax - c_vars[(j, instance.machine[j][-1])] >= 0, name=f'constr5_{j}')
+        sizes.close_gurobi('constraint (5)', mdl)
+        sizes.report(result)
+
+        # set the objective
+        mdl.setObjective(Cmax, GRB.MINIMIZE)
+        if model_cache is not None:
+            model_cache.store(model_file, mdl.write, sizes.families)
+
+    # set the MIP start
+    if start is not None:
+        values = jsp_mip_start(instance, start)
+        for key, value in values['x'].items():
+            x_vars[key].Start = value
+        for key, value in values['c'].items():
+            c_vars[key].Start = value
+        Cmax.Start = values['Cmax']
 
-    # constraint (4)
-    for j1 in range(instance.n - 1):
-        for j2 in range(j1 + 1, instance.n):
-            for i in range(instance.g):
-                mdl.addConstr(c_vars[(j2, i)] - c_vars[(j1, i)] + M * x_vars[(i, j1, j2)] >= instance.p[j2][instance.r[j2].index(i + 1)], name=f'constr4_{i}_{j1}_{j2}')
+    # solve the model
+    mdl.setParam('Threads', threads)
+    mdl.setParam('TimeLimit', time_limit)
+    callback = gurobi_progress_callback(result, lower_bound)
+    mip_cutoff(mdl, lower_bound)
+    if lazy:
+        mdl.setParam('LazyConstraints', 1)
+        J1, J2 = np.triu_indices(instance.n, 1)
+        c_columns = np.array([[c_vars[(j, i)].index for i in range(instance.g)] for j in range(instance.n)])
+        x_columns = np.array([[x_vars[(i, j1, j2)].index for i in range(instance.g)] for j1, j2 in zip(J1.tolist(), J2.tolist())], dtype=np.int64).reshape(len(J1), instance.g)
+        callback = gurobi_disjunction_callback(Disjunctions(J1, J2, c_columns, x_columns, instance.duration, M), mdl.getVars(), callback)
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    tic = time.perf_counter()
+    mdl.optimize(callback)
+    result.solve_time = time.perf_counter() - tic
+    gurobi_result(result, mdl, lower_bound)
+
+    if result.objective is not None:
+        result.schedule = jsp_schedule(instance, [[c_vars[(j, i)].X for i in range(instance.g)] for j in range(instance.n)])
+        print(f'Optimal objective value (Gurobi): {result.objective}')
+    else:
+        print('No feasible solution found by Gurobi!')
 
-    # constraint (5)
-    for j in range(instance.n):
-        mdl.addConstr(Cmax - c_vars[(j, instance.r[j][-1] - 1)] >= 0, name=f'constr5_{j}')
+    return result
 
-    # set the objective
-    mdl.setObjective(Cmax, GRB.MINIMIZE)
+
+def jsp_mip_gurobi_matrix_model(file_path, threads=1, time_limit=3600, start=None, big_m=None, model_cache=None, lower_bound=None, lazy=False):
+    """
+    Same model as jsp_mip_gurobi_model (same variable and constraint order), but every variable family is one slice
+    of a single MVar and every constraint family is added at once with addMConstr from a sparse coefficient matrix.
+    """
+    result = Result('Gurobi')
+    tic = time.perf_counter()
+    instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
+    p = np.asarray(instance.p, dtype=np.float64)
+    pm = np.asarray(instance.duration, dtype=np.float64)
+    r = instance.machine
+    jobs = np.arange(instance.n)[:, None]
+
+    # variable indices
+    J1, J2 = np.triu_indices(instance.n, 1)
+    x_ids = np.full((instance.g, instance.n, instance.n), -1)
+    x_ids[:, J1, J2] = np.arange(instance.g * len(J1)).reshape(instance.g, len(J1))
+    c_ids = instance.g * len(J1) + np.arange(instance.n * instance.g).reshape(instance.n, instance.g)
+    Cmax_id = instance.g * len(J1) + instance.n * instance.g
+    num_vars = Cmax_id + 1
+
+    # read the model from the model cache, or else build it
+    M = jsp_big_m(instance, start) if big_m is None else big_m
+    model_file, cached = (None, False) if model_cache is None else model_cache.lookup(jsp_mip_gurobi_matrix_model, file_path, '.mps.bz2', M, lazy)
+    if cached:
+        mdl = gp.read(model_file)
+        FamilySizes(model_cache.families(model_file)).report(result)
+        v = gp.MVar.fromlist(mdl.getVars())
+    else:
+        mdl = gp.Model()
+
+        # variables x, c and Cmax
+        vtypes = np.full(num_vars, GRB.CONTINUOUS)
+        vtypes[:instance.g * len(J1)] = GRB.BINARY
+        ubs = np.full(num_vars, float('inf'))
+        ubs[:instance.g * len(J1)] = 1
+        objs = np.zeros(num_vars)
+        objs[Cmax_id] = 1
+        v = mdl.addMVar(num_vars, lb=0, ub=ubs, obj=objs, vtype=vtypes)
+
+        # constraint families
+        sizes = FamilySizes()
+
+        # constraint (1)
+        mdl.addMConstr(sparse_rows(c_ids[jobs, r[:, :1]], [1], num_vars), v, GRB.GREATER_EQUAL, p[:, 0])
+        sizes.close_gurobi('constraint (1)', mdl)
+
+        # constraint (2)
+        columns = np.stack([c_ids[jobs, r[:, 1:]], c_ids[jobs, r[:, :-1]]], axis=-1)
+        mdl.addMConstr(sparse_rows(columns, [1, -1], num_vars), v, GRB.GREATER_EQUAL, p[:, 1:].ravel())
+        sizes.close_gurobi('constraint (2)', mdl)
+
+        # the disjunctive constraints: every job pair on every machine, or only those of the seed in lazy mode (the
+        # callback adds the others on demand)
+        K1, K2, K = jsp_lazy_seed(instance) if lazy else (J1[:, None], J2[:, None], np.arange(instance.g))
+
+        # constraint (3)
+        columns = np.stack(np.broadcast_arrays(c_ids[K1, K], c_ids[K2, K], x_ids[K, K1, K2]), axis=-1)
+        mdl.addMConstr(sparse_rows(columns, [1, -1, -M], num_vars), v, GRB.GREATER_EQUAL, (pm[K1, K] - M).ravel())
+        sizes.close_gurobi('constraint (3)', mdl, big_m=True)
+
+        # constraint (4)
+        columns = np.stack(np.broadcast_arrays(c_ids[K2, K], c_ids[K1, K], x_ids[K, K1, K2]), axis=-1)
+        mdl.addMConstr(sparse_rows(columns, [1, -1, M], num_vars), v, GRB.GREATER_EQUAL, pm[K2, K].ravel())
+        sizes.close_gurobi('constraint (4)', mdl, big_m=True)
+
+        # constraint (5)
+        columns = np.stack(np.broadcast_arrays(Cmax_id, c_ids[jobs[:, 0], r[:, -1]]), axis=-1)
+        mdl.addMConstr(sparse_rows(columns, [1, -1], num_vars), v, GRB.GREATER_EQUAL, np.zeros(instance.n))
+        sizes.close_gurobi('constraint (5)', mdl)
+        sizes.report(result)
+
+        # set the objective sense
+        mdl.ModelSense = GRB.MINIMIZE
+        if model_cache is not None:
+            model_cache.store(model_file, mdl.write, sizes.families)
+
+    # set the MIP start
+    if start is not None:
+        values = jsp_mip_start(instance, start)
+        start_values = np.zeros(num_vars)
+        for key, value in values['x'].items():
+            start_values[x_ids[key]] = value
+        for key, value in values['c'].items():
+            start_values[c_ids[key]] = value
+        start_values[Cmax_id] = values['Cmax']
+        v.Start = start_values
 
     # solve the model
     mdl.setParam('Threads', threads)
     mdl.setParam('TimeLimit', time_limit)
-    mdl.optimize()
-
-    if mdl.status == GRB.OPTIMAL or mdl.status == GRB.SUBOPTIMAL:
-        Cmax_value = Cmax.X
-        print(f'Optimal objective value (Gurobi): {Cmax_value}')
+    callback = gurobi_progress_callback(result, lower_bound)
+    mip_cutoff(mdl, lower_bound)
+    if lazy:
+        mdl.setParam('LazyConstraints', 1)
+        callback = gurobi_disjunction_callback(Disjunctions(J1, J2, c_ids, x_ids[:, J1, J2].T, pm, M), mdl.getVars(), callback)
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    tic = time.perf_counter()
+    mdl.optimize(callback)
+    result.solve_time = time.perf_counter() - tic
+    gurobi_result(result, mdl, lower_bound)
+
+    if result.objective is not None:
+        result.schedule = jsp_schedule(instance, v.X[c_ids])
+        print(f'Optimal objective value (Gurobi): {result.objective}')
     else:
         print('No feasible solution found by Gurobi!')
 
+    return result
+
 
-def jsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', execfile='/Applications/CPLEX_Studio1210/cpoptimizer/bin/x86-64_osx/cpoptimizer'):
+def jsp_cp_model(file_path, threads=1, time_limit=3600, start=None, agent='local', execfile='/Applications/CPLEX_Studio1210/cpoptimizer/bin/x86-64_osx/cpoptimizer', lower_bound=None):
     """
     The execfile parameter specifies the path to the CP Optimizer executable.
     This is required to run the solver, as it defines the core binary that handles the solving process.
@@ -204,49 +850,72 @@ def jsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', execfile=
       - On Windows: 'C:\\Program Files\\IBM\\ILOG\\CPLEX_Studio1210\\cpoptimizer\\bin\\x64_win64\\cpoptimizer.exe'
       - On Linux: '/opt/ibm/ILOG/CPLEX_Studio1210/cpoptimizer/bin/x86-64_linux/cpoptimizer'
     Ensure the provided path matches the location of the installed CP Optimizer executable on your system.
+    If start (one job sequence per machine, e.g. from jsp_tabu_search) is given, its semi-active schedule is the
+    starting point of the search.
+    If lower_bound (a proven lower bound on the makespan, e.g. from bounds.py) is given, the search stops as soon as a
+    solution reaches it, and that solution is reported as optimal.
     """
+    result = Result('CP Optimizer')
+    tic = time.perf_counter()
     instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
 
     # create the model
     mdl = CpoModel()
 
-    # interval variables
-    tasks = [
-        [
-            mdl.interval_var(
-                name=f'Task_{j}_{i}', size=instance.p[j][instance.r[j].index(i + 1)]
-            )
-            for i in range(instance.g)
-        ]
-        for j in range(instance.n)
-    ]
+    # interval variables, one per operation o = j * g + k (see JSP)
+    d = instance.p.ravel().tolist()
+    machine = instance.machine.ravel().tolist()
+    operations = instance.operations.tolist()
+    tasks = [mdl.interval_var(name=f'Task_{o // instance.g}_{machine[o]}', size=d[o]) for o in range(instance.n * instance.g)]
 
     # constraint (1)
     for i in range(instance.g):
-        mdl.add(mdl.no_overlap([tasks[j][i] for j in range(instance.n)]))
+        mdl.add(mdl.no_overlap([tasks[o] for o in operations[i]]))
 
     # constraint (2)
-    for j in range(instance.n):
-        for i in range(1, instance.g):
-            mdl.add(mdl.end_before_start(tasks[j][instance.r[j][i - 1] - 1], tasks[j][instance.r[j][i] - 1]))
+    for o in range(instance.n * instance.g):
+        if (o + 1) % instance.g:
+            mdl.add(mdl.end_before_start(tasks[o], tasks[o + 1]))
 
     # constraint (3)
-    mdl.add(mdl.minimize(mdl.max([mdl.end_of(tasks[j][instance.r[j][-1] - 1]) for j in range(instance.n)])))
+    mdl.add(mdl.minimize(mdl.max([mdl.end_of(tasks[o]) for o in range(instance.g - 1, instance.n * instance.g, instance.g)])))
 
-    # solve the model
-    result = mdl.solve(TimeLimit=time_limit, Workers=threads, LogVerbosity='Quiet', agent=agent, execfile=execfile)
+    # set the starting point
+    if start is not None:
+        c = jsp_completion_times(instance, start)
+        starting_point = mdl.create_empty_solution()
+        for j in range(instance.n):
+            for i in range(instance.g):
+                o = operations[i][j]
+                starting_point.add_interval_var_solution(tasks[o], start=c[j][i] - d[o], end=c[j][i])
+        mdl.set_starting_point(starting_point)
 
-    if result:
-        print(f'Optimal objective value (CP Optimizer): {result.get_objective_value()}')
+    # solve the model
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    mdl.add_solver_callback(CpProgressCallback(result, lower_bound))
+    tic = time.perf_counter()
+    solution = mdl.solve(TimeLimit=time_limit, Workers=threads, LogVerbosity='Quiet', agent=agent, execfile=execfile)
+    result.solve_time = time.perf_counter() - tic
+    cp_result(result, solution, lower_bound)
+
+    if result.objective is not None:
+        result.schedule = jsp_schedule(instance, [[solution.get_var_solution(tasks[operations[i][j]]).get_end() for i in range(instance.g)] for j in range(instance.n)])
+        print(f'Optimal objective value (CP Optimizer): {result.objective}')
     else:
         print('No feasible solution found by CP Optimizer!')
 
+    return result
+
 
 if __name__ == '__main__':
     path = 'test cases/Taillard/1.txt'
-    print('-------------------------------CPLEX-------------------------------')
-    jsp_mip_cplex_model(path, threads=6)
+    print('-------------------------------Tabu search-------------------------------')
+    start, Cmax = jsp_tabu_search(parser(path), time_limit=10)
+    print(f'Objective value (tabu search): {Cmax}')
+    print('\n\n\n-------------------------------CPLEX-------------------------------')
+    jsp_mip_cplex_model(path, threads=6, start=start)
     print('\n\n\n-------------------------------Gurobi-------------------------------')
-    jsp_mip_gurobi_model(path, threads=6)
+    jsp_mip_gurobi_model(path, threads=6, start=start)
     print('\n\n\n-------------------------------Constraint Programming------------------------------')
-    jsp_cp_model(path)
+    jsp_cp_model(path, start=start)
@@ -0,0 +1,209 @@
+"""
+Persistent on-disk cache of built MIP models. The MIP model functions take a model_cache argument: on a hit they read
+the model file (CPLEX .sav, Gurobi .mps.bz2) instead of running their Python builder, on a miss they build the model
+and store it. Entries are keyed by a hash of the instance file, the model function, the source of its script and of
+the modules of the repository it imports from, such as common.py (so any change to a formulation or to the helpers
+that build it invalidates its entries), and the options that change the model (the big-M, the names). Next
+to every model file, a .json file keeps the constraint families measured when the model was built, which a hit reports
+again. The cache is capped in size and evicts the least recently used entries.
+
+Example (the first sweep builds and stores the models, the second one reads them):
+    python batch.py fsp -f mip_cplex_model -l 10 -o fsp10.jsonl --model-cache models
+    python batch.py fsp -f mip_cplex_model -l 60 -o fsp60.jsonl --model-cache models
+List the entries, or drop those of one formulation:
+    python model_cache.py models
+    python model_cache.py models --invalidate fsp_mip_cplex_model
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+DEFAULT_MAX_BYTES = 1 << 32  # 4 GiB
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def file_digest(path, digest):
+    """
+    Feed the content of a file into a hashlib digest, in blocks.
+    """
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+
+
+def source_files(function):
+    """
+    Return the script that defines a model function and the modules of the repository (next to this file, e.g.
+    common.py) that the script imports names from.
+    """
+    paths = {os.path.abspath(function.__code__.co_filename)}
+    for value in function.__globals__.values():
+        module = value if isinstance(value, type(sys)) else sys.modules.get(getattr(value, '__module__', None) or '')
+        path = getattr(module, '__file__', None)
+        if path and os.path.dirname(os.path.abspath(path)) == ROOT:
+            paths.add(os.path.abspath(path))
+    return sorted(paths)
+
+
+class ModelCache:
+    """
+    A folder of model files named <model function>-<key hash><extension>, each with the constraint families of its
+    model in <model file>.json. The modification time of an entry is its
+    last use: lookup refreshes it on every hit, and store evicts the entries with the oldest ones until the folder
+    fits in max_bytes. Entries are moved into place complete, so concurrent runs (e.g. batch.py workers) can share a
+    folder.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.versions = {}  # script path -> hash of its source and of the modules it imports from
+
+    def version(self, function):
+        """
+        Return the hash of the source of the script that defines a model function and of the modules of the
+        repository it imports from (see source_files).
+        """
+        path = function.__code__.co_filename
+        if path not in self.versions:
+            digest = hashlib.sha256()
+            for source in source_files(function):
+                digest.update(f'{os.path.basename(source)}\0'.encode())
+                file_digest(source, digest)
+            self.versions[path] = digest.hexdigest()
+        return self.versions[path]
+
+    def lookup(self, function, file_path, extension, *options):
+        """
+        Return the path of the entry of a model function on an instance file with the given model options, and
+        whether the entry exists (a hit, whose last use is then refreshed).
+        """
+        digest = hashlib.sha256(f'{function.__name__}\0{self.version(function)}\0{options!r}\0'.encode())
+        file_digest(file_path, digest)
+        path = os.path.join(self.directory, f'{function.__name__}-{digest.hexdigest()[:32]}{extension}')
+        try:
+            os.utime(path)
+            return path, True
+        except OSError:
+            return path, False
+
+    def store(self, path, write, families=()):
+        """
+        Store an entry by calling write with a temporary file name (with the extension of path, which tells the solver
+        the format), and the (family, rows, nonzeros, big-M rows, ...) tuples of its constraint families, then evict
+        the least recently used entries. Failures to write only lose the entry.
+        """
+        name = os.path.basename(path)
+        tmp_path = os.path.join(self.directory, f'.{os.getpid()}.{name}')
+        tmp_json = f'{tmp_path}.json'
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_json, 'w') as f:
+                json.dump([list(family[:4]) for family in families], f)
+            write(tmp_path)
+            os.replace(tmp_json, f'{path}.json')
+            os.replace(tmp_path, path)
+        except Exception:
+            for tmp in (tmp_path, tmp_json):
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+            return
+        self.evict(keep=path)
+
+    def families(self, path):
+        """
+        Return the constraint families stored with an entry as (family, rows, nonzeros, big-M rows, build seconds)
+        tuples, with no build time since the model was read, or an empty list if they are missing.
+        """
+        try:
+            with open(f'{path}.json') as f:
+                return [(family, rows, nonzeros, big_m, 0.0) for family, rows, nonzeros, big_m in json.load(f)]
+        except (OSError, ValueError):
+            return []
+
+    def entries(self):
+        """
+        Return (path, size, last use) of every entry, least recently used first. The size includes the families file.
+        """
+        entries = []
+        sidecars = {}
+        if os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and not entry.name.startswith('.'):
+                    try:
+                        stat = entry.stat()
+                    except OSError:  # evicted by another process meanwhile
+                        continue
+                    if entry.name.endswith('.json'):
+                        sidecars[entry.path[:-len('.json')]] = stat.st_size
+                    else:
+                        entries.append((entry.path, stat.st_size, stat.st_mtime))
+        entries = [(path, size + sidecars.get(path, 0), used) for path, size, used in entries]
+        return sorted(entries, key=lambda entry: entry[2])
+
+    @staticmethod
+    def remove(path):
+        """
+        Remove an entry and its families file, and return whether the entry was removed.
+        """
+        try:
+            os.remove(f'{path}.json')
+        except OSError:
+            pass
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def evict(self, keep=None):
+        """
+        Remove the least recently used entries (but not keep) until the cache fits in max_bytes.
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path != keep:
+                self.remove(path)
+                total -= size
+
+    def invalidate(self, function_name=None):
+        """
+        Remove the entries of a model function (e.g. 'fsp_mip_cplex_model'), or all the entries, and return how many
+        were removed.
+        """
+        removed = 0
+        for path, _, _ in self.entries():
+            if function_name is None or os.path.basename(path).startswith(f'{function_name}-'):
+                removed += self.remove(path)
+        return removed
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('directory', help='the cache folder')
+    arg_parser.add_argument('--invalidate', nargs='*', metavar='FUNCTION', help='remove the entries of these model functions (all entries if none is given)')
+    arg_parser.add_argument('--max-gb', type=float, help='evict the least recently used entries until the cache fits in this size')
+    args = arg_parser.parse_args(argv)
+
+    cache = ModelCache(args.directory)
+    if args.invalidate is not None:
+        removed = sum(cache.invalidate(name) for name in args.invalidate) if args.invalidate else cache.invalidate()
+        print(f'{removed} entries removed', file=sys.stderr)
+    if args.max_gb is not None:
+        cache.max_bytes = int(args.max_gb * (1 << 30))
+        cache.evict()
+    entries = cache.entries()
+    now = time.time()
+    for path, size, used in entries:
+        print(f'{os.path.basename(path)}\t{size / (1 << 20):.1f} MiB\tused {(now - used) / 3600:.1f} h ago')
+    print(f'{len(entries)} entries, {sum(size for _, size, _ in entries) / (1 << 20):.1f} MiB', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,80 +1,261 @@
+import os
+import sys
+import time
+import numpy as np
 import cplex
 import gurobipy as gp
 from gurobipy import GRB
 from docplex.cp.model import CpoModel
 
+# the code shared by the model scripts lives in common.py at the top of the repository
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import CACHE_MIN_SIZE, read_integers, read_cache, write_cache, Result, cplex_result, gurobi_result, cp_result, CplexProgressCallback, gurobi_progress_callback, mip_cutoff, CpProgressCallback, FamilySizes, gurobi_variables
+
 
 class PMSP:
+    __slots__ = ('n', 'g', 'p')
+
     def __init__(self):
         self.n = 0  # the number of jobs
         self.g = 0  # the number of machines
-        self.p = []  # the set of processing times
+        self.p = np.zeros((0, 0), dtype=np.int32)  # the set of processing times, p[j][i]
 
 
-def parser(file_path):
-    instance = PMSP()
+def read_text(file_path):
+    """
+    Parse an instance file in bulk: the header lines one by one and the rest of the file as one block of integers.
+    """
     with open(file_path, 'r') as f:
-        instance.n = int(f.readline().strip().split()[0])
-        instance.g = int(f.readline().strip().split()[0])
-        instance.p = []
-        for _ in range(instance.n):
-            instance.p.append([int(x) for x in f.readline().strip().split()])
+        n = int(f.readline().strip().split()[0])
+        g = int(f.readline().strip().split()[0])
+        body = read_integers(f, n * g, file_path)
+    return {'p': body[:n * g].reshape(n, g)}
+
+
+def parser(file_path, cache=True):
+    # opening an .npz archive costs more than parsing a small file, so only large files are cached
+    cache = cache and os.path.getsize(file_path) >= CACHE_MIN_SIZE
+    arrays = read_cache(file_path) if cache else None
+    if arrays is None:
+        arrays = read_text(file_path)
+        if cache:
+            write_cache(file_path, arrays)
+    instance = PMSP()
+    instance.p = arrays['p']
+    instance.n, instance.g = (int(x) for x in instance.p.shape)
     return instance
 
 
-def pmsp_mip_cplex_model(file_path, threads=1, time_limit=3600):
+def pmsp_mip_start(instance, start):
+    """
+    Translate a job-to-machine assignment (start[j] is the machine of job j) into consistent values of the MIP
+    variables y and Cmax.
+    Returns a dictionary that maps each variable family to {index: value} (Cmax maps to its value).
+    """
+    loads = [0] * instance.g
+    for j in range(instance.n):
+        loads[start[j]] += int(instance.p[j][start[j]])
+    y_values = {(j, i): int(start[j] == i) for j in range(instance.n) for i in range(instance.g)}
+    return {'y': y_values, 'Cmax': max(loads)}
+
+
+def pmsp_greedy(instance):
+    """
+    Constructive heuristic for unrelated machines: the jobs are taken in non-increasing order of their shortest
+    processing time (LPT) and each one goes to the machine on which it completes first, i.e. the min-min rule applied
+    to a fixed job order, in O(n g) overall.
+    Returns the machine of every job (a start for the MIP and CP models) and the makespan.
+    """
+    p = np.asarray(instance.p, dtype=np.int64)
+    loads = np.zeros(instance.g, dtype=np.int64)
+    machine = np.zeros(instance.n, dtype=np.int64)
+    for j in np.argsort(-p.min(axis=1), kind='stable'):
+        i = int(np.argmin(loads + p[j]))
+        machine[j] = i
+        loads[i] += p[j][i]
+    return machine.tolist(), int(loads.max(initial=0))
+
+
+def pmsp_local_search(instance, start=None, time_limit=10, iterations=None, candidates=64):
+    """
+    Descent from a job-to-machine assignment around the machine with the largest load: one of its jobs moves to
+    another machine (insertion), or else is exchanged with a job of another machine (swap), whenever both machines then
+    finish before the current load of the critical machine. The default start puts every job on its fastest machine,
+    the assignment with the least total work, and leaves the balancing to the descent; the assignment of pmsp_greedy
+    is returned instead if the descent does not reach its makespan.
+    A move changes only the loads and the job lists of its two machines, which are updated in O(1) (the last job of a
+    list takes the place of the job that leaves it); all insertions of the critical machine are evaluated at once with
+    numpy, the swaps with one machine at a time, starting from the least loaded one, between the candidate jobs of
+    either machine that are cheapest to move to the other one. A step thus reads the jobs of the machines it evaluates,
+    not all jobs.
+    Stops at a local optimum, after time_limit seconds or after the given number of moves.
+    Returns the machine of every job (a start for the MIP and CP models) and the makespan.
+    """
+    tic = time.perf_counter()
+    p = np.asarray(instance.p, dtype=np.int64)
+    machine = np.array(p.argmin(axis=1) if start is None else start, dtype=np.int64)
+    loads = np.bincount(machine, weights=p[np.arange(instance.n), machine], minlength=instance.g).astype(np.int64)
+    counts = np.bincount(machine, minlength=instance.g)
+    members = [np.flatnonzero(machine == i) for i in range(instance.g)]  # the jobs of machine i are members[i][:counts[i]]
+    position = np.zeros(instance.n, dtype=np.int64)  # the index of every job in the list of its machine
+    for jobs in members:
+        position[jobs] = np.arange(len(jobs))
+
+    def move(j, i):
+        # move job j to machine i: the last job of its machine takes its place, and a full list doubles its capacity
+        h = machine[j]
+        counts[h] -= 1
+        last = members[h][counts[h]]
+        members[h][position[j]] = last
+        position[last] = position[j]
+        if counts[i] == len(members[i]):
+            members[i] = np.concatenate([members[i], np.zeros(max(counts[i], 1), dtype=np.int64)])
+        members[i][counts[i]] = j
+        position[j] = counts[i]
+        counts[i] += 1
+        machine[j] = i
+
+    moves = 0
+    while instance.g > 1 and (iterations is None or moves < iterations) and time.perf_counter() - tic < time_limit:
+        c = int(np.argmax(loads))
+        jobs = members[c][:counts[c]]
+
+        # insertion: the largest of the two new loads of the best move
+        value = np.maximum(loads[c] - p[jobs, c][:, None], loads + p[jobs])
+        value[:, c] = loads[c]
+        k, i = np.unravel_index(np.argmin(value), value.shape)
+        if value[k, i] < loads[c]:
+            j = jobs[k]
+            loads[c] -= p[j][c]
+            loads[i] += p[j][i]
+            move(j, i)
+            moves += 1
+            continue
+
+        # swap: job first[k] of the critical machine with job second[l] of machine i
+        for i in np.argsort(loads, kind='stable'):
+            if i == c:
+                continue
+            first, second = jobs, members[i][:counts[i]]
+            if len(first) > candidates:
+                first = first[np.argpartition(p[first, i] - p[first, c], candidates)[:candidates]]
+            if len(second) > candidates:
+                second = second[np.argpartition(p[second, c] - p[second, i], candidates)[:candidates]]
+            value = np.maximum(loads[c] - p[first, c][:, None] + p[second, c], loads[i] - p[second, i] + p[first, i][:, None])
+            if value.size == 0:
+                continue
+            k, l = np.unravel_index(np.argmin(value), value.shape)
+            if value[k, l] < loads[c]:
+                j1, j2 = first[k], second[l]
+                loads[c] += p[j2][c] - p[j1][c]
+                loads[i] += p[j1][i] - p[j2][i]
+                move(j1, i)
+                move(j2, c)
+                moves += 1
+                break
+        else:
+            break
+    if start is None:
+        greedy = pmsp_greedy(instance)
+        if greedy[1] < loads.max(initial=0):
+            return greedy
+    return machine.tolist(), int(loads.max(initial=0))
+
+
+def pmsp_schedule(instance, machine):
+    """
+    Return the (job, operation, machine, start, end) tuples of the schedule with machine assignment machine[j], where
+    the jobs assigned to a machine are processed back to back in index order.
+    """
+    idle = [0] * instance.g
+    schedule = []
+    for j in range(instance.n):
+        i = int(machine[j])
+        schedule.append((j, 0, i, idle[i], idle[i] + int(instance.p[j][i])))
+        idle[i] += int(instance.p[j][i])
+    return schedule
+
+
+def pmsp_mip_cplex_model(file_path, threads=1, time_limit=3600, start=None, names=False, model_cache=None, lower_bound=None):
+    result = Result('CPLEX')
+    tic = time.perf_counter()
     instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
 
     # create the model
     mdl = cplex.Cplex()
 
     # variable y
-    y_names = [f'y_{j}_{i}' for j in range(instance.n) for i in range(instance.g)]
-    y_objs = [0] * len(y_names)
-    y_lbs = [0] * len(y_names)
-    y_ubs = [1] * len(y_names)
-    y_types = ['B'] * len(y_names)
+    y_keys = [(j, i) for j in range(instance.n) for i in range(instance.g)]
+    y_objs = [0] * len(y_keys)
+    y_lbs = [0] * len(y_keys)
+    y_ubs = [1] * len(y_keys)
+    y_types = ['B'] * len(y_keys)
 
     # variable Cmax
-    Cmax_name = ['Cmax']
     Cmax_obj = [1]
     Cmax_lb = [0]
     Cmax_ub = [float('inf')]
     Cmax_type = ['C']
 
-    # constraints
-    constrs = []
-    senses = []
-    rhs = []
-
-    # constraint (1)
-    for j in range(instance.n):
-        variables = [f'y_{j}_{i}' for i in range(instance.g)]
-        coefficients = [1] * instance.g
-        constrs.append([variables, coefficients])
-        senses.append('E')
-        rhs.append(1)
+    # variable indices
+    y_ids = {key: index for index, key in enumerate(y_keys)}
+    Cmax_id = len(y_keys)
 
-    # constraint (2)
-    for i in range(instance.g):
-        variables = ['Cmax']
-        variables += [f'y_{j}_{i}' for j in range(instance.n)]
-        coefficients = [1]
-        coefficients += [-instance.p[j][i] for j in range(instance.n)]
-        constrs.append([variables, coefficients])
-        senses.append('G')
-        rhs.append(0)
-
-    # add variables
-    all_names = y_names + Cmax_name
-    all_objs = y_objs + Cmax_obj
-    all_lbs = y_lbs + Cmax_lb
-    all_ubs = y_ubs + Cmax_ub
-    all_types = y_types + Cmax_type
-    mdl.variables.add(obj=all_objs, lb=all_lbs, ub=all_ubs, names=all_names, types=all_types)
-
-    # add constraints
-    mdl.linear_constraints.add(lin_expr=constrs, senses=senses, rhs=rhs)
+    # read the model from the model cache, or else build it
+    model_file, cached = (None, False) if model_cache is None else model_cache.lookup(pmsp_mip_cplex_model, file_path, '.sav', names)
+    if cached:
+        mdl.read(model_file)
+        FamilySizes(model_cache.families(model_file)).report(result)
+    else:
+        # constraints
+        constrs = []
+        senses = []
+        rhs = []
+        sizes = FamilySizes()
+
+        # constraint (1)
+        for j in range(instance.n):
+            variables = [y_ids[(j, i)] for i in range(instance.g)]
+            coefficients = [1] * instance.g
+            constrs.append([variables, coefficients])
+            senses.append('E')
+            rhs.append(1)
+        sizes.close_cplex('constraint (1)', constrs)
+
+        # constraint (2)
+        for i in range(instance.g):
+            variables = [Cmax_id]
+            variables += [y_ids[(j, i)] for j in range(instance.n)]
+            coefficients = [1]
+            coefficients += [-int(instance.p[j][i]) for j in range(instance.n)]
+            constrs.append([variables, coefficients])
+            senses.append('G')
+            rhs.append(0)
+        sizes.close_cplex('constraint (2)', constrs)
+        sizes.report(result)
+
+        # add variables
+        all_objs = y_objs + Cmax_obj
+        all_lbs = y_lbs + Cmax_lb
+        all_ubs = y_ubs + Cmax_ub
+        all_types = y_types + Cmax_type
+        mdl.variables.add(obj=all_objs, lb=all_lbs, ub=all_ubs, types=all_types)
+        if names:
+            all_names = [f'y_{j}_{i}' for j, i in y_keys] + ['Cmax']
+            mdl.variables.set_names(list(enumerate(all_names)))
+
+        # add constraints
+        mdl.linear_constraints.add(lin_expr=constrs, senses=senses, rhs=rhs)
+        if model_cache is not None:
+            model_cache.store(model_file, mdl.write, sizes.families)
+
+    # add the MIP start
+    if start is not None:
+        values = pmsp_mip_start(instance, start)
+        start_indices = [y_ids[key] for key in values['y']] + [Cmax_id]
+        start_values = list(values['y'].values()) + [values['Cmax']]
+        mdl.MIP_starts.add(cplex.SparsePair(ind=start_indices, val=start_values), mdl.MIP_starts.effort_level.auto)
 
     # set the objective sense
     mdl.objective.set_sense(mdl.objective.sense.minimize)
@@ -83,54 +264,97 @@ def pmsp_mip_cplex_model(file_path, threads=1, time_limit=3600):
     mdl.set_warning_stream(None)
     mdl.parameters.threads.set(threads)
     mdl.parameters.timelimit.set(time_limit)
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    callback = mdl.register_callback(CplexProgressCallback)
+    callback.result, callback.lower_bound = result, lower_bound
+    mip_cutoff(mdl, lower_bound)
+    tic = time.perf_counter()
     mdl.solve()
+    result.solve_time = time.perf_counter() - tic
+    cplex_result(result, mdl, lower_bound)
 
-    if mdl.solution.is_primal_feasible():
-        Cmax = mdl.solution.get_values('Cmax')
-        print(f'Optimal objective value (CPLEX): {Cmax}')
+    if result.objective is not None:
+        values = mdl.solution.get_values()
+        result.schedule = pmsp_schedule(instance, [max(range(instance.g), key=lambda i: values[y_ids[(j, i)]]) for j in range(instance.n)])
+        print(f'Optimal objective value (CPLEX): {result.objective}')
     else:
         print('No feasible solution found by CPLEX!')
 
+    return result
+
 
-def pmsp_mip_gurobi_model(file_path, threads=1, time_limit=3600):
+def pmsp_mip_gurobi_model(file_path, threads=1, time_limit=3600, start=None, model_cache=None, lower_bound=None):
+    result = Result('Gurobi')
+    tic = time.perf_counter()
     instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
+
+    # read the model from the model cache, or else build it
+    model_file, cached = (None, False) if model_cache is None else model_cache.lookup(pmsp_mip_gurobi_model, file_path, '.mps.bz2')
+    if cached:
+        mdl = gp.read(model_file)
+        FamilySizes(model_cache.families(model_file)).report(result)
+        variables = gurobi_variables(mdl)
+        y_vars, Cmax = variables['y'], variables['Cmax']
+    else:
+        # create the model
+        mdl = gp.Model()
 
-    # create the model
-    mdl = gp.Model()
+        # variable y
+        y_vars = {}
+        for j in range(instance.n):
+            for i in range(instance.g):
+                y_vars[(j, i)] = mdl.addVar(vtype=GRB.BINARY, name=f'y_{j}_{i}')
 
-    # variable y
-    y_vars = {}
-    for j in range(instance.n):
-        for i in range(instance.g):
-            y_vars[(j, i)] = mdl.addVar(vtype=GRB.BINARY, name=f'y_{j}_{i}')
+        # variable Cmax
+        Cmax = mdl.addVar(vtype=GRB.CONTINUOUS, name='Cmax', lb=0)
 
-    # variable Cmax
-    Cmax = mdl.addVar(vtype=GRB.CONTINUOUS, name='Cmax', lb=0)
+        # constraint families
+        sizes = FamilySizes()
 
-    # constraint (1)
-    for j in range(instance.n):
-        mdl.addConstr(gp.quicksum([y_vars[(j, i)] for i in range(instance.g)]) == 1, name=f'constr1_{j}')
+        # constraint (1)
+        for j in range(instance.n):
+            mdl.addConstr(gp.quicksum([y_vars[(j, i)] for i in range(instance.g)]) == 1, name=f'constr1_{j}')
+        sizes.close_gurobi('constraint (1)', mdl)
 
-    # constraint (2)
-    for i in range(instance.g):
-        mdl.addConstr(Cmax >= gp.quicksum([instance.p[j][i] * y_vars[(j, i)] for j in range(instance.n)]), name=f'constr2_{i}')
-
-    # set the objective
-    mdl.setObjective(Cmax, GRB.MINIMIZE)
+        # constraint (2)
+        for i in range(instance.g):
+            mdl.addConstr(Cmax >= gp.quicksum([int(instance.p[j][i]) * y_vars[(j, i)] for j in range(instance.n)]), name=f'constr2_{i}')
+        sizes.close_gurobi('constraint (2)', mdl)
+        sizes.report(result)
+
+        # set the objective
+        mdl.setObjective(Cmax, GRB.MINIMIZE)
+        if model_cache is not None:
+            model_cache.store(model_file, mdl.write, sizes.families)
+
+    # set the MIP start
+    if start is not None:
+        values = pmsp_mip_start(instance, start)
+        for key, value in values['y'].items():
+            y_vars[key].Start = value
+        Cmax.Start = values['Cmax']
 
     # solve the model
     mdl.setParam('Threads', threads)
     mdl.setParam('TimeLimit', time_limit)
-    mdl.optimize()
-
-    if mdl.status == GRB.OPTIMAL or mdl.status == GRB.SUBOPTIMAL:
-        Cmax_value = Cmax.X
-        print(f'Optimal objective value (Gurobi): {Cmax_value}')
+    mip_cutoff(mdl, lower_bound)
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    tic = time.perf_counter()
+    mdl.optimize(gurobi_progress_callback(result, lower_bound))
+    result.solve_time = time.perf_counter() - tic
+    gurobi_result(result, mdl, lower_bound)
+
+    if result.objective is not None:
+        result.schedule = pmsp_schedule(instance, [max(range(instance.g), key=lambda i: y_vars[(j, i)].X) for j in range(instance.n)])
+        print(f'Optimal objective value (Gurobi): {result.objective}')
     else:
         print('No feasible solution found by Gurobi!')
 
+    return result
+
 
-def pmsp_cp_model1(file_path, threads=1, time_limit=3600, agent='local', execfile='/Applications/CPLEX_Studio1210/cpoptimizer/bin/x86-64_osx/cpoptimizer'):
+def pmsp_cp_model1(file_path, threads=1, time_limit=3600, start=None, agent='local', execfile='/Applications/CPLEX_Studio1210/cpoptimizer/bin/x86-64_osx/cpoptimizer', lower_bound=None):
     """
     The execfile parameter specifies the path to the CP Optimizer executable.
     This is required to run the solver, as it defines the core binary that handles the solving process.
@@ -140,8 +364,14 @@ def pmsp_cp_model1(file_path, threads=1, time_limit=3600, agent='local', execfil
       - On Windows: 'C:\\Program Files\\IBM\\ILOG\\CPLEX_Studio1210\\cpoptimizer\\bin\\x64_win64\\cpoptimizer.exe'
       - On Linux: '/opt/ibm/ILOG/CPLEX_Studio1210/cpoptimizer/bin/x86-64_linux/cpoptimizer'
     Ensure the provided path matches the location of the installed CP Optimizer executable on your system.
+    If start (the machine of every job, e.g. from pmsp_local_search) is given, it is the starting point of the search.
+    If lower_bound (a proven lower bound on the makespan, e.g. from bounds.py) is given, the search stops as soon as a
+    solution reaches it, and that solution is reported as optimal.
     """
+    result = Result('CP Optimizer')
+    tic = time.perf_counter()
     instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
 
     # create the model
     mdl = CpoModel()
@@ -150,24 +380,42 @@ def pmsp_cp_model1(file_path, threads=1, time_limit=3600, agent='local', execfil
     machine = [mdl.integer_var(min=0, max=instance.g - 1) for _ in range(instance.n)]
 
     # constraint (2)
-    duration = [mdl.element(instance.p[j], machine[j]) for j in range(instance.n)]
-    makespan = mdl.max([sum([instance.p[j][i] * (machine[j] == i) for j in range(instance.n)]) for i in range(instance.g)])
+    duration = [mdl.element(instance.p[j].tolist(), machine[j]) for j in range(instance.n)]
+    makespan = mdl.max([sum([int(instance.p[j][i]) * (machine[j] == i) for j in range(instance.n)]) for i in range(instance.g)])
 
     # constraint (3)
     mdl.add(sum([duration[j] for j in range(instance.n)]) <= instance.g * makespan)
     mdl.add(mdl.minimize(makespan))
 
-    # solve the model
-    result = mdl.solve(TimeLimit=time_limit, Workers=threads, LogVerbosity='Quiet', agent=agent, execfile=execfile)
+    # set the starting point
+    if start is not None:
+        starting_point = mdl.create_empty_solution()
+        for j in range(instance.n):
+            starting_point.add_integer_var_solution(machine[j], int(start[j]))
+        mdl.set_starting_point(starting_point)
 
-    if result:
-        print(f'Optimal objective value (CP Optimizer): {result.get_objective_value()}')
+    # solve the model
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    mdl.add_solver_callback(CpProgressCallback(result, lower_bound))
+    tic = time.perf_counter()
+    solution = mdl.solve(TimeLimit=time_limit, Workers=threads, LogVerbosity='Quiet', agent=agent, execfile=execfile)
+    result.solve_time = time.perf_counter() - tic
+    cp_result(result, solution, lower_bound)
+
+    if result.objective is not None:
+        result.schedule = pmsp_schedule(instance, [solution.get_var_solution(machine[j]).get_value() for j in range(instance.n)])
+        print(f'Optimal objective value (CP Optimizer): {result.objective}')
     else:
         print('No feasible solution found by CP Optimizer!')
 
+    return result
+
 
-def pmsp_cp_model2(file_path, threads=1, time_limit=3600, agent='local', execfile='/Applications/CPLEX_Studio1210/cpoptimizer/bin/x86-64_osx/cpoptimizer'):
+def pmsp_cp_model2(file_path, threads=1, time_limit=3600, agent='local', execfile='/Applications/CPLEX_Studio1210/cpoptimizer/bin/x86-64_osx/cpoptimizer', lower_bound=None):
+    result = Result('CP Optimizer')
+    tic = time.perf_counter()
     instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
 
     # create the model
     mdl = CpoModel()
@@ -177,7 +425,7 @@ def pmsp_cp_model2(file_path, threads=1, time_limit=3600, agent='local', execfil
     for j in range(instance.n):
         tasks.append([])
         for i in range(instance.g):
-            tasks[j].append(mdl.interval_var(name=f'tasks_{j}_{i}', optional=True, size=instance.p[j][i]))
+            tasks[j].append(mdl.interval_var(name=f'tasks_{j}_{i}', optional=True, size=int(instance.p[j][i])))
 
     # constraint (2)
     _tasks = []
@@ -194,16 +442,27 @@ def pmsp_cp_model2(file_path, threads=1, time_limit=3600, agent='local', execfil
     mdl.add(mdl.minimize(mdl.max([mdl.end_of(_tasks[j]) for j in range(instance.n)])))
 
     # solve the model
-    result = mdl.solve(TimeLimit=time_limit, Workers=threads, LogVerbosity='Quiet', agent=agent, execfile=execfile)
-
-    if result:
-        print(f'Optimal objective value (CP Optimizer): {result.get_objective_value()}')
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    mdl.add_solver_callback(CpProgressCallback(result, lower_bound))
+    tic = time.perf_counter()
+    solution = mdl.solve(TimeLimit=time_limit, Workers=threads, LogVerbosity='Quiet', agent=agent, execfile=execfile)
+    result.solve_time = time.perf_counter() - tic
+    cp_result(result, solution, lower_bound)
+
+    if result.objective is not None:
+        result.schedule = pmsp_schedule(instance, [next(i for i in range(instance.g) if solution.get_var_solution(tasks[j][i]).is_present()) for j in range(instance.n)])
+        print(f'Optimal objective value (CP Optimizer): {result.objective}')
     else:
         print('No feasible solution found by CP Optimizer!')
 
+    return result
 
-def pmsp_cp_model3(file_path, threads=1, time_limit=3600, agent='local', execfile='/Applications/CPLEX_Studio1210/cpoptimizer/bin/x86-64_osx/cpoptimizer'):
+
+def pmsp_cp_model3(file_path, threads=1, time_limit=3600, agent='local', execfile='/Applications/CPLEX_Studio1210/cpoptimizer/bin/x86-64_osx/cpoptimizer', lower_bound=None):
+    result = Result('CP Optimizer')
+    tic = time.perf_counter()
     instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
 
     # create the CP model
     mdl = CpoModel()
@@ -218,7 +477,7 @@ def pmsp_cp_model3(file_path, threads=1, time_limit=3600, agent='local', execfil
     # constraint (2)
     processing_time = []
     for i in range(instance.g):
-        processing_time.append(mdl.sum(instance.p[j][i] * Y[j][i] for j in range(instance.n)))
+        processing_time.append(mdl.sum(int(instance.p[j][i]) * Y[j][i] for j in range(instance.n)))
     Cmax = mdl.max(processing_time)
     mdl.add(mdl.minimize(Cmax))
 
@@ -227,21 +486,32 @@ def pmsp_cp_model3(file_path, threads=1, time_limit=3600, agent='local', execfil
         mdl.add(mdl.sum(Y[j][i] for i in range(instance.g)) == 1)
 
     # solve the model
-    result = mdl.solve(TimeLimit=time_limit, Workers=threads, LogVerbosity='Quiet', agent=agent, execfile=execfile)
-
-    if result:
-        print(f'Optimal objective value (CP Optimizer): {result.get_objective_value()}')
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    mdl.add_solver_callback(CpProgressCallback(result, lower_bound))
+    tic = time.perf_counter()
+    solution = mdl.solve(TimeLimit=time_limit, Workers=threads, LogVerbosity='Quiet', agent=agent, execfile=execfile)
+    result.solve_time = time.perf_counter() - tic
+    cp_result(result, solution, lower_bound)
+
+    if result.objective is not None:
+        result.schedule = pmsp_schedule(instance, [max(range(instance.g), key=lambda i: solution.get_var_solution(Y[j][i]).get_value()) for j in range(instance.n)])
+        print(f'Optimal objective value (CP Optimizer): {result.objective}')
     else:
         print('No feasible solution found by CP Optimizer!')
 
+    return result
+
 
 if __name__ == '__main__':
     path = 'test cases/0.txt'
-    print('-------------------------------CPLEX-------------------------------')
-    pmsp_mip_cplex_model(path, threads=6)
+    print('-------------------------------Local search-------------------------------')
+    start, Cmax = pmsp_local_search(parser(path))
+    print(f'Objective value (local search): {Cmax}')
+    print('\n\n\n-------------------------------CPLEX-------------------------------')
+    pmsp_mip_cplex_model(path, threads=6, start=start)
     print('\n\n\n-------------------------------Gurobi-------------------------------')
-    pmsp_mip_gurobi_model(path, threads=6)
+    pmsp_mip_gurobi_model(path, threads=6, start=start)
     print('\n\n\n-------------------------------Constraint Programming------------------------------')
-    pmsp_cp_model1(path)
+    pmsp_cp_model1(path, start=start)
     pmsp_cp_model2(path)
     pmsp_cp_model3(path)
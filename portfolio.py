@@ -0,0 +1,200 @@
+"""
+Race several formulations of one scheduling problem on one instance, each in its own process with a share of the
+cores, and stop as soon as one of them proves optimality or the time limit expires. The racers share the best bound
+and the best incumbent found so far through the solver callbacks of the model functions (see their lower_bound
+argument): a racer stops, and reports its solution as optimal, as soon as its incumbent reaches the best bound proven
+by any racer or the combinatorial bound of the instance (see bounds.py), and the other racers stop as soon as the best
+incumbent of any racer reaches that bound, since none of them can improve on it any more. The MIP models also start
+their search with the best incumbent found while they were built as their cutoff (see common.mip_cutoff). The race
+ends when a racer reports an optimal solution; the other racers, and the solver processes they started, are then
+cancelled.
+
+Example (CPLEX, Gurobi and CP Optimizer on 6 cores, 600 s at most):
+    python portfolio.py jsp "job shop scheduling/test cases/Taillard/1.txt" -c 6 -l 600
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import time
+
+from batch import log_path, run
+from bounds import file_lower_bound
+from problems import PROBLEMS, ROOT, formulations
+from sizes import file_model_size, total
+
+GRACE_TIME = 30  # seconds a racer may overrun the time limit (e.g. to write its result) before it is cancelled
+
+
+class SharedBound:
+    """
+    The best lower bound and the best incumbent objective of a race, in shared memory. It is passed to the model
+    functions as their lower_bound: their solver callbacks read value (the best bound) and incumbent (the best
+    incumbent of any racer, None before the first one), and report the incumbent and the bound of their own search.
+    Makespans are integers, so a fractional bound is rounded up.
+    """
+
+    def __init__(self, lower_bound, context):
+        self.bound = context.Value('d', lower_bound)
+        self.objective = context.Value('d', math.inf)
+
+    @property
+    def value(self):
+        return self.bound.value
+
+    @property
+    def incumbent(self):
+        return self.objective.value if self.objective.value < math.inf else None
+
+    def reached(self, objective):
+        """
+        Return whether an objective (None if there is none) reached the best bound.
+        """
+        return objective is not None and objective <= self.bound.value + 1e-6
+
+    def report(self, objective, bound):
+        if bound is not None and math.ceil(bound - 1e-6) > self.bound.value:
+            with self.bound.get_lock():
+                self.bound.value = max(self.bound.value, math.ceil(bound - 1e-6))
+        if objective is not None and objective < self.objective.value:
+            with self.objective.get_lock():
+                self.objective.value = min(self.objective.value, objective)
+
+
+def default_formulations(problem):
+    """
+    Return one formulation per solver: the CPLEX model, the Gurobi model (the matrix builder where there is one) and
+    the first CP model of the problem.
+    """
+    available = formulations(problem)
+    chosen = []
+    for candidates in (['mip_cplex_model'], ['mip_gurobi_matrix_model', 'mip_gurobi_model'], [name for name in available if name.startswith('cp_')]):
+        chosen += [name for name in candidates if name in available][:1]
+    return chosen
+
+
+def split_cores(cores, racers):
+    """
+    Return the threads of each racer: the cores split as evenly as possible, at least one thread each.
+    """
+    return [max(1, cores // racers + (k < cores % racers)) for k in range(racers)]
+
+
+def racer(task, shared_bound, results):
+    """
+    Run one formulation of a race (see batch.run) and put its record on the results queue. The racer leads a process
+    group of its own, so that cancelling it also stops the solver processes it started (e.g. CP Optimizer).
+    """
+    if hasattr(os, 'setsid'):
+        os.setsid()
+    results.put(run(task, shared_bound))
+
+
+def cancel(process):
+    """
+    Stop a racer and the solver processes it started.
+    """
+    if process.is_alive():
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except (AttributeError, OSError):  # no process groups (Windows), or the racer is already gone
+            process.terminate()
+    process.join()
+
+
+def race(problem, file_path, chosen=None, cores=None, time_limit=3600, execfile=None, log_dir=None, max_nonzeros=None):
+    """
+    Race formulations of a problem (by default one per solver, see default_formulations) on an instance file, with
+    cores split between them. The MIP formulations are left out if the model would have more than max_nonzeros
+    nonzeros (predicted, see sizes.py), so that their cores go to the CP formulations. Returns the record of the best
+    run (see batch.run; it has the schedule and the wall time of the race until that run finished) and the records of
+    all the runs that finished, by formulation. A run whose objective reaches the best bound proven by any racer is
+    optimal, even if the racer that proved the bound finished later.
+    """
+    chosen = chosen or default_formulations(problem)
+    if max_nonzeros is not None and total(file_model_size(problem, file_path))[1] > max_nonzeros:
+        chosen = [formulation for formulation in chosen if not formulation.startswith('mip_')]
+    if not chosen:
+        return None, {}
+    context = multiprocessing.get_context('spawn')
+    shared_bound = SharedBound(file_lower_bound(problem, file_path), context)
+    results = context.Queue()
+    processes = {}
+    start = time.perf_counter()
+    for formulation, threads in zip(chosen, split_cores(cores or os.cpu_count() or 1, len(chosen))):
+        task = {'problem': problem, 'formulation': formulation, 'instance': os.path.relpath(os.path.abspath(file_path), ROOT), 'threads': threads, 'time_limit': time_limit, 'execfile': execfile, 'stop_at_bound': True, 'schedules': True, 'model_cache': None, 'model_cache_bytes': None, 'max_nonzeros': None, 'lazy': False}
+        task['log'] = log_path(log_dir, task)
+        processes[formulation] = context.Process(target=racer, args=(task, shared_bound, results), daemon=True)
+        processes[formulation].start()
+
+    records = {}
+    try:
+        while len(records) < len(processes):
+            try:
+                record = results.get(timeout=1)
+            except queue.Empty:
+                for formulation, process in processes.items():
+                    if formulation not in records and not process.is_alive() and results.empty():
+                        # the racer died without a record (e.g. a crash inside a solver library)
+                        records[formulation] = {'formulation': formulation, 'status': 'error', 'error': f'exit code {process.exitcode}'}
+                if time.perf_counter() - start > time_limit + GRACE_TIME or any(shared_bound.reached(record.get('objective')) for record in records.values()):
+                    break
+                continue
+            record['race_time'] = time.perf_counter() - start
+            records[record['formulation']] = record
+            if record['status'] in ('optimal', 'infeasible') or shared_bound.reached(record.get('objective')):
+                break
+    finally:
+        for process in processes.values():
+            cancel(process)
+
+    best = None
+    for record in records.values():
+        if record['status'] in ('optimal', 'infeasible'):
+            best = record
+            break
+        if record.get('objective') is not None and (best is None or record['objective'] < best['objective']):
+            best = record
+    if best is not None and best['status'] != 'infeasible':
+        best['bound'] = max(best['bound'] or 0, shared_bound.value)
+        if shared_bound.reached(best['objective']):
+            best['status'], best['gap'] = 'optimal', 0.0
+    return best, records
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('problem', choices=PROBLEMS, help='the problem type')
+    arg_parser.add_argument('instance', help='the instance file')
+    arg_parser.add_argument('-f', '--formulations', nargs='+', help='model functions without the problem prefix, e.g. mip_cplex_model cp_model (default: one per solver)')
+    arg_parser.add_argument('-c', '--cores', type=int, default=os.cpu_count() or 1, help='cores split between the formulations (default: all)')
+    arg_parser.add_argument('-l', '--time-limit', type=float, default=3600.0, help='time limit of the race in seconds (default: 3600)')
+    arg_parser.add_argument('-o', '--output', help='JSONL file the record of the best run is appended to')
+    arg_parser.add_argument('--log-dir', help='keep the solver output of every racer in this folder')
+    arg_parser.add_argument('--execfile', help='path to the CP Optimizer executable, passed to the CP formulations')
+    arg_parser.add_argument('--max-nonzeros', type=float, help='leave out the MIP formulations if the model would have more nonzeros (see sizes.py)')
+    args = arg_parser.parse_args(argv)
+
+    available = formulations(args.problem)
+    unknown = [formulation for formulation in args.formulations or [] if formulation not in available]
+    if unknown:
+        arg_parser.error(f"unknown formulations {', '.join(unknown)} (choose from {', '.join(available)})")
+    best, records = race(args.problem, args.instance, args.formulations, args.cores, args.time_limit, args.execfile, args.log_dir, args.max_nonzeros)
+    for formulation, record in records.items():
+        objective = record.get('objective')
+        print(f"{formulation}: {record['status']}{'' if objective is None else f' {objective}'} after {record.get('race_time', 0):.2f} s", file=sys.stderr)
+    if best is None:
+        print('no solution found', file=sys.stderr)
+        return
+    print(f"best: {best['formulation']}, {best['status']} {best['objective']} (bound {best['bound']}) after {best['race_time']:.2f} s", file=sys.stderr)
+    if args.output:
+        with open(args.output, 'a') as out:
+            out.write(json.dumps(best) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Registry of the scheduling problems in this repository for the command-line tools at the top level. The model scripts
+live in folders whose names are not valid module names, so they are loaded from their file paths.
+"""
+import glob
+import importlib.util
+import os
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# problem key (the prefix of the functions in its script) -> model script, relative to ROOT
+PROBLEMS = {
+    'fsp': 'flow shop scheduling/FSP.py',
+    'nfsp': 'nonpermutation job shop scheduling/N-FSP.py',
+    'jsp': 'job shop scheduling/JSP.py',
+    'fjsp': 'flexible job shop scheduling/FJSP.py',
+    'hfsp': 'hybrid flow shop scheduling/H-FSP.py',
+    'dfsp': 'distributed flow shop scheduling/DFSP.py',
+    'sdst_fsp': 'sequence-dependent setup time flow shop scheduling/SDST-FSP.py',
+    'pmsp': 'parallel machine scheduling problem/PMSP.py',
+}
+
+# problems whose MIP model functions take a lazy argument (the disjunctive constraints are added on demand)
+LAZY_PROBLEMS = ('fsp', 'nfsp', 'jsp')
+
+# problems whose model functions take the release times of the machines (see rolling_horizon.py)
+RELEASE_PROBLEMS = ('fsp', 'nfsp')
+
+
+def load_module(problem):
+    """
+    Import the model script of a problem (once per process) and return it.
+    """
+    name = f'scheduling_{problem}'
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, PROBLEMS[problem]))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[name]
+            raise
+    return sys.modules[name]
+
+
+def formulations(problem):
+    """
+    Return the formulations of a problem in the order they are defined, named after their model functions without the
+    problem prefix (e.g. 'mip_cplex_model' for fsp_mip_cplex_model, 'cp_model1' for hfsp_cp_model1).
+    """
+    pattern = re.compile(rf'{problem}_((?:mip|cp)_\w*model\d*)')
+    return [match.group(1) for match in map(pattern.fullmatch, vars(load_module(problem))) if match]
+
+
+def model_function(problem, formulation):
+    """
+    Return the model function of a formulation of a problem.
+    """
+    return getattr(load_module(problem), f'{problem}_{formulation}')
+
+
+def test_cases(problem):
+    """
+    Return the folder holding the test cases of a problem.
+    """
+    return os.path.join(ROOT, os.path.dirname(PROBLEMS[problem]), 'test cases')
+
+
+def natural_key(path):
+    """
+    Sort key that orders numbered instance files as 1, 2, ..., 10 instead of 1, 10, 2.
+    """
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', path)]
+
+
+def instance_files(patterns):
+    """
+    Expand folders (searched recursively for .txt files), glob patterns and plain paths into a sorted list of distinct
+    instance files.
+    """
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            files.update(glob.glob(os.path.join(glob.escape(pattern), '**', '*.txt'), recursive=True))
+        else:
+            files.update(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+    return sorted(files, key=natural_key)
@@ -0,0 +1,142 @@
+"""
+Rolling-horizon decomposition for flow shops too large for the exact models (hundreds of jobs). The jobs are taken in
+the order of the NEH sequence, and a window of the next jobs is solved by one of the formulations of the problem, with
+every machine available only from the completion of the jobs fixed before (the release argument of the model
+functions). The first jobs of the window are then fixed in the order of the solution, the last ones (the overlap) go
+back to the front of the jobs left, and the window slides on. Every window has the same size and time limit, so the
+solve time grows linearly with the number of jobs. The windows start from the NEH sequence, whose schedule is returned
+instead if they end with a larger makespan.
+
+Example (windows of 20 jobs overlapping by 5, solved by CP Optimizer in 10 s each):
+    python rolling_horizon.py fsp "flow shop scheduling/test cases/99.txt" -f cp_model -w 20 --overlap 5 -l 10
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmark import rows_text
+from bounds import file_lower_bound
+from common import fsp_completion_times, fsp_neh
+from problems import RELEASE_PROBLEMS, ROOT, formulations, load_module, model_function
+
+
+def write_instance(path, p):
+    """
+    Write the processing times of the jobs of a window (jobs x machines) as an instance file of the flow shop format.
+    """
+    with open(path, 'w') as f:
+        f.write(f'{len(p)}\n{len(p[0])}\n' + rows_text(p))
+
+
+def machine_orders(schedule, jobs, g):
+    """
+    Return the order of the jobs on every machine in the (job, operation, machine, start, end) tuples of the solution
+    of a window, whose job k is jobs[k].
+    """
+    orders = [[] for _ in range(g)]
+    for job, _, machine, _, _ in sorted(schedule, key=lambda task: (task[3], task[4])):
+        orders[machine].append(jobs[job])
+    return orders
+
+
+def solve(problem, file_path, formulation='cp_model', window=20, overlap=5, threads=1, time_limit=60, execfile=None):
+    """
+    Solve an instance file of a problem in RELEASE_PROBLEMS by rolling horizon: windows of window jobs, each solved by
+    a formulation of the problem within time_limit seconds, of which the last overlap jobs are solved again with the
+    next window. The MIP formulations start from the order of the jobs in the window. A window without a solution
+    keeps that order. For the non-permutation flow shop, the jobs fixed after a window are the first ones on the first
+    machine, and every machine keeps their order in the solution. If the schedule of the windows has a larger makespan
+    than the NEH sequence they started from, the NEH schedule is kept.
+    Returns a record like those of batch.run, with the fixed job sequence of every machine, the makespan of the NEH
+    sequence and the status, objective and solve time of every window.
+    """
+    if not 0 <= overlap < window:
+        raise ValueError(f'the overlap ({overlap}) must be smaller than the window ({window})')
+    record = {'problem': problem, 'formulation': formulation, 'instance': os.path.relpath(os.path.abspath(file_path), ROOT), 'window': window, 'overlap': overlap, 'threads': threads, 'time_limit': time_limit}
+    start = time.perf_counter()
+    module = load_module(problem)
+    instance = module.parser(file_path)
+    p = np.asarray(instance.p, dtype=np.int64)
+    record['lower_bound'] = file_lower_bound(problem, file_path)
+    kwargs = {'threads': threads, 'time_limit': time_limit}
+    if execfile is not None and formulation.startswith('cp_'):
+        kwargs['execfile'] = execfile
+
+    neh, neh_makespan = fsp_neh(instance)
+    pending = list(neh)
+    sequences = [[] for _ in range(instance.g)]
+    c = np.zeros((instance.n, instance.g), dtype=np.int64)
+    release = np.zeros(instance.g, dtype=np.int64)
+    windows = []
+    with tempfile.TemporaryDirectory() as directory:
+        while pending:
+            jobs = pending[:window]
+            path = os.path.join(directory, f'window{len(windows)}.txt')
+            write_instance(path, p[jobs])
+            if formulation.startswith('mip_'):
+                kwargs['start'] = list(range(len(jobs)))
+            result = model_function(problem, formulation)(path, release=release.tolist(), **kwargs)
+            orders = machine_orders(result.schedule, jobs, instance.g) if result.schedule else [jobs] * instance.g
+            windows.append({'jobs': jobs, 'status': result.status, 'objective': result.objective, 'solve_time': result.solve_time})
+
+            # fix the first jobs of the window (all of them in the last window), one machine after the other
+            fixed = set(orders[0][:len(jobs) if len(jobs) == len(pending) else window - overlap])
+            for i in range(instance.g):
+                for j in orders[i]:
+                    if j in fixed:
+                        c[j][i] = max(release[i], c[j][i - 1] if i > 0 else 0) + p[j][i]
+                        release[i] = c[j][i]
+                        sequences[i].append(j)
+            pending = [j for j in orders[0] if j not in fixed] + pending[len(jobs):]
+            print(f"window {len(windows)}: {len(fixed)} jobs fixed, {len(pending)} left, makespan {release[-1]}", file=sys.stderr)
+
+    # keep the NEH schedule if the windows did not reach its makespan
+    makespan = int(release[-1])
+    if neh_makespan < makespan:
+        print(f'the NEH sequence is better: makespan {neh_makespan}', file=sys.stderr)
+        makespan = neh_makespan
+        sequences = [neh] * instance.g
+        c[neh] = fsp_completion_times(p, neh)
+
+    record['status'] = 'feasible'
+    record['objective'] = makespan
+    record['neh_objective'] = neh_makespan
+    record['sequences'] = sequences
+    record['schedule'] = getattr(module, f'{problem}_schedule')(instance, c)
+    record['windows'] = windows
+    record['wall_time'] = time.perf_counter() - start
+    return record
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('problem', choices=RELEASE_PROBLEMS, help='the problem type')
+    arg_parser.add_argument('instance', help='the instance file')
+    arg_parser.add_argument('-f', '--formulation', default='cp_model', help='model function without the problem prefix that solves the windows (default: cp_model)')
+    arg_parser.add_argument('-w', '--window', type=int, default=20, help='jobs per window (default: 20)')
+    arg_parser.add_argument('--overlap', type=int, default=5, help='jobs of a window solved again with the next one (default: 5)')
+    arg_parser.add_argument('-t', '--threads', type=int, default=1, help='solver threads (default: 1)')
+    arg_parser.add_argument('-l', '--time-limit', type=float, default=60.0, help='time limit per window in seconds (default: 60)')
+    arg_parser.add_argument('-o', '--output', help='JSONL file the record of the run is appended to')
+    arg_parser.add_argument('--execfile', help='path to the CP Optimizer executable, passed to the CP formulations')
+    args = arg_parser.parse_args(argv)
+
+    available = formulations(args.problem)
+    if args.formulation not in available:
+        arg_parser.error(f"unknown formulation {args.formulation} (choose from {', '.join(available)})")
+    if not 0 <= args.overlap < args.window:
+        arg_parser.error('--overlap must be at least 0 and smaller than --window')
+    record = solve(args.problem, args.instance, args.formulation, args.window, args.overlap, args.threads, args.time_limit, args.execfile)
+    print(f"makespan {record['objective']} (lower bound {record['lower_bound']}) in {len(record['windows'])} windows, {record['wall_time']:.2f} s", file=sys.stderr)
+    if args.output:
+        with open(args.output, 'a') as out:
+            out.write(json.dumps(record) + '\n')
+
+
+if __name__ == '__main__':
+    main()
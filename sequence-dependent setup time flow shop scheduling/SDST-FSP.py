@@ -1,128 +1,257 @@
+import os
+import sys
+import time
+import numpy as np
 import cplex
 import gurobipy as gp
 from gurobipy import GRB
 from docplex.cp.model import CpoModel
 
+# the code shared by the model scripts lives in common.py at the top of the repository
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import CACHE_MIN_SIZE, read_integers, read_cache, write_cache, Result, cplex_result, gurobi_result, cp_result, CplexProgressCallback, gurobi_progress_callback, mip_cutoff, CpProgressCallback, FamilySizes, gurobi_variables
+
 
 class SDST_FSP:
+    __slots__ = ('n', 'g', 'p', 's')
+
     def __init__(self):
         self.n = 0  # the number of jobs
         self.g = 0  # the number of machines
-        self.p = []  # the set of processing times
-        self.s = []  # the set of setup times
+        self.p = np.zeros((0, 0), dtype=np.int32)  # the set of processing times, p[j][i]
+        self.s = np.zeros((0, 0, 0), dtype=np.int32)  # the set of setup times, s[i][j1][j2] on machine i
 
 
-def parser(file_path):
-    instance = SDST_FSP()
+def read_text(file_path):
+    """
+    Parse an instance file in bulk: the header lines one by one and the rest of the file as one block of integers.
+    """
     with open(file_path, 'r') as f:
-        instance.n = int(f.readline().strip().split()[0])
-        instance.g = int(f.readline().strip().split()[0])
-        for _ in range(instance.n):
-            instance.p.append([int(x) for x in f.readline().strip().split()])
-        for i in range(instance.g):
-            instance.s.append([])
-            for j in range(instance.n):
-                instance.s[i].append([int(x) for x in f.readline().strip().split()])
+        n = int(f.readline().strip().split()[0])
+        g = int(f.readline().strip().split()[0])
+        body = read_integers(f, n * g + g * n * n, file_path)
+    return {'p': body[:n * g].reshape(n, g), 's': body[n * g:n * g + g * n * n].reshape(g, n, n)}
+
+
+def parser(file_path, cache=True):
+    # opening an .npz archive costs more than parsing a small file, so only large files are cached
+    cache = cache and os.path.getsize(file_path) >= CACHE_MIN_SIZE
+    arrays = read_cache(file_path) if cache else None
+    if arrays is None:
+        arrays = read_text(file_path)
+        if cache:
+            write_cache(file_path, arrays)
+    instance = SDST_FSP()
+    instance.p = arrays['p']
+    instance.s = arrays['s']
+    instance.n, instance.g = (int(x) for x in instance.p.shape)
     return instance
 
 
-def sdst_fsp_mip_cplex_model(file_path, threads=1, time_limit=3600):
+def sdst_fsp_makespan(p, s, sequences):
+    """
+    Evaluate the makespans of a batch of job sequences, with sequence-dependent setups, in one pass over the machines.
+    p is the n x g matrix of processing times, s the g x n x n tensor of setup times and sequences a 2-D integer array
+    whose rows are job sequences (a single 1-D sequence is also accepted). Returns a 1-D array with one makespan per row.
+    On machine i, the k-th job completes at c_k = max(c_{k-1} + S_k, c'_k) + P_k, where S_k is the setup from the
+    previous job (none for the first one) and c' the completion times on machine i - 1. With T the running sum of
+    S + P this unrolls to T_k + max_{l <= k} (c'_l - T_l + P_l), as in the flow shop without setups, so each machine
+    costs one gather of the setups, one cumsum and one running maximum over the whole batch.
+    """
+    pt = np.asarray(p, dtype=np.int64).T
+    sequences = np.atleast_2d(np.asarray(sequences, dtype=np.intp))
+    c = np.zeros(sequences.shape, dtype=np.int64)
+    pair = sequences[:, :-1], sequences[:, 1:]
+    for i in range(pt.shape[0]):
+        pi = pt[i][sequences]
+        t = pi.copy()
+        t[:, 1:] += s[i][pair]
+        t = np.cumsum(t, axis=1)
+        c = t + np.maximum.accumulate(c - t + pi, axis=1)
+    return c[:, -1]
+
+
+def sdst_fsp_completion_times(p, s, sequence):
+    """
+    Return the completion times c[k][i] of the k-th job of a single job sequence on machine i (same recurrence as
+    sdst_fsp_makespan).
+    """
+    sequence = np.asarray(sequence, dtype=np.intp)
+    pt = np.asarray(p, dtype=np.int64)[sequence]
+    c = np.zeros(pt.shape, dtype=np.int64)
+    prev = np.zeros(pt.shape[0], dtype=np.int64)
+    for i in range(pt.shape[1]):
+        t = pt[:, i].copy()
+        t[1:] += s[i][sequence[:-1], sequence[1:]]
+        t = np.cumsum(t)
+        prev = t + np.maximum.accumulate(prev - t + pt[:, i])
+        c[:, i] = prev
+    return c
+
+
+def sdst_fsp_mip_start(instance, start):
+    """
+    Translate a job permutation into consistent values of the MIP variables z, c and Cmax.
+    In the model, jobs are numbered from 1 and job 0 is the dummy job that precedes the first one.
+    Returns a dictionary that maps each variable family to {index: value} (Cmax maps to its value).
+    """
+    sequence = [int(j) for j in start]
+    c = np.zeros((instance.n + 1, instance.g), dtype=np.int64)
+    c[np.array(sequence) + 1] = sdst_fsp_completion_times(instance.p, instance.s, sequence)
+    predecessor = {j1 + 1: j2 + 1 for j2, j1 in zip(sequence, sequence[1:])}
+    predecessor[sequence[0] + 1] = 0
+    z_values = {(j1, j2): int(predecessor[j1] == j2) for j1 in range(1, instance.n + 1) for j2 in range(instance.n + 1) if j1 != j2}
+    c_values = {(j, i): int(c[j][i]) for j in range(instance.n + 1) for i in range(instance.g)}
+    return {'z': z_values, 'c': c_values, 'Cmax': int(c[1:, instance.g - 1].max())}
+
+
+def sdst_fsp_big_m(instance, start=None):
+    """
+    Return an instance-derived big-M for the disjunctive constraints: the makespan of the job order 1, ..., n, or of
+    the MIP start if that is larger (so the start stays feasible), plus the largest setup time. Some optimal schedule
+    completes every operation by then, so no constraint (5) needs more.
+    """
+    sequences = [range(instance.n)] if start is None else [range(instance.n), start]
+    return int(sdst_fsp_makespan(instance.p, instance.s, sequences).max() + instance.s.max())
+
+
+def sdst_fsp_schedule(instance, c):
+    """
+    Return the (job, operation, machine, start, end) tuples of the schedule with completion times c[j][i] of the jobs
+    numbered from 0 (without the dummy job), where operation i of every job is processed on machine i.
+    """
+    return [(j, i, i, float(c[j][i] - instance.p[j][i]), float(c[j][i])) for j in range(instance.n) for i in range(instance.g)]
+
+
+def sdst_fsp_mip_cplex_model(file_path, threads=1, time_limit=3600, start=None, big_m=None, names=False, model_cache=None, lower_bound=None):
+    result = Result('CPLEX')
+    tic = time.perf_counter()
     instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
 
     # create the model
     mdl = cplex.Cplex()
 
     # variable z
-    z_names = [f'z_{j1}_{j2}' for j1 in range(1, instance.n + 1) for j2 in range(instance.n + 1) if j1 != j2]
-    z_objs = [0] * len(z_names)
-    z_lbs = [0] * len(z_names)
-    z_ubs = [1] * len(z_names)
-    z_types = ['B'] * len(z_names)
+    z_keys = [(j1, j2) for j1 in range(1, instance.n + 1) for j2 in range(instance.n + 1) if j1 != j2]
+    z_objs = [0] * len(z_keys)
+    z_lbs = [0] * len(z_keys)
+    z_ubs = [1] * len(z_keys)
+    z_types = ['B'] * len(z_keys)
 
     # variable c
-    c_names = [f'c_{j}_{i}' for j in range(instance.n + 1) for i in range(instance.g)]
-    c_objs = [0] * len(c_names)
-    c_lbs = [0] * len(c_names)
-    c_ubs = [float('inf')] * len(c_names)
-    c_types = ['C'] * len(c_names)
+    c_keys = [(j, i) for j in range(instance.n + 1) for i in range(instance.g)]
+    c_objs = [0] * len(c_keys)
+    c_lbs = [0] * len(c_keys)
+    c_ubs = [float('inf')] * len(c_keys)
+    c_types = ['C'] * len(c_keys)
 
     # variable Cmax
-    Cmax_name = ['Cmax']
     Cmax_obj = [1]
     Cmax_lb = [0]
     Cmax_ub = [float('inf')]
     Cmax_type = ['C']
 
-    # constraints
-    constrs = []
-    senses = []
-    rhs = []
+    # variable indices
+    z_ids = {key: index for index, key in enumerate(z_keys)}
+    c_ids = {key: len(z_keys) + index for index, key in enumerate(c_keys)}
+    Cmax_id = len(z_keys) + len(c_keys)
+
+    # read the model from the model cache, or else build it
+    M = sdst_fsp_big_m(instance, start) if big_m is None else big_m
+    model_file, cached = (None, False) if model_cache is None else model_cache.lookup(sdst_fsp_mip_cplex_model, file_path, '.sav', M, names)
+    if cached:
+        mdl.read(model_file)
+        FamilySizes(model_cache.families(model_file)).report(result)
+    else:
+        # constraints
+        constrs = []
+        senses = []
+        rhs = []
+        sizes = FamilySizes()
+
+        # constraint (1)
+        for j1 in range(1, instance.n + 1):
+            variables = [z_ids[(j1, j2)] for j2 in range(instance.n + 1) if j1 != j2]
+            coefficients = [1] * len(variables)
+            constrs.append([variables, coefficients])
+            senses.append('E')
+            rhs.append(1)
+        sizes.close_cplex('constraint (1)', constrs)
+
+        # constraint (2)
+        for j2 in range(1, instance.n + 1):
+            variables = [z_ids[(j1, j2)] for j1 in range(1, instance.n + 1) if j1 != j2]
+            coefficients = [1] * len(variables)
+            constrs.append([variables, coefficients])
+            senses.append('L')
+            rhs.append(1)
+        sizes.close_cplex('constraint (2)', constrs)
 
-    # constraint (1)
-    for j1 in range(1, instance.n + 1):
-        variables = [f'z_{j1}_{j2}' for j2 in range(instance.n + 1) if j1 != j2]
-        coefficients = [1] * len(variables)
+        # constraint (3)
+        variables = [z_ids[(j, 0)] for j in range(1, instance.n + 1)]
+        coefficients = [1] * instance.n
         constrs.append([variables, coefficients])
         senses.append('E')
         rhs.append(1)
-
-    # constraint (2)
-    for j2 in range(1, instance.n + 1):
-        variables = [f'z_{j1}_{j2}' for j1 in range(1, instance.n + 1) if j1 != j2]
-        coefficients = [1] * len(variables)
-        constrs.append([variables, coefficients])
-        senses.append('L')
-        rhs.append(1)
-
-    # constraint (3)
-    variables = [f'z_{j}_{0}' for j in range(1, instance.n + 1)]
-    coefficients = [1] * instance.n
-    constrs.append([variables, coefficients])
-    senses.append('E')
-    rhs.append(1)
-
-    # constraint (4)
-    for j in range(1, instance.n + 1):
-        for i in range(1, instance.g):
-            variables = [f'c_{j}_{i}', f'c_{j}_{i - 1}']
+        sizes.close_cplex('constraint (3)', constrs)
+
+        # constraint (4)
+        for j in range(1, instance.n + 1):
+            for i in range(1, instance.g):
+                variables = [c_ids[(j, i)], c_ids[(j, i - 1)]]
+                coefficients = [1, -1]
+                constrs.append([variables, coefficients])
+                senses.append('G')
+                rhs.append(int(instance.p[j - 1][i]))
+        sizes.close_cplex('constraint (4)', constrs)
+
+        # constraint (5)
+        for j1 in range(1, instance.n + 1):
+            for j2 in range(instance.n + 1):
+                if j1 != j2:
+                    for i in range(instance.g):
+                        variables = [c_ids[(j1, i)], c_ids[(j2, i)], z_ids[(j1, j2)]]
+                        coefficients = [1, -1, -M]
+                        constrs.append([variables, coefficients])
+                        senses.append('G')
+                        if j2 == 0:
+                            rhs.append(int(instance.p[j1 - 1][i]) - M)
+                        else:
+                            rhs.append(int(instance.p[j1 - 1][i]) + int(instance.s[i][j2 - 1][j1 - 1]) - M)
+        sizes.close_cplex('constraint (5)', constrs, big_m=True)
+
+        # constraint (6)
+        for j in range(1, instance.n + 1):
+            variables = [Cmax_id, c_ids[(j, instance.g - 1)]]
             coefficients = [1, -1]
             constrs.append([variables, coefficients])
             senses.append('G')
-            rhs.append(instance.p[j - 1][i])
-
-    # constraint (5)
-    M = 100000
-    for j1 in range(1, instance.n + 1):
-        for j2 in range(instance.n + 1):
-            if j1 != j2:
-                for i in range(instance.g):
-                    variables = [f'c_{j1}_{i}', f'c_{j2}_{i}', f'z_{j1}_{j2}']
-                    coefficients = [1, -1, -M]
-                    constrs.append([variables, coefficients])
-                    senses.append('G')
-                    if j2 == 0:
-                        rhs.append(instance.p[j1 - 1][i] - M)
-                    else:
-                        rhs.append(instance.p[j1 - 1][i] + instance.s[i][j2 - 1][j1 - 1] - M)
-
-    # constraint (6)
-    for j in range(1, instance.n + 1):
-        variables = ['Cmax', f'c_{j}_{instance.g - 1}']
-        coefficients = [1, -1]
-        constrs.append([variables, coefficients])
-        senses.append('G')
-        rhs.append(0)
-
-    # add variables
-    all_names = z_names + c_names + Cmax_name
-    all_objs = z_objs + c_objs + Cmax_obj
-    all_lbs = z_lbs + c_lbs + Cmax_lb
-    all_ubs = z_ubs + c_ubs + Cmax_ub
-    all_types = z_types + c_types + Cmax_type
-    mdl.variables.add(obj=all_objs, lb=all_lbs, ub=all_ubs, names=all_names, types=all_types)
-
-    # add constraints
-    mdl.linear_constraints.add(lin_expr=constrs, senses=senses, rhs=rhs)
+            rhs.append(0)
+        sizes.close_cplex('constraint (6)', constrs)
+        sizes.report(result)
+
+        # add variables
+        all_objs = z_objs + c_objs + Cmax_obj
+        all_lbs = z_lbs + c_lbs + Cmax_lb
+        all_ubs = z_ubs + c_ubs + Cmax_ub
+        all_types = z_types + c_types + Cmax_type
+        mdl.variables.add(obj=all_objs, lb=all_lbs, ub=all_ubs, types=all_types)
+        if names:
+            all_names = [f'z_{j1}_{j2}' for j1, j2 in z_keys] + [f'c_{j}_{i}' for j, i in c_keys] + ['Cmax']
+            mdl.variables.set_names(list(enumerate(all_names)))
+
+        # add constraints
+        mdl.linear_constraints.add(lin_expr=constrs, senses=senses, rhs=rhs)
+        if model_cache is not None:
+            model_cache.store(model_file, mdl.write, sizes.families)
+
+    # add the MIP start
+    if start is not None:
+        values = sdst_fsp_mip_start(instance, start)
+        start_indices = [z_ids[key] for key in values['z']] + [c_ids[key] for key in values['c']] + [Cmax_id]
+        start_values = list(values['z'].values()) + list(values['c'].values()) + [values['Cmax']]
+        mdl.MIP_starts.add(cplex.SparsePair(ind=start_indices, val=start_values), mdl.MIP_starts.effort_level.auto)
 
     # set the objective sense
     mdl.objective.set_sense(mdl.objective.sense.minimize)
@@ -131,84 +260,133 @@ def sdst_fsp_mip_cplex_model(file_path, threads=1, time_limit=3600):
     mdl.set_warning_stream(None)
     mdl.parameters.threads.set(threads)
     mdl.parameters.timelimit.set(time_limit)
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    callback = mdl.register_callback(CplexProgressCallback)
+    callback.result, callback.lower_bound = result, lower_bound
+    mip_cutoff(mdl, lower_bound)
+    tic = time.perf_counter()
     mdl.solve()
+    result.solve_time = time.perf_counter() - tic
+    cplex_result(result, mdl, lower_bound)
 
-    if mdl.solution.is_primal_feasible():
-        Cmax = mdl.solution.get_values('Cmax')
-        print(f'Optimal objective value (CPLEX): {Cmax}')
+    if result.objective is not None:
+        values = mdl.solution.get_values()
+        result.schedule = sdst_fsp_schedule(instance, [[values[c_ids[(j + 1, i)]] for i in range(instance.g)] for j in range(instance.n)])
+        print(f'Optimal objective value (CPLEX): {result.objective}')
     else:
         print('No feasible solution found by CPLEX!')
 
+    return result
 
-def sdst_fsp_mip_gurobi_model(file_path, threads=1, time_limit=3600):
-    instance = parser(file_path)
-
-    # create the model
-    mdl = gp.Model()
-
-    # variable z
-    z_vars = {}
-    for j1 in range(1, instance.n + 1):
-        for j2 in range(instance.n + 1):
-            if j1 != j2:
-                z_vars[(j1, j2)] = mdl.addVar(vtype=GRB.BINARY, name=f'z_{j1}_{j2}')
-
-    # variable c
-    c_vars = {}
-    for j in range(instance.n + 1):
-        for i in range(instance.g):
-            c_vars[(j, i)] = mdl.addVar(vtype=GRB.CONTINUOUS, name=f'c_{j}_{i}', lb=0)
-
-    # variable Cmax
-    Cmax = mdl.addVar(vtype=GRB.CONTINUOUS, name='Cmax', lb=0)
-
-    # constraint (1)
-    for j1 in range(1, instance.n + 1):
-        mdl.addConstr(gp.quicksum(z_vars[(j1, j2)] for j2 in range(instance.n + 1) if j1 != j2) == 1, name=f'constr1_{j1}')
-
-    # constraint (2)
-    for j2 in range(1, instance.n + 1):
-        mdl.addConstr(gp.quicksum(z_vars[(j1, j2)] for j1 in range(1, instance.n + 1) if j1 != j2) <= 1, name=f'constr2_{j2}')
-
-    # constraint (3)
-    mdl.addConstr(gp.quicksum(z_vars[(j1, 0)] for j1 in range(1, instance.n + 1)) == 1, name='constr3')
-
-    # constraint (4)
-    for j in range(1, instance.n + 1):
-        for i in range(1, instance.g):
-            mdl.addConstr(c_vars[(j, i)] >= c_vars[(j, i - 1)] + instance.p[j - 1][i], name=f'constr4_{j - 1}_{i}')
-
-    # constraint (5)
-    M = 100000
-    for j1 in range(1, instance.n + 1):
-        for j2 in range(instance.n + 1):
-            if j1 != j2:
-                for i in range(instance.g):
-                    if j2 == 0:
-                        mdl.addConstr(c_vars[(j1, i)] >= c_vars[(j2, i)] + instance.p[j1 - 1][i] - M * (1 - z_vars[(j1, j2)]), name=f'constr5_{i}_{j1}_{j2}')
-                    else:
-                        mdl.addConstr(c_vars[(j1, i)] >= c_vars[(j2, i)] + instance.p[j1 - 1][i] + instance.s[i][j2 - 1][j1 - 1] - M * (1 - z_vars[(j1, j2)]), name=f'constr5_{i}_{j1}_{j2}')
-
-    # constraint (6)
-    for j in range(1, instance.n + 1):
-        mdl.addConstr(Cmax >= c_vars[(j, instance.g - 1)], name=f'constr6_{j}')
 
-    # set the objective
-    mdl.setObjective(Cmax, GRB.MINIMIZE)
+def sdst_fsp_mip_gurobi_model(file_path, threads=1, time_limit=3600, start=None, big_m=None, model_cache=None, lower_bound=None):
+    result = Result('Gurobi')
+    tic = time.perf_counter()
+    instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
+
+    # read the model from the model cache, or else build it
+    M = sdst_fsp_big_m(instance, start) if big_m is None else big_m
+    model_file, cached = (None, False) if model_cache is None else model_cache.lookup(sdst_fsp_mip_gurobi_model, file_path, '.mps.bz2', M)
+    if cached:
+        mdl = gp.read(model_file)
+        FamilySizes(model_cache.families(model_file)).report(result)
+        variables = gurobi_variables(mdl)
+        z_vars, c_vars, Cmax = variables['z'], variables['c'], variables['Cmax']
+    else:
+        # create the model
+        mdl = gp.Model()
+
+        # variable z
+        z_vars = {}
+        for j1 in range(1, instance.n + 1):
+            for j2 in range(instance.n + 1):
+                if j1 != j2:
+                    z_vars[(j1, j2)] = mdl.addVar(vtype=GRB.BINARY, name=f'z_{j1}_{j2}')
+
+        # variable c
+        c_vars = {}
+        for j in range(instance.n + 1):
+            for i in range(instance.g):
+                c_vars[(j, i)] = mdl.addVar(vtype=GRB.CONTINUOUS, name=f'c_{j}_{i}', lb=0)
+
+        # variable Cmax
+        Cmax = mdl.addVar(vtype=GRB.CONTINUOUS, name='Cmax', lb=0)
+
+        # constraint families
+        sizes = FamilySizes()
+
+        # constraint (1)
+        for j1 in range(1, instance.n + 1):
+            mdl.addConstr(gp.quicksum(z_vars[(j1, j2)] for j2 in range(instance.n + 1) if j1 != j2) == 1, name=f'constr1_{j1}')
+        sizes.close_gurobi('constraint (1)', mdl)
+
+        # constraint (2)
+        for j2 in range(1, instance.n + 1):
+            mdl.addConstr(gp.quicksum(z_vars[(j1, j2)] for j1 in range(1, instance.n + 1) if j1 != j2) <= 1, name=f'constr2_{j2}')
+        sizes.close_gurobi('constraint (2)', mdl)
+
+        # constraint (3)
+        mdl.addConstr(gp.quicksum(z_vars[(j1, 0)] for j1 in range(1, instance.n + 1)) == 1, name='constr3')
+        sizes.close_gurobi('constraint (3)', mdl)
+
+        # constraint (4)
+        for j in range(1, instance.n + 1):
+            for i in range(1, instance.g):
+                mdl.addConstr(c_vars[(j, i)] >= c_vars[(j, i - 1)] + instance.p[j - 1][i], name=f'constr4_{j - 1}_{i}')
+        sizes.close_gurobi('constraint (4)', mdl)
+
+        # constraint (5)
+        for j1 in range(1, instance.n + 1):
+            for j2 in range(instance.n + 1):
+                if j1 != j2:
+                    for i in range(instance.g):
+                        if j2 == 0:
+                            mdl.addConstr(c_vars[(j1, i)] >= c_vars[(j2, i)] + instance.p[j1 - 1][i] - M * (1 - z_vars[(j1, j2)]), name=f'constr5_{i}_{j1}_{j2}')
+                        else:
+                            mdl.addConstr(c_vars[(j1, i)] >= c_vars[(j2, i)] + instance.p[j1 - 1][i] + instance.s[i][j2 - 1][j1 - 1] - M * (1 - z_vars[(j1, j2)]), name=f'constr5_{i}_{j1}_{j2}')
+        sizes.close_gurobi('constraint (5)', mdl, big_m=True)
+
+        # constraint (6)
+        for j in range(1, instance.n + 1):
+            mdl.addConstr(Cmax >= c_vars[(j, instance.g - 1)], name=f'constr6_{j}')
+        sizes.close_gurobi('constraint (6)', mdl)
+        sizes.report(result)
+
+        # set the objective
+        mdl.setObjective(Cmax, GRB.MINIMIZE)
+        if model_cache is not None:
+            model_cache.store(model_file, mdl.write, sizes.families)
+
+    # set the MIP start
+    if start is not None:
+        values = sdst_fsp_mip_start(instance, start)
+        for key, value in values['z'].items():
+            z_vars[key].Start = value
+        for key, value in values['c'].items():
+            c_vars[key].Start = value
+        Cmax.Start = values['Cmax']
 
     # solve the model
     mdl.setParam('Threads', threads)
     mdl.setParam('TimeLimit', time_limit)
-    mdl.optimize()
-
-    if mdl.status == GRB.OPTIMAL or mdl.status == GRB.SUBOPTIMAL:
-        Cmax_value = Cmax.X
-        print(f'Optimal objective value (Gurobi): {Cmax_value}')
+    mip_cutoff(mdl, lower_bound)
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    tic = time.perf_counter()
+    mdl.optimize(gurobi_progress_callback(result, lower_bound))
+    result.solve_time = time.perf_counter() - tic
+    gurobi_result(result, mdl, lower_bound)
+
+    if result.objective is not None:
+        result.schedule = sdst_fsp_schedule(instance, [[c_vars[(j + 1, i)].X for i in range(instance.g)] for j in range(instance.n)])
+        print(f'Optimal objective value (Gurobi): {result.objective}')
     else:
         print('No feasible solution found by Gurobi!')
 
+    return result
+
 
-def sdst_fsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', execfile='/Applications/CPLEX_Studio1210/cpoptimizer/bin/x86-64_osx/cpoptimizer'):
+def sdst_fsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', execfile='/Applications/CPLEX_Studio1210/cpoptimizer/bin/x86-64_osx/cpoptimizer', lower_bound=None):
     """
     The execfile parameter specifies the path to the CP Optimizer executable.
     This is required to run the solver, as it defines the core binary that handles the solving process.
@@ -218,8 +396,13 @@ def sdst_fsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', exec
       - On Windows: 'C:\\Program Files\\IBM\\ILOG\\CPLEX_Studio1210\\cpoptimizer\\bin\\x64_win64\\cpoptimizer.exe'
       - On Linux: '/opt/ibm/ILOG/CPLEX_Studio1210/cpoptimizer/bin/x86-64_linux/cpoptimizer'
     Ensure the provided path matches the location of the installed CP Optimizer executable on your system.
+    If lower_bound (a proven lower bound on the makespan, e.g. from bounds.py) is given, the search stops as soon as a
+    solution reaches it, and that solution is reported as optimal.
     """
+    result = Result('CP Optimizer')
+    tic = time.perf_counter()
     instance = parser(file_path)
+    result.parse_time = time.perf_counter() - tic
 
     # create the model
     mdl = CpoModel()
@@ -229,7 +412,7 @@ def sdst_fsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', exec
     for j in range(instance.n):
         tasks.append([])
         for i in range(instance.g):
-            tasks[j].append(mdl.interval_var(name=f'task_{j}_{i}', size=instance.p[j][i]))
+            tasks[j].append(mdl.interval_var(name=f'task_{j}_{i}', size=int(instance.p[j][i])))
 
     # constraint (2)
     for j in range(instance.n):
@@ -243,7 +426,7 @@ def sdst_fsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', exec
 
     # constraint (4)
     for i in range(instance.g):
-        mdl.add(mdl.no_overlap(sequence_variables[i], instance.s[i]))
+        mdl.add(mdl.no_overlap(sequence_variables[i], instance.s[i].tolist()))
 
     # constraint (5)
     for i in range(instance.g - 1):
@@ -253,13 +436,21 @@ def sdst_fsp_cp_model(file_path, threads=1, time_limit=3600, agent='local', exec
     mdl.add(mdl.minimize(mdl.max([mdl.end_of(tasks[j][instance.g - 1]) for j in range(instance.n)])))
 
     # solve the model
-    result = mdl.solve(TimeLimit=time_limit, Workers=threads, LogVerbosity='Quiet', agent=agent, execfile=execfile)
-
-    if result:
-        print(f'Optimal objective value (CP Optimizer): {result.get_objective_value()}')
+    result.build_time = time.perf_counter() - tic - result.parse_time
+    mdl.add_solver_callback(CpProgressCallback(result, lower_bound))
+    tic = time.perf_counter()
+    solution = mdl.solve(TimeLimit=time_limit, Workers=threads, LogVerbosity='Quiet', agent=agent, execfile=execfile)
+    result.solve_time = time.perf_counter() - tic
+    cp_result(result, solution, lower_bound)
+
+    if result.objective is not None:
+        result.schedule = sdst_fsp_schedule(instance, [[solution.get_var_solution(tasks[j][i]).get_end() for i in range(instance.g)] for j in range(instance.n)])
+        print(f'Optimal objective value (CP Optimizer): {result.objective}')
     else:
         print('No feasible solution found by CP Optimizer!')
 
+    return result
+
 
 if __name__ == '__main__':
     path = 'test cases/0.txt'
@@ -0,0 +1,186 @@
+"""
+Analytic sizes of the MIP models: the rows, nonzeros and big-M rows of every constraint family, predicted from the
+dimensions of a parsed instance without building the model. The CPLEX, Gurobi and matrix builders of a problem build
+the same model with the same families, so there is one prediction per problem (the builders of the hybrid and
+distributed flow shops add constraints (4) and (5) interleaved, as one family). Every MIP model function measures the
+same breakdown, with the Python build time of each family, before its solve starts (see FamilySizes in common.py). The
+prediction is meant to reject oversized models, or leave them to CP, before they take the memory (see --max-nonzeros of
+batch.py and portfolio.py). With --lazy, the sizes are those the lazy flow shop and job shop models start from, before
+the solver callbacks add disjunctive constraints.
+
+Example (the size of the flexible job shop MIP on every test case, and of each family on one of them):
+    python sizes.py fjsp
+    python sizes.py fjsp "flexible job shop scheduling/test cases/1.txt" -v
+    python sizes.py jsp --lazy
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from problems import LAZY_PROBLEMS, PROBLEMS, ROOT, instance_files, load_module, test_cases
+
+
+def flow_shop_families(n, g, lazy=False):
+    """
+    Return the families of the disjunctive model shared by the flow shop, the non-permutation flow shop and the job
+    shop: n jobs with one operation on each of g machines, and a sequencing variable per pair of jobs (and machine).
+    In lazy mode, the disjunctive constraints start from the n - 1 pairs of adjacent jobs in a heuristic sequence of
+    every machine.
+    """
+    pairs = max(n - 1, 0) if lazy else n * (n - 1) // 2
+    return [
+        ('constraint (1)', n, n, 0),
+        ('constraint (2)', n * (g - 1), 2 * n * (g - 1), 0),
+        ('constraint (3)', pairs * g, 3 * pairs * g, pairs * g),
+        ('constraint (4)', pairs * g, 3 * pairs * g, pairs * g),
+        ('constraint (5)', n, 2 * n, 0),
+    ]
+
+
+def fsp_model_size(instance, lazy=False):
+    return flow_shop_families(instance.n, instance.g, lazy)
+
+
+def nfsp_model_size(instance, lazy=False):
+    return flow_shop_families(instance.n, instance.g, lazy)
+
+
+def jsp_model_size(instance, lazy=False):
+    return flow_shop_families(instance.n, instance.g, lazy)
+
+
+def fjsp_model_size(instance):
+    """
+    The disjunctive constraints only cover the pairs of operations of different jobs that share an eligible machine,
+    one row per pair and shared machine: from the number of operations of every job eligible on every machine.
+    """
+    eligible = instance.pt > 0
+    counts = np.zeros((instance.n, instance.g), dtype=np.int64)
+    np.add.at(counts, instance.job, eligible)
+    shared = int(((counts.sum(axis=0) ** 2 - (counts ** 2).sum(axis=0)) // 2).sum())
+    operations, pairs = len(instance.pt), int(eligible.sum())
+    return [
+        ('constraint (1)', operations, pairs, 0),
+        ('constraint (2)', operations, 2 * operations - instance.n + pairs, 0),
+        ('constraint (3)', shared, 5 * shared, shared),
+        ('constraint (4)', shared, 5 * shared, shared),
+        ('constraint (5)', instance.n, 2 * instance.n, 0),
+    ]
+
+
+def hfsp_model_size(instance):
+    n, g, machines = instance.n, instance.g, int(np.sum(instance.m))
+    pairs = n * (n - 1) // 2
+    return [
+        ('constraint (1)', n, n, 0),
+        ('constraint (2)', n * (g - 1), 2 * n * (g - 1), 0),
+        ('constraint (3)', n * g, n * machines, 0),
+        ('constraints (4) and (5)', 2 * pairs * machines, 10 * pairs * machines, 2 * pairs * machines),
+        ('constraint (6)', n, 2 * n, 0),
+    ]
+
+
+def dfsp_model_size(instance):
+    n, g, f = instance.n, instance.g, instance.f
+    pairs = n * (n - 1) // 2
+    return [
+        ('constraint (1)', n, n, 0),
+        ('constraint (2)', n * (g - 1), 2 * n * (g - 1), 0),
+        ('constraint (3)', n, n * f, 0),
+        ('constraints (4) and (5)', 2 * pairs * g * f, 10 * pairs * g * f, 2 * pairs * g * f),
+        ('constraint (6)', n, 2 * n, 0),
+    ]
+
+
+def sdst_fsp_model_size(instance):
+    """
+    Job 0 is the dummy job that starts every sequence: every job has a predecessor among the n - 1 other jobs and job 0.
+    """
+    n, g = instance.n, instance.g
+    return [
+        ('constraint (1)', n, n * n, 0),
+        ('constraint (2)', n, n * (n - 1), 0),
+        ('constraint (3)', 1, n, 0),
+        ('constraint (4)', n * (g - 1), 2 * n * (g - 1), 0),
+        ('constraint (5)', n * n * g, 3 * n * n * g, n * n * g),
+        ('constraint (6)', n, 2 * n, 0),
+    ]
+
+
+def pmsp_model_size(instance):
+    n, g = instance.n, instance.g
+    return [
+        ('constraint (1)', n, n * g, 0),
+        ('constraint (2)', g, g * (n + 1), 0),
+    ]
+
+
+MODEL_SIZES = {
+    'fsp': fsp_model_size,
+    'nfsp': nfsp_model_size,
+    'jsp': jsp_model_size,
+    'fjsp': fjsp_model_size,
+    'hfsp': hfsp_model_size,
+    'dfsp': dfsp_model_size,
+    'sdst_fsp': sdst_fsp_model_size,
+    'pmsp': pmsp_model_size,
+}
+
+
+def model_size(problem, instance, lazy=False):
+    """
+    Return (family, rows, nonzeros, big-M rows) of every constraint family of the MIP model of a parsed instance, or
+    of the model that the lazy mode starts from (for the problems in LAZY_PROBLEMS).
+    """
+    if lazy:
+        return MODEL_SIZES[problem](instance, lazy=True)
+    return MODEL_SIZES[problem](instance)
+
+
+def file_model_size(problem, file_path, lazy=False):
+    """
+    Parse an instance file of a problem and return the families of its MIP model.
+    """
+    return model_size(problem, load_module(problem).parser(file_path), lazy)
+
+
+def total(families):
+    """
+    Return the rows, nonzeros and big-M rows of a whole model.
+    """
+    return tuple(sum(family[k] for family in families) for k in (1, 2, 3))
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('problem', choices=PROBLEMS, help='the problem type')
+    arg_parser.add_argument('instances', nargs='*', help='instance folders, glob patterns or files (default: the test cases of the problem)')
+    arg_parser.add_argument('-v', '--families', action='store_true', help='print every constraint family, not only the totals')
+    arg_parser.add_argument('--max-nonzeros', type=float, help='only print the instances whose model has more nonzeros')
+    arg_parser.add_argument('--lazy', action='store_true', help=f"the sizes of the lazy models before the solve ({', '.join(LAZY_PROBLEMS)})")
+    args = arg_parser.parse_args(argv)
+    if args.lazy and args.problem not in LAZY_PROBLEMS:
+        arg_parser.error(f"--lazy only applies to {', '.join(LAZY_PROBLEMS)}")
+
+    files = instance_files(args.instances or [test_cases(args.problem)])
+    if not files:
+        arg_parser.error('no instance files found')
+    print('instance\trows\tnonzeros\tbig-M rows')
+    oversized = 0
+    for file in files:
+        families = file_model_size(args.problem, file, args.lazy)
+        rows, nonzeros, big_m = total(families)
+        if args.max_nonzeros is not None and nonzeros <= args.max_nonzeros:
+            continue
+        oversized += 1
+        print(f'{os.path.relpath(os.path.abspath(file), ROOT)}\t{rows}\t{nonzeros}\t{big_m}')
+        if args.families:
+            for family, rows, nonzeros, big_m in families:
+                print(f'  {family}\t{rows}\t{nonzeros}\t{big_m}')
+    print(f'{oversized} of {len(files)} instances' if args.max_nonzeros is not None else f'{len(files)} instances', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Shared fixtures of the tests. The model scripts import CPLEX, Gurobi and docplex at the top, so every test needs the
+three of them (and NumPy); the models are solved on generated instances small enough for the community editions of
+the solvers. NumPy is only imported inside the fixtures, so that a missing install skips the tests instead of breaking
+their collection.
+"""
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def solvers():
+    for module in ('numpy', 'cplex', 'gurobipy', 'docplex'):
+        pytest.importorskip(module)
+
+
+@pytest.fixture
+def cpoptimizer():
+    """
+    The path of the CP Optimizer executable, for the execfile argument of the CP models.
+    """
+    path = shutil.which('cpoptimizer')
+    if path is None:
+        pytest.skip('cpoptimizer is not on the PATH')
+    return path
+
+
+@pytest.fixture
+def instance_file(tmp_path):
+    """
+    Return a function that writes a generated instance of a problem with n jobs and g machines (stages) and returns
+    its path.
+    """
+    pytest.importorskip('numpy')
+    from benchmark import generate
+
+    def write(problem, n=4, g=3, seed=0):
+        path = tmp_path / f'{problem}_n{n}_g{g}_s{seed}.txt'
+        path.write_text(generate(problem, n, g, seed))
+        return str(path)
+    return write
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+pytest.importorskip('numpy')  # the tested modules import it at the top
+
+import batch  # noqa: E402
+from benchmark import generate  # noqa: E402
+
+
+def read_records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_sweep_resumes_and_skips_large_models(tmp_path):
+    instances = tmp_path / 'instances'
+    instances.mkdir()
+    for seed in range(2):
+        (instances / f'{seed}.txt').write_text(generate('fsp', 4, 3, seed))
+    output = str(tmp_path / 'fsp.jsonl')
+    argv = ['fsp', str(instances), '-f', 'mip_cplex_model', 'mip_gurobi_model', '-w', '2', '-l', '30', '-o', output, '--stop-at-bound', '--schedules']
+    batch.main(argv)
+    records = read_records(output)
+    assert len(records) == 4
+    for seed in range(2):
+        runs = [record for record in records if record['instance'].endswith(f'{seed}.txt')]
+        assert {record['status'] for record in runs} == {'optimal'}
+        assert len({round(record['objective']) for record in runs}) == 1
+        for record in runs:
+            assert record['lower_bound'] <= record['objective'] + 1e-6
+            assert max(task[4] for task in record['schedule']) == round(record['objective'])
+
+    # the finished runs are skipped, and the models over --max-nonzeros are not built
+    batch.main(argv)
+    assert len(read_records(output)) == 4
+    batch.main(argv + ['--max-nonzeros', '1', '--lazy'])
+    lazy = read_records(output)[4:]
+    assert [record['status'] for record in lazy] == ['too_large'] * 4
@@ -0,0 +1,64 @@
+import csv
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import benchmark  # noqa: E402
+from benchmark import generate, rows_text  # noqa: E402
+from problems import PROBLEMS, load_module  # noqa: E402
+
+
+def instance_text(problem, instance):
+    """
+    Write a parsed instance back in the format of the instance files.
+    """
+    header = f'{instance.n}\n{instance.g}\n'
+    if problem == 'dfsp':
+        header += f'{instance.f}\n'
+    if problem == 'hfsp':
+        header += rows_text([instance.m])
+    if problem == 'fjsp':
+        return header + rows_text([instance.o]) + rows_text(instance.pt)
+    if problem == 'jsp':
+        return header + rows_text(instance.p) + rows_text(instance.r)
+    if problem == 'sdst_fsp':
+        return header + rows_text(instance.p) + ''.join(rows_text(block) for block in instance.s)
+    return header + rows_text(instance.p)
+
+
+@pytest.mark.parametrize('problem', PROBLEMS)
+@pytest.mark.parametrize('n, g', [(1, 1), (4, 3), (7, 5)])
+def test_generated_instances_round_trip_through_the_parsers(problem, n, g, tmp_path):
+    text = generate(problem, n, g, seed=2)
+    assert generate(problem, n, g, seed=2) == text
+    file_path = tmp_path / f'{problem}.txt'
+    file_path.write_text(text)
+    instance = load_module(problem).parser(str(file_path), cache=False)
+    assert (instance.n, instance.g) == (n, g)
+    assert instance_text(problem, instance) == text
+    if problem == 'fjsp':
+        assert ((instance.pt > 0).sum(axis=1) >= 1).all()  # every operation has a machine
+    if problem == 'jsp':
+        assert (np.sort(instance.r, axis=1) == np.arange(1, g + 1)).all()  # every route visits each machine once
+
+
+def write_table(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, benchmark.COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(dict({'problem': 'fsp', 'formulation': 'mip_cplex_model', 'g': 5, 'status': 'optimal',
+                                  'variables': 10, 'constraints': 20, 'nonzeros': 50, 'build_time': 0.1}, **row))
+
+
+def test_compare_flags_size_and_build_time_changes(tmp_path, capsys):
+    old, new = str(tmp_path / 'old.csv'), str(tmp_path / 'new.csv')
+    write_table(old, [{'n': 10}, {'n': 20}, {'n': 50}, {'n': 100}])
+    write_table(new, [{'n': 10}, {'n': 20, 'nonzeros': 60}, {'n': 50, 'build_time': 0.2}, {'n': 200}])
+    assert benchmark.compare(old, new, 1.5) == 2
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == ['fsp mip_cplex_model 20 5: nonzeros 50 -> 60', 'fsp mip_cplex_model 50 5: build_time 0.1 -> 0.2',
+                     f'fsp mip_cplex_model 100 5: missing from {new}']
+    assert benchmark.compare(old, old, 1.5) == 0
+    assert benchmark.compare(new, new, 1.5) == 0
@@ -0,0 +1,27 @@
+import pytest
+
+pytest.importorskip('numpy')  # the tested modules import it at the top
+
+from bounds import lower_bound  # noqa: E402
+from problems import PROBLEMS, load_module, model_function  # noqa: E402
+from test_parsers import case_files  # noqa: E402
+from test_starts import heuristic_start  # noqa: E402
+
+
+@pytest.mark.parametrize('problem', PROBLEMS)
+def test_bound_below_the_heuristic_on_the_test_cases(problem):
+    module = load_module(problem)
+    for file_path in case_files(problem, 2):
+        instance = module.parser(file_path)
+        Cmax = getattr(module, f'{problem}_mip_start')(instance, heuristic_start(problem, instance))['Cmax']
+        assert 0 < lower_bound(problem, instance) <= Cmax
+
+
+@pytest.mark.parametrize('problem', PROBLEMS)
+def test_bound_below_the_optimum(problem, instance_file):
+    module = load_module(problem)
+    for seed in range(3):
+        path = instance_file(problem, 5, 3, seed)
+        result = model_function(problem, 'mip_gurobi_model')(path, time_limit=30)
+        assert result.status == 'optimal'
+        assert lower_bound(problem, module.parser(path)) <= result.objective + 1e-6
@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+from model_cache import ModelCache
+from problems import PROBLEMS, model_function
+
+
+def saved_model(problem, path, directory, **kwargs):
+    """
+    Build a CPLEX model of an instance through the model cache and read back the .sav file it stores.
+    """
+    import cplex
+    model_function(problem, 'mip_cplex_model')(path, time_limit=30, model_cache=ModelCache(directory), **kwargs)
+    (name,) = [name for name in os.listdir(directory) if name.endswith('.sav')]
+    mdl = cplex.Cplex(os.path.join(directory, name))
+    mdl.set_results_stream(None)
+    return mdl
+
+
+@pytest.mark.parametrize('problem', PROBLEMS)
+def test_cplex_names_do_not_change_the_model(problem, tmp_path, instance_file):
+    path = instance_file(problem, n=6, g=4)
+    plain = saved_model(problem, path, str(tmp_path / 'plain'), names=False)
+    named = saved_model(problem, path, str(tmp_path / 'named'), names=True)
+    assert plain.variables.get_num() == named.variables.get_num()
+    assert plain.linear_constraints.get_num() == named.linear_constraints.get_num()
+    assert [(row.ind, row.val) for row in plain.linear_constraints.get_rows()] == [(row.ind, row.val) for row in named.linear_constraints.get_rows()]
+    for attribute in ('get_rhs', 'get_senses'):
+        assert getattr(plain.linear_constraints, attribute)() == getattr(named.linear_constraints, attribute)()
+    for attribute in ('get_lower_bounds', 'get_upper_bounds', 'get_types'):
+        assert getattr(plain.variables, attribute)() == getattr(named.variables, attribute)()
+    assert plain.objective.get_linear() == named.objective.get_linear()
+    assert named.variables.get_names()[-1] == 'Cmax'
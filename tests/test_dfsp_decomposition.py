@@ -0,0 +1,15 @@
+import pytest
+
+from problems import load_module, model_function
+from test_models import assert_feasible
+
+
+@pytest.mark.parametrize('formulation', ['mip_cplex_model', 'mip_gurobi_model'])
+def test_decomposition_lies_between_the_bound_and_neh(formulation, instance_file, cpoptimizer):
+    module = load_module('dfsp')
+    path = instance_file('dfsp', 10, 3, 1)
+    bound = model_function('dfsp', 'cp_model')(path, time_limit=30, execfile=cpoptimizer).bound
+    result = module.dfsp_decomposition(path, formulation, time_limit=60, subproblem_time_limit=10, workers=2)
+    assert bound - 1e-6 <= result.objective <= module.dfsp_neh(module.parser(path))[1]
+    assert_feasible(result.schedule, result.objective)
+    assert sorted({task[0] for task in result.schedule}) == list(range(10))
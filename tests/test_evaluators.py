@@ -0,0 +1,61 @@
+import itertools
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from problems import load_module  # noqa: E402
+
+
+def reference_makespan(p, sequence):
+    """
+    The flow shop recurrence c[k][i] = max(c[k - 1][i], c[k][i - 1]) + p[k][i], one operation at a time.
+    """
+    c = [0] * len(p[0])
+    for j in sequence:
+        for i in range(len(p[0])):
+            c[i] = max(c[i], c[i - 1] if i > 0 else 0) + int(p[j][i])
+    return c[-1]
+
+
+def test_flow_shop_scripts_share_the_evaluators():
+    import common
+    for name in ('fsp_makespan', 'fsp_completion_times'):
+        assert getattr(load_module('fsp'), name) is getattr(common, name)
+        assert getattr(load_module('dfsp'), name) is getattr(common, name)
+    assert load_module('dfsp').fsp_insertion_makespans is common.fsp_insertion_makespans
+    assert load_module('nfsp').fsp_neh is load_module('fsp').fsp_neh is common.fsp_neh
+
+
+def test_fsp_makespan_matches_the_recurrence():
+    module = load_module('fsp')
+    rng = np.random.default_rng(1)
+    p = rng.integers(1, 100, size=(9, 5))
+    sequences = np.array([rng.permutation(9) for _ in range(50)])
+    makespans = module.fsp_makespan(p, sequences)
+    assert makespans.tolist() == [reference_makespan(p, sequence) for sequence in sequences]
+    assert module.fsp_makespan(p, sequences[0]).tolist() == [reference_makespan(p, sequences[0])]
+
+
+def test_fsp_completion_times_match_the_makespan():
+    module = load_module('fsp')
+    rng = np.random.default_rng(2)
+    p = rng.integers(1, 100, size=(6, 4))
+    for sequence in itertools.islice(itertools.permutations(range(6)), 0, 720, 37):
+        c = module.fsp_completion_times(p, sequence)
+        assert c[-1][-1] == reference_makespan(p, sequence)
+        assert (c[1:] >= c[:-1] + p[list(sequence[1:])]).all()
+
+
+def test_fsp_completion_times_respect_the_release_times():
+    module = load_module('fsp')
+    rng = np.random.default_rng(3)
+    p = rng.integers(1, 100, size=(6, 4))
+    release = [50, 0, 300, 10]
+    sequence = list(rng.permutation(6))
+    c = module.fsp_completion_times(p, sequence, release)
+    ready = list(release)
+    for k, j in enumerate(sequence):
+        for i in range(4):
+            ready[i] = max(ready[i], c[k][i - 1] if i > 0 else 0) + int(p[j][i])
+            assert c[k][i] == ready[i]
@@ -0,0 +1,79 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from benchmark import rows_text  # noqa: E402
+from problems import load_module, model_function  # noqa: E402
+
+
+def brute_force_conflicts(instance):
+    """
+    Every pair of operations of different jobs, scanned machine by machine, with the machines both can use.
+    """
+    operations = [(j, k) for j in range(instance.n) for k in range(instance.o[j])]
+    pairs = {}
+    for j1, k1 in operations:
+        for j2, k2 in operations:
+            if j1 < j2:
+                shared = [i for i in range(instance.g) if instance.p[j1][k1][i] > 0 and instance.p[j2][k2][i] > 0]
+                if shared:
+                    pairs[(j1, k1, j2, k2)] = shared
+    return pairs
+
+
+def sparse_instance(path, n, g, seed):
+    """
+    Write a flexible job shop whose operations can use one or two of the machines.
+    """
+    rng = np.random.default_rng(seed)
+    o = rng.integers(2, 4, size=n)
+    pt = np.zeros((int(o.sum()), g), dtype=int)
+    for row in pt:
+        row[rng.choice(g, size=rng.integers(1, 3), replace=False)] = rng.integers(1, 100)
+    path.write_text(f'{n}\n{g}\n' + rows_text([o]) + rows_text(pt))
+    return str(path)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_conflicts_are_the_pairs_that_share_a_machine(seed, instance_file):
+    module = load_module('fjsp')
+    instance = module.parser(instance_file('fjsp', n=6, g=5, seed=seed))
+    conflicts = module.fjsp_conflicts(instance)
+    assert conflicts == brute_force_conflicts(instance)
+    assert list(conflicts) == sorted(conflicts, key=lambda pair: (pair[0], pair[2], pair[1], pair[3]))
+
+
+@pytest.mark.parametrize('formulation', ['mip_cplex_model', 'mip_gurobi_model'])
+def test_mip_models_only_sequence_the_conflicts(formulation, tmp_path):
+    module = load_module('fjsp')
+    path = sparse_instance(tmp_path / 'sparse.txt', 6, 8, 0)
+    instance = module.parser(path)
+    conflicts = module.fjsp_conflicts(instance)
+    operations = int(sum(instance.o))
+    all_pairs = (operations * operations - sum(int(o) ** 2 for o in instance.o)) // 2
+    assert len(conflicts) < all_pairs / 2
+    result = model_function('fjsp', formulation)(path, time_limit=30)
+    z, x = int((instance.pt > 0).sum()), len(conflicts)
+    assert result.variables == z + x + operations + 1
+    rows = dict((family[0], family[1]) for family in result.families)
+    assert rows['constraint (3)'] == rows['constraint (4)'] == sum(len(shared) for shared in conflicts.values())
+
+
+def test_pruned_models_keep_the_optimum(tmp_path, cpoptimizer, monkeypatch):
+    from docplex.cp.expression import CpoIntervalVar
+    from docplex.cp.model import CpoModel
+    path = sparse_instance(tmp_path / 'sparse.txt', 6, 8, 1)
+    instance = load_module('fjsp').parser(path)
+    models = []
+    solve = CpoModel.solve
+    monkeypatch.setattr(CpoModel, 'solve', lambda mdl, **kwargs: models.append(mdl) or solve(mdl, **kwargs))
+    cp = model_function('fjsp', 'cp_model')(path, time_limit=30, execfile=cpoptimizer)
+    intervals = [var for var in models[0].get_all_variables() if isinstance(var, CpoIntervalVar)]
+    assert sum(var.is_optional() for var in intervals) == int((instance.pt > 0).sum())
+    assert len(intervals) == int((instance.pt > 0).sum() + instance.o.sum())
+    objectives = {cp.objective}
+    for formulation in ('mip_cplex_model', 'mip_gurobi_model'):
+        result = model_function('fjsp', formulation)(path, time_limit=30)
+        assert result.status == 'optimal'
+        objectives.add(result.objective)
+    assert len({round(objective) for objective in objectives}) == 1
@@ -0,0 +1,48 @@
+import types
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from problems import load_module  # noqa: E402
+from test_evaluators import reference_makespan  # noqa: E402
+
+
+def random_instance(n, g, seed, **fields):
+    p = np.random.default_rng(seed).integers(1, 100, size=(n, g))
+    return types.SimpleNamespace(n=n, g=g, p=p, **fields)
+
+
+def reference_neh(p):
+    """
+    NEH without Taillard's acceleration: every insertion position is evaluated from scratch.
+    """
+    order = sorted(range(len(p)), key=lambda j: -int(p[j].sum()))
+    sequence = [order[0]]
+    for job in order[1:]:
+        candidates = [sequence[:k] + [job] + sequence[k:] for k in range(len(sequence) + 1)]
+        sequence = min(candidates, key=lambda candidate: reference_makespan(p, candidate))
+    return sequence, reference_makespan(p, sequence)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_neh_matches_the_plain_insertions(seed):
+    instance = random_instance(12, 5, seed)
+    assert load_module('fsp').fsp_neh(instance) == reference_neh(instance.p)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_dfsp_neh_on_one_factory_is_neh(seed):
+    instance = random_instance(12, 5, seed, f=1)
+    sequence, Cmax = reference_neh(instance.p)
+    assert load_module('dfsp').dfsp_neh(instance) == ([sequence], Cmax)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_dfsp_neh_assigns_every_job_once(seed):
+    module = load_module('dfsp')
+    instance = random_instance(12, 4, seed, f=3)
+    factories, Cmax = module.dfsp_neh(instance)
+    assert len(factories) == 3
+    assert sorted(j for sequence in factories for j in sequence) == list(range(12))
+    assert Cmax == max(reference_makespan(instance.p, sequence) for sequence in factories if sequence)
@@ -0,0 +1,35 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from problems import load_module  # noqa: E402
+
+
+def reference_decode(p, m, permutation):
+    """
+    First-available-machine list scheduling, one stage at a time, scanning the machines of the stage for the one that
+    becomes idle first.
+    """
+    ready = [0] * len(p)
+    order = list(permutation)
+    for i in range(len(m)):
+        idle = [0] * m[i]
+        for j in order:
+            k = min(range(m[i]), key=lambda k: idle[k])
+            ready[j] = idle[k] = max(idle[k], ready[j]) + int(p[j][i])
+        order.sort(key=lambda j: ready[j])
+    return max(ready)
+
+
+def test_decoders_match_the_list_scheduling(instance_file):
+    module = load_module('hfsp')
+    instance = module.parser(instance_file('hfsp', 15, 4, 2))
+    rng = np.random.default_rng(0)
+    permutations = np.array([rng.permutation(instance.n) for _ in range(40)])
+    expected = [reference_decode(instance.p, instance.m.tolist(), permutation) for permutation in permutations]
+    assert module.hfsp_makespans(instance, permutations).tolist() == expected
+    for permutation, Cmax in zip(permutations, expected):
+        start, makespan = module.hfsp_decode(instance, permutation)
+        assert makespan == Cmax
+        assert [sorted(j for sequence in stage for j in sequence) for stage in start] == [list(range(instance.n))] * instance.g
+        assert module.hfsp_mip_start(instance, start)['Cmax'] <= Cmax
@@ -0,0 +1,25 @@
+import pytest
+
+from problems import formulations, load_module, model_function
+from test_models import assert_feasible
+
+
+@pytest.mark.parametrize('problem, n, g', [('fsp', 8, 4), ('nfsp', 6, 3), ('jsp', 6, 4)])
+def test_lazy_models_reach_the_optimum_of_the_full_ones(problem, n, g, instance_file):
+    path = instance_file(problem, n, g, 5)
+    for formulation in formulations(problem):
+        if formulation.startswith('mip_'):
+            function = model_function(problem, formulation)
+            full = function(path, time_limit=60)
+            lazy = function(path, time_limit=60, lazy=True)
+            assert full.status == lazy.status == 'optimal', formulation
+            assert lazy.objective == pytest.approx(full.objective), formulation
+            assert lazy.constraints < full.constraints, formulation
+            assert_feasible(lazy.schedule, lazy.objective)
+
+
+def test_disjunctive_scripts_share_the_lazy_helpers():
+    import common
+    for name in ('Disjunctions', 'CplexDisjunctionCallback', 'gurobi_disjunction_callback', 'disjunctive_keys'):
+        assert getattr(load_module('fsp'), name) is getattr(load_module('nfsp'), name) is getattr(load_module('jsp'), name) is getattr(common, name)
+    assert load_module('fsp').fsp_lazy_seed is load_module('nfsp').fsp_lazy_seed is common.fsp_lazy_seed
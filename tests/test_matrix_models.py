@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from model_cache import ModelCache  # noqa: E402
+from problems import model_function  # noqa: E402
+
+
+def built_model(formulation, problem, path, directory, **kwargs):
+    """
+    Build a Gurobi model of an instance through the model cache and read back the model file it stores.
+    """
+    import gurobipy as gp
+    model_function(problem, formulation)(path, time_limit=30, model_cache=ModelCache(directory), **kwargs)
+    (name,) = [name for name in os.listdir(directory) if name.startswith(f'{problem}_{formulation}-') and not name.endswith('.json')]
+    mdl = gp.read(os.path.join(directory, name))
+    mdl.update()
+    return mdl
+
+
+@pytest.mark.parametrize('problem, kwargs', [('fsp', {}), ('fsp', {'lazy': True}), ('fsp', {'release': [5, 0, 12, 3]}),
+                                             ('nfsp', {}), ('nfsp', {'release': [5, 0, 12, 3]}), ('jsp', {}),
+                                             ('hfsp', {}), ('dfsp', {})])
+def test_matrix_models_are_the_loop_models(problem, kwargs, tmp_path, instance_file):
+    path = instance_file(problem, n=6, g=4)
+    loop = built_model('mip_gurobi_model', problem, path, str(tmp_path / 'loop'), **kwargs)
+    matrix = built_model('mip_gurobi_matrix_model', problem, path, str(tmp_path / 'matrix'), **kwargs)
+    assert (loop.NumVars, loop.NumConstrs, loop.NumNZs) == (matrix.NumVars, matrix.NumConstrs, matrix.NumNZs)
+    assert (loop.getA() != matrix.getA()).nnz == 0
+    for attribute in ('RHS', 'Sense'):
+        assert loop.getAttr(attribute, loop.getConstrs()) == matrix.getAttr(attribute, matrix.getConstrs())
+    for attribute in ('LB', 'UB', 'Obj', 'VType'):
+        assert loop.getAttr(attribute, loop.getVars()) == matrix.getAttr(attribute, matrix.getVars())
+    assert np.isclose(loop.ObjCon, matrix.ObjCon) and loop.ModelSense == matrix.ModelSense
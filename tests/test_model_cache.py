@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+import model_cache
+from model_cache import ModelCache
+from problems import load_module, model_function
+
+
+def write_text(text):
+    def write(path):
+        with open(path, 'w') as f:
+            f.write(text)
+    return write
+
+
+def test_entries_are_keyed_by_instance_and_options(tmp_path, instance_file):
+    cache = ModelCache(str(tmp_path / 'cache'))
+    function = load_module('fsp').fsp_mip_cplex_model
+    path = instance_file('fsp')
+    entry, hit = cache.lookup(function, path, '.sav', 100, False)
+    assert not hit
+    cache.store(entry, write_text('model'), [('constraint (1)', 4, 4, 0, 0.5)])
+    assert cache.lookup(function, path, '.sav', 100, False) == (entry, True)
+    assert cache.families(entry) == [('constraint (1)', 4, 4, 0, 0.0)]
+    assert not cache.lookup(function, path, '.sav', 200, False)[1]
+    assert not cache.lookup(function, instance_file('fsp', seed=1), '.sav', 100, False)[1]
+
+
+def test_a_change_to_common_misses_the_cache(tmp_path, instance_file, monkeypatch):
+    function = load_module('fsp').fsp_mip_cplex_model
+    path = instance_file('fsp')
+    cache = ModelCache(str(tmp_path / 'cache'))
+    entry, hit = cache.lookup(function, path, '.sav', 100, False)
+    cache.store(entry, write_text('model'))
+    assert os.path.join(model_cache.ROOT, 'common.py') in model_cache.source_files(function)
+
+    # the same script with an edited common.py
+    file_digest = model_cache.file_digest
+
+    def edited_digest(source, digest):
+        file_digest(source, digest)
+        if os.path.basename(source) == 'common.py':
+            digest.update(b'# edited')
+    monkeypatch.setattr(model_cache, 'file_digest', edited_digest)
+    other, hit = ModelCache(str(tmp_path / 'cache')).lookup(function, path, '.sav', 100, False)
+    assert not hit and other != entry
+
+
+def test_eviction_and_invalidation_remove_the_families(tmp_path):
+    directory = tmp_path / 'cache'
+    cache = ModelCache(str(directory), max_bytes=300)
+    paths = [str(directory / f'fsp_mip_cplex_model-{k}.sav') for k in range(3)]
+    for k, path in enumerate(paths):
+        cache.store(path, write_text('x' * 100), [('constraint (1)', 1, 1, 0, 0.0)])
+        os.utime(path, (k, k))
+    # the oldest entry went when the third one arrived (each entry is 100 bytes and a families file of about 30)
+    assert [path for path, _, _ in cache.entries()] == paths[1:]
+    assert not os.path.exists(paths[0] + '.json')
+    assert cache.families(paths[0]) == []
+    assert cache.invalidate('fsp_mip_cplex_model') == 2
+    assert os.listdir(directory) == []
+
+
+@pytest.mark.parametrize('formulation', ['mip_cplex_model', 'mip_gurobi_model', 'mip_gurobi_matrix_model'])
+def test_cached_models_solve_like_built_ones(formulation, tmp_path, instance_file):
+    cache = ModelCache(str(tmp_path / 'cache'))
+    path = instance_file('hfsp')
+    function = model_function('hfsp', formulation)
+    built = function(path, time_limit=30, model_cache=cache)
+    read = function(path, time_limit=30, model_cache=cache)
+    assert len(cache.entries()) == 1
+    assert [family[:4] for family in read.families] == [family[:4] for family in built.families]
+    assert read.objective == pytest.approx(built.objective)
+    assert read.schedule == built.schedule
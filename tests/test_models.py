@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from problems import PROBLEMS, formulations, model_function
+
+
+def assert_feasible(schedule, objective):
+    """
+    The operations of a job follow each other, a machine processes one operation at a time, and the last one ends at
+    the objective.
+    """
+    for key in (0, 2):
+        groups = {}
+        for task in schedule:
+            groups.setdefault(task[key], []).append(task)
+        for tasks in groups.values():
+            tasks.sort(key=lambda task: (task[3], task[4]))
+            assert all(a[4] <= b[3] + 1e-6 for a, b in zip(tasks, tasks[1:]))
+    assert max(task[4] for task in schedule) == pytest.approx(objective)
+
+
+@pytest.mark.parametrize('problem', PROBLEMS)
+def test_formulations_agree(problem, instance_file, cpoptimizer):
+    path = instance_file(problem)
+    objectives = {}
+    for formulation in formulations(problem):
+        kwargs = {'execfile': cpoptimizer} if formulation.startswith('cp_') else {}
+        result = model_function(problem, formulation)(path, time_limit=30, **kwargs)
+        assert result.status == 'optimal', formulation
+        assert result.bound == pytest.approx(result.objective, abs=1e-6)
+        assert result.variables and result.constraints
+        if formulation.startswith('mip_'):
+            assert result.nonzeros and result.families
+        assert_feasible(result.schedule, result.objective)
+        json.dumps(result.to_dict())
+        objectives[formulation] = round(result.objective)
+    assert len(set(objectives.values())) == 1, objectives
+
+
+@pytest.mark.parametrize('problem', PROBLEMS)
+def test_cp_models_get_plain_numbers(problem, instance_file, cpoptimizer, monkeypatch):
+    from docplex.cp.expression import CpoIntervalVar
+    from docplex.cp.model import CpoModel
+    models = []
+    solve = CpoModel.solve
+    monkeypatch.setattr(CpoModel, 'solve', lambda mdl, **kwargs: models.append(mdl) or solve(mdl, **kwargs))
+    path = instance_file(problem)
+    for formulation in formulations(problem):
+        if formulation.startswith('cp_'):
+            model_function(problem, formulation)(path, time_limit=30, execfile=cpoptimizer)
+    assert models
+    for mdl in models:
+        for var in mdl.get_all_variables():
+            if isinstance(var, CpoIntervalVar):
+                assert all(type(size) is int for size in var.get_size()), var
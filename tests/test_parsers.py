@@ -0,0 +1,94 @@
+import glob
+import os
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import problems  # noqa: E402
+from benchmark import generate  # noqa: E402
+from problems import PROBLEMS, load_module  # noqa: E402
+
+
+# instance sizes (jobs, machines) whose files are large enough to be cached
+CACHED_SIZES = {'fjsp': (60, 60), 'sdst_fsp': (120, 8)}
+
+
+def baseline(problem, file_path):
+    """
+    Read an instance file line by line as the original parsers did, into {field: nested lists}.
+    """
+    with open(file_path) as f:
+        line = lambda: [int(x) for x in f.readline().split()]  # noqa: E731
+        fields = {'n': line()[0], 'g': line()[0]}
+        n, g = fields['n'], fields['g']
+        if problem == 'dfsp':
+            fields['f'] = line()[0]
+        if problem == 'hfsp':
+            fields['m'] = line()
+        if problem == 'fjsp':
+            fields['o'] = line()
+            fields['p'] = [[line() for _ in range(fields['o'][j])] for j in range(n)]
+            return fields
+        fields['p'] = [line() for _ in range(n)]
+        if problem == 'jsp':
+            fields['r'] = [line() for _ in range(n)]
+        if problem == 'sdst_fsp':
+            fields['s'] = [[line() for _ in range(n)] for _ in range(g)]
+    return fields
+
+
+def assert_matches(instance, fields):
+    for field, expected in fields.items():
+        value = getattr(instance, field)
+        value = [np.asarray(row).tolist() for row in value] if isinstance(value, list) else np.asarray(value).tolist()
+        assert value == expected, field
+
+
+def case_files(problem, count=3):
+    files = glob.glob(os.path.join(problems.test_cases(problem), '**', '*.txt'), recursive=True)
+    return sorted(files, key=problems.natural_key)[:count]
+
+
+@pytest.mark.parametrize('problem', PROBLEMS)
+def test_parser_matches_the_baseline_on_the_test_cases(problem):
+    module = load_module(problem)
+    for file_path in case_files(problem):
+        assert_matches(module.parser(file_path, cache=False), baseline(problem, file_path))
+
+
+@pytest.mark.parametrize('problem', PROBLEMS)
+def test_parser_matches_the_baseline_through_the_cache(problem, tmp_path):
+    module = load_module(problem)
+    file_path = tmp_path / f'{problem}.txt'
+    n, g = CACHED_SIZES.get(problem, (400, 60))
+    file_path.write_text(generate(problem, n, g, 3))
+    assert os.path.getsize(file_path) >= module.CACHE_MIN_SIZE
+    fields = baseline(problem, str(file_path))
+    assert_matches(module.parser(str(file_path)), fields)
+    assert os.path.exists(tmp_path / '__pycache__' / f'{problem}.txt.npz')
+    assert_matches(module.parser(str(file_path)), fields)
+
+    # an edited file is parsed again
+    file_path.write_text(generate(problem, n, g, 4))
+    stat = os.stat(file_path)
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))  # coarse clocks may not tell the writes apart
+    assert_matches(module.parser(str(file_path)), baseline(problem, str(file_path)))
+
+
+@pytest.mark.parametrize('problem', PROBLEMS)
+def test_parser_rejects_a_truncated_file(problem, tmp_path):
+    file_path = tmp_path / f'{problem}.txt'
+    text = generate(problem, 5, 3, 0)
+    file_path.write_text(text[:len(text.rstrip().rstrip('0123456789'))])
+    with pytest.raises(ValueError, match='expected .* integers after the header'):
+        load_module(problem).parser(str(file_path), cache=False)
+
+
+@pytest.mark.parametrize('problem', PROBLEMS)
+def test_parser_rejects_a_malformed_value(problem, tmp_path):
+    file_path = tmp_path / f'{problem}.txt'
+    text = generate(problem, 5, 3, 0)
+    file_path.write_text(text[:len(text.rstrip().rstrip('0123456789'))] + '1x\n')
+    with pytest.raises(ValueError, match=str(file_path)):
+        load_module(problem).parser(str(file_path), cache=False)
@@ -0,0 +1,41 @@
+import types
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from bounds import lower_bound  # noqa: E402
+from problems import load_module, model_function  # noqa: E402
+
+
+def makespan(p, machine):
+    loads = np.zeros(p.shape[1], dtype=np.int64)
+    np.add.at(loads, machine, p[np.arange(len(p)), machine])
+    return int(loads.max())
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_local_search_improves_on_its_start(seed):
+    module = load_module('pmsp')
+    rng = np.random.default_rng(seed)
+    n, g = 200, 7
+    instance = types.SimpleNamespace(n=n, g=g, p=rng.integers(1, 100, size=(n, g)))
+    greedy, greedy_Cmax = module.pmsp_greedy(instance)
+    assert greedy_Cmax == makespan(instance.p, greedy)
+    machine, Cmax = module.pmsp_local_search(instance)
+    assert Cmax == makespan(instance.p, machine) <= greedy_Cmax
+    assert lower_bound('pmsp', instance) <= Cmax
+
+    # every job on one machine: the descent moves most of them
+    start = [seed % g] * n
+    machine, Cmax = module.pmsp_local_search(instance, start=start)
+    assert Cmax == makespan(instance.p, machine) < makespan(instance.p, start)
+    assert module.pmsp_local_search(instance, start=start, iterations=3)[1] >= Cmax
+
+
+def test_local_search_against_the_optimum(instance_file):
+    module = load_module('pmsp')
+    for seed in range(3):
+        path = instance_file('pmsp', 10, 3, seed)
+        optimum = model_function('pmsp', 'mip_gurobi_model')(path, time_limit=30).objective
+        assert module.pmsp_local_search(module.parser(path))[1] >= optimum - 1e-6
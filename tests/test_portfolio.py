@@ -0,0 +1,109 @@
+import multiprocessing
+
+import pytest
+
+pytest.importorskip('numpy')  # the tested modules import it at the top
+
+from portfolio import SharedBound, default_formulations, race, split_cores  # noqa: E402
+from problems import model_function  # noqa: E402
+
+
+def test_split_cores():
+    assert split_cores(6, 3) == [2, 2, 2]
+    assert split_cores(7, 3) == [3, 2, 2]
+    assert split_cores(2, 3) == [1, 1, 1]
+
+
+def test_shared_bound_keeps_the_best_values():
+    bound = SharedBound(10, multiprocessing.get_context('spawn'))
+    bound.report(None, 12.2)
+    bound.report(30, 11)
+    bound.report(25, None)
+    bound.report(40, None)
+    assert bound.value == 13
+    assert bound.objective.value == 25
+
+
+def test_race_returns_the_optimum(instance_file, cpoptimizer):
+    path = instance_file('jsp', 5, 3, 2)
+    optimum = model_function('jsp', 'mip_gurobi_model')(path, time_limit=30).objective
+    best, records = race('jsp', path, cores=3, time_limit=30, execfile=cpoptimizer)
+    assert set(records) <= set(default_formulations('jsp'))
+    assert best['status'] == 'optimal'
+    assert best['objective'] == pytest.approx(optimum)
+    assert max(task[4] for task in best['schedule']) == pytest.approx(optimum)
+
+    # without room for the MIP models, CP Optimizer races alone
+    best, records = race('jsp', path, cores=1, time_limit=30, execfile=cpoptimizer, max_nonzeros=1)
+    assert list(records) == ['cp_model']
+    assert best['objective'] == pytest.approx(optimum)
+
+
+class FakeCpSolver:
+    aborted = False
+
+    def abort_search(self):
+        self.aborted = True
+
+
+class FakeCpResult:
+    def __init__(self, objective, bound):
+        self.objective, self.bound = objective, bound
+
+    def get_objective_value(self):
+        return self.objective
+
+    def get_objective_bound(self):
+        return self.bound
+
+
+class FakeGurobiModel:
+    terminated = False
+
+    def __init__(self, values):
+        self.values = values
+
+    def cbGet(self, what):
+        return self.values[what]
+
+    def terminate(self):
+        self.terminated = True
+
+
+def test_racers_stop_when_another_racer_proves_the_bound_of_the_best_incumbent():
+    from gurobipy import GRB
+    from common import CpProgressCallback, Result, cp_result, gurobi_progress_callback
+    shared_bound = SharedBound(90, multiprocessing.get_context('spawn'))
+    cp, cp_solver = CpProgressCallback(Result('cp'), shared_bound), FakeCpSolver()
+    cp.invoke(cp_solver, 'Solution', FakeCpResult(100, 90))  # CP Optimizer finds the optimum
+    cp.invoke(cp_solver, 'Periodic', None)
+    assert not cp_solver.aborted and shared_bound.incumbent == 100
+
+    # Gurobi proves the bound with a worse incumbent, stops, and CP Optimizer stops on its next periodic event
+    gurobi = FakeGurobiModel({GRB.Callback.MIP_OBJBST: 105, GRB.Callback.MIP_OBJBND: 99.6, GRB.Callback.RUNTIME: 1.0})
+    gurobi_progress_callback(Result('gurobi'), shared_bound)(gurobi, GRB.Callback.MIP)
+    assert gurobi.terminated and shared_bound.value == 100
+    cp.invoke(cp_solver, 'Periodic', None)
+    assert cp_solver.aborted
+
+    solution = type('Solution', (), {'__bool__': lambda self: True, 'get_solve_status': lambda self: 'Feasible',
+                                     'get_objective_value': lambda self: 100, 'get_objective_gap': lambda self: 0.1,
+                                     'get_objective_bound': lambda self: 90, 'get_solver_infos': lambda self: {}})()
+    cp_result(cp.result, solution, shared_bound)
+    assert (cp.result.status, cp.result.bound) == ('optimal', 100)
+
+
+@pytest.mark.parametrize('formulation', ['mip_cplex_model', 'mip_gurobi_model'])
+def test_mip_models_start_from_the_best_incumbent_as_cutoff(formulation, instance_file):
+    path = instance_file('jsp', 5, 3, 2)
+    optimum = model_function('jsp', formulation)(path, time_limit=30).objective
+    shared_bound = SharedBound(0, multiprocessing.get_context('spawn'))
+    shared_bound.report(optimum, None)
+    result = model_function('jsp', formulation)(path, time_limit=30, lower_bound=shared_bound)
+    assert (result.status, result.objective) == ('no_solution', None)  # no schedule is better than the incumbent
+    assert shared_bound.value == optimum
+
+    shared_bound = SharedBound(0, multiprocessing.get_context('spawn'))
+    shared_bound.report(optimum + 20, None)
+    result = model_function('jsp', formulation)(path, time_limit=30, lower_bound=shared_bound)
+    assert (result.status, result.objective) == ('optimal', optimum)
@@ -0,0 +1,22 @@
+import pytest
+
+pytest.importorskip('numpy')  # the tested modules import it at the top
+
+import rolling_horizon  # noqa: E402
+from test_models import assert_feasible  # noqa: E402
+
+
+@pytest.mark.parametrize('problem, formulation', [('fsp', 'mip_gurobi_model'), ('fsp', 'cp_model'), ('nfsp', 'mip_cplex_model')])
+def test_rolling_horizon_is_never_worse_than_neh(problem, formulation, instance_file, cpoptimizer):
+    for seed in range(2):
+        path = instance_file(problem, 24, 4, seed)
+        record = rolling_horizon.solve(problem, path, formulation, window=6, overlap=2, time_limit=5, execfile=cpoptimizer)
+        assert record['lower_bound'] <= record['objective'] <= record['neh_objective']
+        assert record['sequences'] and all(sorted(sequence) == list(range(24)) for sequence in record['sequences'])
+        assert_feasible(record['schedule'], record['objective'])
+        assert sum(len(window['jobs']) for window in record['windows']) >= 24
+
+
+def test_overlap_must_be_smaller_than_the_window(instance_file):
+    with pytest.raises(ValueError):
+        rolling_horizon.solve('fsp', instance_file('fsp'), window=5, overlap=5)
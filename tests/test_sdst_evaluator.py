@@ -0,0 +1,42 @@
+import itertools
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from problems import load_module, model_function  # noqa: E402
+
+
+def reference_makespan(p, s, sequence):
+    """
+    The recurrence c[k][i] = max(c[k - 1][i] + s[i][j'][j], c[k][i - 1]) + p[j][i], with j' the job before j.
+    """
+    c = [0] * len(p[0])
+    previous = None
+    for j in sequence:
+        for i in range(len(p[0])):
+            setup = 0 if previous is None else int(s[i][previous][j])
+            c[i] = max(c[i] + setup, c[i - 1] if i > 0 else 0) + int(p[j][i])
+        previous = j
+    return c[-1]
+
+
+def test_makespan_matches_the_recurrence(instance_file):
+    module = load_module('sdst_fsp')
+    instance = module.parser(instance_file('sdst_fsp', 9, 4, 1))
+    rng = np.random.default_rng(3)
+    sequences = np.array([rng.permutation(instance.n) for _ in range(50)])
+    expected = [reference_makespan(instance.p, instance.s, sequence) for sequence in sequences]
+    assert module.sdst_fsp_makespan(instance.p, instance.s, sequences).tolist() == expected
+    for sequence, Cmax in zip(sequences[:5], expected):
+        assert module.sdst_fsp_completion_times(instance.p, instance.s, sequence)[-1][-1] == Cmax
+
+
+@pytest.mark.parametrize('seed', range(2))
+def test_best_permutation_is_the_optimum_of_the_model(seed, instance_file):
+    module = load_module('sdst_fsp')
+    path = instance_file('sdst_fsp', 5, 3, seed)
+    instance = module.parser(path)
+    sequences = np.array(list(itertools.permutations(range(instance.n))))
+    best = int(module.sdst_fsp_makespan(instance.p, instance.s, sequences).min())
+    assert model_function('sdst_fsp', 'mip_gurobi_model')(path, time_limit=30).objective == pytest.approx(best)
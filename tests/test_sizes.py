@@ -0,0 +1,27 @@
+import pytest
+
+pytest.importorskip('numpy')  # the tested modules import it at the top
+
+from problems import LAZY_PROBLEMS, PROBLEMS, formulations, model_function  # noqa: E402
+from sizes import file_model_size, total  # noqa: E402
+
+
+@pytest.mark.parametrize('problem', PROBLEMS)
+def test_prediction_matches_the_built_models(problem, instance_file):
+    path = instance_file(problem, 5, 3)
+    families = file_model_size(problem, path)
+    for formulation in formulations(problem):
+        if formulation.startswith('mip_'):
+            result = model_function(problem, formulation)(path, time_limit=1)
+            assert [family[:4] for family in result.families] == [tuple(family) for family in families], formulation
+            assert total(families)[:2] == (result.constraints, result.nonzeros), formulation
+
+
+@pytest.mark.parametrize('problem', LAZY_PROBLEMS)
+def test_prediction_matches_the_lazy_models(problem, instance_file):
+    path = instance_file(problem, 5, 3)
+    families = file_model_size(problem, path, lazy=True)
+    for formulation in formulations(problem):
+        if formulation.startswith('mip_'):
+            result = model_function(problem, formulation)(path, time_limit=1, lazy=True)
+            assert [family[:4] for family in result.families] == [tuple(family) for family in families], formulation
@@ -0,0 +1,54 @@
+import pytest
+
+from problems import PROBLEMS, load_module, model_function
+
+
+def heuristic_start(problem, instance):
+    """
+    A feasible start of every problem, in the format of its MIP start helper.
+    """
+    module = load_module(problem)
+    if problem in ('fsp', 'nfsp'):
+        return module.fsp_neh(instance)[0]
+    if problem == 'jsp':
+        return module.jsp_dispatch(instance)
+    if problem == 'fjsp':
+        # every operation on its first eligible machine, the k-th operations of all jobs before the (k + 1)-th ones
+        sequences = [[] for _ in range(instance.g)]
+        for k in range(max(instance.o)):
+            for j in range(instance.n):
+                if k < instance.o[j]:
+                    sequences[next(i for i in range(instance.g) if instance.p[j][k][i] > 0)].append((j, k))
+        return sequences
+    if problem == 'hfsp':
+        return module.hfsp_decode(instance, range(instance.n))[0]
+    if problem == 'dfsp':
+        return module.dfsp_neh(instance)[0]
+    if problem == 'sdst_fsp':
+        return list(range(instance.n))
+    return module.pmsp_greedy(instance)[0]
+
+
+def plain(values):
+    return all(plain(value) for value in values.values()) if isinstance(values, dict) else type(values) in (int, float)
+
+
+@pytest.mark.parametrize('problem', PROBLEMS)
+def test_mip_start_values_are_plain_numbers(problem, instance_file):
+    module = load_module(problem)
+    instance = module.parser(instance_file(problem))
+    values = getattr(module, f'{problem}_mip_start')(instance, heuristic_start(problem, instance))
+    assert plain(values)
+
+
+@pytest.mark.parametrize('problem', PROBLEMS)
+@pytest.mark.parametrize('formulation', ['mip_cplex_model', 'mip_gurobi_model'])
+def test_solve_from_the_start(problem, formulation, instance_file):
+    path = instance_file(problem)
+    module = load_module(problem)
+    instance = module.parser(path)
+    start = heuristic_start(problem, instance)
+    Cmax = getattr(module, f'{problem}_mip_start')(instance, start)['Cmax']
+    result = model_function(problem, formulation)(path, time_limit=30, start=start)
+    assert result.status == 'optimal'
+    assert result.objective <= Cmax + 1e-6
@@ -0,0 +1,28 @@
+import pytest
+
+from problems import model_function
+
+
+@pytest.mark.parametrize('formulation', ['mip_cplex_model', 'mip_gurobi_model', 'cp_model'])
+def test_solve_stops_at_the_bound(formulation, instance_file, cpoptimizer):
+    path = instance_file('fsp', 7, 4, 3)
+    function = model_function('fsp', formulation)
+    kwargs = {'time_limit': 60, 'execfile': cpoptimizer} if formulation.startswith('cp_') else {'time_limit': 60}
+    optimum = function(path, **kwargs).objective
+
+    # a bound at the optimum proves the first optimal incumbent
+    result = function(path, lower_bound=optimum, **kwargs)
+    assert result.status == 'optimal'
+    assert result.objective == pytest.approx(optimum)
+
+    # a bound below every schedule cannot be reached
+    result = function(path, lower_bound=optimum / 2, **kwargs)
+    assert result.status == 'optimal'
+    assert result.objective == pytest.approx(optimum)
+    assert result.bound == pytest.approx(optimum)
+
+    # any incumbent reaches a bound above every schedule: the first one ends the solve
+    result = function(path, lower_bound=10 ** 6, **kwargs)
+    assert result.status == 'optimal'
+    assert result.objective >= optimum - 1e-6
+    assert result.gap == 0
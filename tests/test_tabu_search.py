@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip('numpy')  # the tested modules import it at the top
+
+from bounds import lower_bound  # noqa: E402
+from problems import load_module, model_function  # noqa: E402
+
+
+def makespan(module, instance, sequences):
+    return max(map(max, module.jsp_completion_times(instance, sequences)))
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_tabu_search_improves_on_the_dispatching_rule(seed, instance_file):
+    module = load_module('jsp')
+    path = instance_file('jsp', 10, 5, seed)
+    instance = module.parser(path)
+    start = module.jsp_dispatch(instance)
+    sequences, Cmax = module.jsp_tabu_search(instance, iterations=2000, seed=seed)
+    assert [sorted(sequence) for sequence in sequences] == [list(range(instance.n))] * instance.g
+    assert Cmax == makespan(module, instance, sequences)
+    assert lower_bound('jsp', instance) <= Cmax <= makespan(module, instance, start)
+
+
+def test_tabu_search_reaches_the_optimum_of_a_small_instance(instance_file, cpoptimizer):
+    module = load_module('jsp')
+    path = instance_file('jsp', 6, 4, 1)
+    optimum = model_function('jsp', 'cp_model')(path, time_limit=30, execfile=cpoptimizer).objective
+    sequences, Cmax = module.jsp_tabu_search(module.parser(path), iterations=5000, lower_bound=optimum)
+    assert Cmax == optimum
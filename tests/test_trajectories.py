@@ -0,0 +1,31 @@
+import pytest
+
+from anytime import anytime_metrics
+from problems import model_function
+
+
+def test_anytime_metrics():
+    trajectory = [(1.0, None, 50), (2.0, 120, 60), (4.0, 100, 100)]
+    first, within, integral = anytime_metrics(trajectory, 100, 10)
+    assert first == 2.0
+    assert within == 4.0
+    assert integral == pytest.approx(2.0 * 1.0 + 2.0 * 20 / 120)
+    assert anytime_metrics([], 100, 10) == (None, None, 10.0)
+
+
+@pytest.mark.parametrize('problem, formulation', [
+    ('fsp', 'mip_cplex_model'), ('fsp', 'mip_gurobi_model'), ('fsp', 'cp_model'),
+    ('jsp', 'mip_cplex_model'), ('jsp', 'mip_gurobi_model'), ('pmsp', 'mip_cplex_model'),
+])
+def test_trajectories_are_monotone(problem, formulation, instance_file, cpoptimizer):
+    path = instance_file(problem, 12 if problem == 'pmsp' else 6, 4, 2)
+    kwargs = {'execfile': cpoptimizer} if formulation.startswith('cp_') else {}
+    result = model_function(problem, formulation)(path, time_limit=30, **kwargs)
+    times = [point[0] for point in result.trajectory]
+    incumbents = [point[1] for point in result.trajectory if point[1] is not None]
+    bounds = [point[2] for point in result.trajectory if point[2] is not None]
+    assert times == sorted(times)
+    assert incumbents == sorted(incumbents, reverse=True)
+    assert bounds == sorted(bounds)
+    assert incumbents[-1] == pytest.approx(result.objective)
+    assert bounds[-1] == pytest.approx(result.bound)